@@ -8,9 +8,11 @@
 # - Supraj Gijre
 
 """FastAPI application setup: mounts routers, configures CORS, and exposes health."""
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import Base, engine
+from .database import Base, engine, SessionLocal
 from . import models  # ensure all models are imported before create_all
 from .routers import auth as auth_router
 from .routers import users as users_router
@@ -25,12 +27,63 @@ from .routers import analytics as analytics_router
 from .routers import drivers as drivers_router
 from .routers import ocr as ocr_router
 from app.routers import reviews
+from .services.driver import backfill_driver_current_state
+from .services.dispatch import dispatch_loop
+from .services.dispatch_queue import dispatch_queue
+from .services.location_history import compaction_loop
+from .services.idempotency import idempotency_purge_loop
+from .services.sweeper import sweep_loop
+from .services.archive import archive_loop
+from .services.cart_store import cart_store, cart_flush_loop, ensure_cart_columns
+from .services.menu_search import ensure_search_index
+from .services.fuzzy_search import fuzzy_search
+from .config import settings
 
 
 
 Base.metadata.create_all(bind=engine)
+# Databases created before menu search existed get its index built from their items
+with engine.begin() as _conn:
+    ensure_search_index(_conn)
 
-app = FastAPI(title="Cafe Calories API")
+# Databases created before the cart store get its carts/cart_items columns
+with engine.begin() as _conn:
+    ensure_cart_columns(_conn)
+
+# Databases created before driver_current_state existed get it seeded from location history
+with SessionLocal() as _db:
+    backfill_driver_current_state(_db)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers for the lifetime of the app."""
+    await asyncio.to_thread(fuzzy_search.load)
+    tasks = []
+    if settings.DISPATCH_MODE == "batch":
+        tasks.append(asyncio.create_task(dispatch_loop(settings.DISPATCH_TICK_SECONDS)))
+    else:
+        dispatch_queue.start()
+    if settings.LOCATION_COMPACTION_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(compaction_loop(settings.LOCATION_COMPACTION_INTERVAL_SECONDS)))
+    if settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(idempotency_purge_loop(settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS)))
+    if settings.SWEEP_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(sweep_loop(settings.SWEEP_INTERVAL_SECONDS)))
+    if settings.ARCHIVE_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(archive_loop(settings.ARCHIVE_INTERVAL_SECONDS)))
+    if settings.CART_FLUSH_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(cart_flush_loop(settings.CART_FLUSH_INTERVAL_SECONDS)))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await dispatch_queue.stop()
+        # Carts changed since the last flush would be lost with the in-process store
+        await asyncio.to_thread(cart_store.flush_dirty)
+
+app = FastAPI(title="Cafe Calories API", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -42,6 +95,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 app.include_router(reviews.router)
@@ -8,7 +8,7 @@
 # - Supraj Gijre
 
 """SQLAlchemy ORM models for users, cafes, items, orders, payments, goals, drivers, and reviews."""
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float, DateTime, Enum, Text, Date, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float, DateTime, Enum, Text, Date, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
@@ -58,6 +58,8 @@ class Cafe(Base):
     items = relationship("Item", back_populates="cafe")
     reviews = relationship("Review", back_populates="cafe", cascade="all, delete-orphan")
     review_summary = relationship("ReviewSummary", back_populates="cafe", uselist=False)
+    # Bounding-box prefilter for /cafes/nearby; with active it covers the box scan
+    __table_args__ = (Index('ix_cafes_lat_lng', 'lat', 'lng', 'active'),)
 
 class Review(Base):
     """Review model representing a customer review for a cafe."""
@@ -106,6 +108,16 @@ class Item(Base):
     kind = Column(String, nullable=True)  # dessert, milkshake, etc.
     active = Column(Boolean, default=True)
     cafe = relationship("Cafe", back_populates="items")
+    # Range filters and keyset pagination for /items/search; id breaks ties in the sort order
+    __table_args__ = (
+        Index('ix_items_active_calories', 'active', 'calories', 'id'),
+        Index('ix_items_active_price', 'active', 'price', 'id'),
+    )
+
+ITEM_CALORIES_PER_DOLLAR = Item.calories / Item.price
+"""Sort key for value-for-money searches; only defined for items with a price."""
+Index('ix_items_active_calories_per_dollar', Item.active, ITEM_CALORIES_PER_DOLLAR, Item.id,
+      sqlite_where=Item.price > 0, postgresql_where=Item.price > 0)
 
 class Cart(Base):
     """Cart model representing a user's shopping cart."""
@@ -113,6 +125,7 @@ class Cart(Base):
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    next_line_no = Column(Integer, default=1)  # next cart_item_id the cart store hands out; ids are never reused
 
 class CartItem(Base):
     """CartItem model representing an item in a user's shopping cart."""
@@ -122,6 +135,8 @@ class CartItem(Base):
     item_id = Column(Integer, ForeignKey("items.id"))
     quantity = Column(Integer, default=1)
     assignee_user_id = Column(Integer, ForeignKey("users.id"))  # who will consume
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    line_no = Column(Integer)  # the line's cart_item_id in the API, numbered per cart by the cart store
 
 class OrderStatus(str, enum.Enum):
     """Order status enumeration defining the lifecycle states of an order."""
@@ -147,6 +162,34 @@ class Order(Base):
     pickup_code = Column(String, nullable=True)
     total_price = Column(Float, default=0.0)
     total_calories = Column(Integer, default=0)
+    items = relationship("OrderItem", back_populates="order")
+    cafe = relationship("Cafe")
+    driver = relationship("User", foreign_keys=[driver_id])
+    # Keyset pagination indexes for the order listings; on Postgres they also cover the listed columns
+    __table_args__ = (
+        Index('ix_orders_cafe_created_id', 'cafe_id', 'created_at', 'id',
+              postgresql_include=['status', 'total_price', 'total_calories', 'can_cancel_until', 'driver_id']),
+        # Sweeps for stale PENDING orders
+        Index('ix_orders_status_created', 'status', 'created_at'),
+        Index('ix_orders_user_created_id', 'user_id', 'created_at', 'id',
+              postgresql_include=['status', 'cafe_id', 'total_price', 'total_calories', 'can_cancel_until', 'driver_id']),
+    )
+
+class OrderEvent(Base):
+    """OrderEvent model: append-only log of order changes for incremental dashboard sync.
+
+    `id` is the sequence number clients resume from; it only ever grows (AUTOINCREMENT on SQLite).
+    """
+    __tablename__ = "order_events"
+    __table_args__ = (Index('ix_order_events_cafe_id_id', 'cafe_id', 'id'), {'sqlite_autoincrement': True})
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    cafe_id = Column(Integer, ForeignKey("cafes.id"), nullable=False)
+    type = Column(String, nullable=False)  # "placed", "status" or "assigned"
+    status = Column(Enum(OrderStatus), nullable=False)
+    driver_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    order = relationship("Order")
 
 class OrderItem(Base):
     """OrderItem model representing an individual item within an order."""
@@ -158,6 +201,8 @@ class OrderItem(Base):
     assignee_user_id = Column(Integer, ForeignKey("users.id"))
     subtotal_price = Column(Float, default=0.0)
     subtotal_calories = Column(Integer, default=0)
+    order = relationship("Order", back_populates="items")
+    item = relationship("Item")
 
 class PaymentStatus(str, enum.Enum):
     """Payment status enumeration defining the states of a payment transaction."""
@@ -205,5 +250,85 @@ class DriverLocation(Base):
     driver_id = Column(Integer, ForeignKey("users.id"), index=True)
     lat = Column(Float, nullable=False)
     lng = Column(Float, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     status = Column(Enum(DriverStatus), default=DriverStatus.IDLE, nullable=False)
+
+class DriverCurrentState(Base):
+    """DriverCurrentState model holding one row per driver with their latest location and status.
+
+    Upserted alongside every DriverLocation write so reads never scan the location history.
+    """
+    __tablename__ = "driver_current_state"
+    driver_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    status = Column(Enum(DriverStatus), default=DriverStatus.IDLE, nullable=False, index=True)
+
+class IdempotencyKey(Base):
+    """IdempotencyKey model storing the response of a request made with an Idempotency-Key header.
+
+    A retry with the same key replays the stored response instead of repeating the write.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint('user_id', 'scope', 'key', name='uq_idempotency_user_scope_key'),)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    scope = Column(String, nullable=False)  # e.g. "POST /orders/place"
+    key = Column(String, nullable=False)
+    request_hash = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class ArchivedOrder(Base):
+    """ArchivedOrder model: a finished order moved out of `orders` by the archival job.
+
+    Columns mirror Order; ids are kept, and there are no foreign keys so archived rows
+    outlive the users and cafes they point at.
+    """
+    __tablename__ = "orders_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, index=True)
+    cafe_id = Column(Integer, index=True)
+    driver_id = Column(Integer, nullable=True)
+    status = Column(Enum(OrderStatus))
+    created_at = Column(DateTime)
+    can_cancel_until = Column(DateTime)
+    pickup_code = Column(String, nullable=True)
+    total_price = Column(Float)
+    total_calories = Column(Integer)
+    archived_at = Column(DateTime, nullable=False)
+
+class ArchivedOrderItem(Base):
+    """ArchivedOrderItem model: an item of an ArchivedOrder."""
+    __tablename__ = "order_items_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(Integer, index=True)
+    item_id = Column(Integer)
+    quantity = Column(Integer)
+    assignee_user_id = Column(Integer)
+    subtotal_price = Column(Float)
+    subtotal_calories = Column(Integer)
+    archived_at = Column(DateTime, nullable=False)
+
+class ArchivedPayment(Base):
+    """ArchivedPayment model: a payment of an ArchivedOrder."""
+    __tablename__ = "payments_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(Integer, index=True)
+    provider = Column(String)
+    amount = Column(Float)
+    status = Column(Enum(PaymentStatus))
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False)
+
+class ArchivedRefundRequest(Base):
+    """ArchivedRefundRequest model: a refund request of an ArchivedOrder."""
+    __tablename__ = "refund_requests_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(Integer, index=True)
+    reason = Column(Text)
+    status = Column(String)
+    archived_at = Column(DateTime, nullable=False)
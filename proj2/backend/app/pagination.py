@@ -0,0 +1,31 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Keyset pagination cursors: the last row's (sort key, id), handed out in X-Next-Cursor."""
+import base64
+from datetime import datetime
+from typing import TypeVar
+
+from fastapi import HTTPException
+
+SortKey = TypeVar("SortKey", float, datetime)
+
+def encode_cursor(key: float | datetime, row_id: int) -> str:
+    """Opaque cursor for the page after the row with sort key `key` and id `row_id`."""
+    value = key.isoformat() if isinstance(key, datetime) else repr(float(key))
+    return base64.urlsafe_b64encode(f"{value}|{row_id}".encode()).decode()
+
+def decode_cursor(cursor: str, key_type: type[SortKey]) -> tuple[SortKey, int]:
+    """The (sort key, id) of an `encode_cursor` cursor, with a 400 for anything else."""
+    try:
+        value, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        key = datetime.fromisoformat(value) if key_type is datetime else key_type(value)
+        return key, int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -12,6 +12,11 @@ from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import User, Cafe, Role
 from ..deps import require_roles
+from ..services.dispatch import dispatch_pending_orders
+from ..services.dispatch_queue import dispatch_queue
+from ..services.location_history import compact_driver_locations
+from ..services.sweeper import sweep
+from ..services.archive import archive_orders
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -53,3 +58,28 @@ def delete_cafe(cafe_id: int, db: Session = Depends(get_db), admin: User = Depen
     db.delete(c)
     db.commit()
     return {"status": "deleted"}
+
+@router.post("/dispatch", response_model=list[dict])
+def run_dispatch(db: Session = Depends(get_db), admin: User = Depends(require_roles(Role.ADMIN))):
+    """Run one batch dispatch now, matching all pending orders to idle drivers (admin only)."""
+    return dispatch_pending_orders(db)
+
+@router.get("/dispatch/queue")
+def dispatch_queue_metrics(admin: User = Depends(require_roles(Role.ADMIN))):
+    """Background dispatch queue depth, job outcomes and time-to-assign (admin only)."""
+    return dispatch_queue.metrics()
+
+@router.post("/driver-locations/compact")
+def compact_locations(db: Session = Depends(get_db), admin: User = Depends(require_roles(Role.ADMIN))):
+    """Run driver location history compaction now and report rows removed and table size (admin only)."""
+    return compact_driver_locations(db)
+
+@router.post("/sweep")
+def run_sweep(db: Session = Depends(get_db), admin: User = Depends(require_roles(Role.ADMIN))):
+    """Decline stale orders, release stuck drivers and expire idle carts now, and report the counts (admin only)."""
+    return sweep(db)
+
+@router.post("/archive-orders")
+def run_archive(max_chunks: int | None = None, db: Session = Depends(get_db), admin: User = Depends(require_roles(Role.ADMIN))):
+    """Move finished orders past ARCHIVE_AFTER_DAYS to the archive tables now, optionally at most `max_chunks` batches (admin only)."""
+    return archive_orders(db, max_chunks=max_chunks)
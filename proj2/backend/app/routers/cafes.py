@@ -7,14 +7,21 @@
 # - Sachi Vyas
 # - Supraj Gijre
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import or_
+from typing import List, Literal
 from ..database import get_db
-from ..schemas import CafeCreate, CafeOut, ItemCreate, OCRResult
+from ..schemas import CafeCreate, CafeOut, CafeNearbyOut, ItemCreate, OCRResult
 from ..models import Cafe, Item, User, Role
 from ..deps import get_current_user, require_roles
 from ..services.ocr import parse_menu_pdf
+from ..services.fuzzy_search import fuzzy_search, fetch_ranked, unindex_menu_after_commit
+from ..services.menu_cache import bump_menu_after_commit
+from ..services.spatial import bounding_box, haversine_km_array
+from ..config import settings
+from ..pagination import encode_cursor, decode_cursor
+import numpy as np
 router = APIRouter(prefix="/cafes", tags=["cafes"])
 @router.get("/mine", response_model=CafeOut)
 def get_my_cafe(
@@ -48,14 +55,56 @@ def create_cafe(data: CafeCreate, db: Session = Depends(get_db), owner: User = D
     return cafe
 
 @router.get("/", response_model=List[CafeOut])
-def list_cafes(q: str | None = None, db: Session = Depends(get_db)):
-    """List active cafes, optionally filtered by case-insensitive name match."""
+def list_cafes(q: str | None = None, match: Literal["exact", "fuzzy"] = "exact", db: Session = Depends(get_db)):
+    """List active cafes, optionally filtered by case-insensitive name match; `match=fuzzy` runs a
+    typo-tolerant search over name and cuisine instead (the FUZZY_SEARCH_LIMIT best matches)."""
     query = db.query(Cafe).filter(Cafe.active == True)
+    if q and match == "fuzzy":
+        return fetch_ranked(query, Cafe.id, fuzzy_search.search_cafes(q))
     if q:
         like = f"%{q}%"
         query = query.filter(Cafe.name.ilike(like))
     return query.order_by(Cafe.name).all()
 
+CAFE_LIST_COLUMNS = (Cafe.id, Cafe.name, Cafe.address, Cafe.phone, Cafe.cuisine, Cafe.timings, Cafe.active, Cafe.lat, Cafe.lng)
+
+@router.get("/nearby", response_model=List[CafeNearbyOut])
+def nearby_cafes(response: Response,
+                 lat: float = Query(..., ge=-90, le=90), lng: float = Query(..., ge=-180, le=180),
+                 radius_km: float = Query(settings.CAFE_NEARBY_DEFAULT_RADIUS_KM, gt=0, le=settings.CAFE_NEARBY_MAX_RADIUS_KM),
+                 limit: int = Query(settings.CAFE_NEARBY_DEFAULT_LIMIT, ge=1, le=settings.CAFE_NEARBY_MAX_LIMIT),
+                 cursor: str | None = None,
+                 db: Session = Depends(get_db)):
+    """
+    Active cafes within `radius_km` of (lat, lng), nearest first, one page at a time: pass the
+    X-Next-Cursor header of a page as `cursor` for the next.
+    Only the bounding box of the circle is read, from the (lat, lng, active) index alone; exact
+    haversine distances then drop the box's corners and order the results, and the page's
+    cafes are loaded with a second query.
+    """
+    after = decode_cursor(cursor, float) if cursor else None
+    (lat_lo, lat_hi), lng_ranges = bounding_box(lat, lng, radius_km)
+    box = (
+        db.query(Cafe.id, Cafe.lat, Cafe.lng)
+        .filter(Cafe.lat.between(lat_lo, lat_hi), or_(*(Cafe.lng.between(lo, hi) for lo, hi in lng_ranges)), Cafe.active == True)
+        .all()
+    )
+    if not box:
+        return []
+    ids = np.array([r.id for r in box])
+    distances = haversine_km_array(lat, lng, [r.lat for r in box], [r.lng for r in box])
+    keep = distances <= radius_km
+    if after:
+        after_km, after_id = after
+        keep &= (distances > after_km) | ((distances == after_km) & (ids > after_id))
+    ids, distances = ids[keep], distances[keep]
+    order = np.lexsort((ids, distances))[:limit + 1]
+    if len(order) > limit:
+        order = order[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(float(distances[order[-1]]), int(ids[order[-1]]))
+    page = {int(ids[i]): float(distances[i]) for i in order}
+    rows = fetch_ranked(db.query(*CAFE_LIST_COLUMNS), Cafe.id, list(page))
+    return [{**r._asdict(), "distance_km": page[r.id]} for r in rows]
 
 @router.get("/{cafe_id}", response_model=CafeOut)
 def get_cafe(cafe_id: int, db: Session = Depends(get_db)):
@@ -92,6 +141,8 @@ def replace_menu(
 
     # Remove old items
     db.query(Item).filter(Item.cafe_id == cafe_id).delete()
+    unindex_menu_after_commit(db, cafe_id)
+    bump_menu_after_commit(db, cafe_id)
 
     # Add new items
     new_items = [Item(cafe_id=cafe_id, **item.model_dump()) for item in items]
@@ -7,154 +7,248 @@
 # - Sachi Vyas
 # - Supraj Gijre
 
+import copy
+import json
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import JSON, Integer, cast, column, func, select
 from sqlalchemy.orm import Session
-from collections import defaultdict
+from datetime import datetime
 from ..database import get_db
-from ..schemas import CartAddItem, CartSummary, CartOut
-from ..models import Cart, CartItem, Item, User
+from ..schemas import CartAddItem, CartBatchIn, CartBatchOp, CartSummary, CartOut
+from ..models import Item, User
 from ..deps import get_current_user
+from ..config import settings
+from ..services.cart_store import cart_store, CartLine, CartState
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
+# Carts are read and changed through the cart store; the database copy is written behind it
+# (at checkout and periodically), so none of these endpoints commits per click.
 
 @router.get("/", response_model=CartOut)
-def get_cart(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def get_cart(current: User = Depends(get_current_user)):
     """Get or create the current user's cart and return its metadata."""
-    cart = get_or_create_cart(db, current.id)
-    return CartOut(id=cart.id, user_id=cart.user_id, created_at=cart.created_at)
+    cart = cart_store.get(current.id)
+    return CartOut(id=cart.cart_id, user_id=cart.user_id, created_at=cart.created_at)
 
 
-def get_or_create_cart(db: Session, user_id: int) -> Cart:
-    """Fetch the user's cart or create a new one if missing."""
-    cart = db.query(Cart).filter(Cart.user_id == user_id).first()
-    if not cart:
-        cart = Cart(user_id=user_id)
-        db.add(cart)
-        db.commit()
-        db.refresh(cart)
-    return cart
+def get_or_create_cart(user_id: int) -> CartState:
+    """Fetch the user's cart from the cart store, creating it if missing."""
+    return cart_store.get(user_id)
 
 @router.post("/add", response_model=dict)
 def add_to_cart(data: CartAddItem, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
     """Add or increment an item in the cart; enforce single-cafe constraint."""
-    item = db.query(Item).filter(Item.id == data.item_id, Item.active == True).first()
+    item = db.query(Item.id, Item.cafe_id).filter(Item.id == data.item_id, Item.active == True).first()
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     assignee_id = current.id
     if data.assignee_email:
-        assignee = db.query(User).filter(User.email == data.assignee_email, User.is_active == True).first()
+        assignee = db.query(User.id).filter(User.email == data.assignee_email, User.is_active == True).first()
         if not assignee:
             raise HTTPException(status_code=400, detail="Assignee must be a registered active user")
         assignee_id = assignee.id
-    cart = get_or_create_cart(db, current.id)
 
+    with cart_store.mutate(current.id) as cart:
+        return _add_line(cart, item.id, item.cafe_id, data.quantity, assignee_id)
+
+def _add_line(cart: CartState, item_id: int, cafe_id: int, quantity: int, assignee_id: int) -> dict:
+    """Add `quantity` of an item to the cart, or increment the line already holding it."""
     # Enforce single-restaurant per cart: if cart already has items from a different cafe, reject
-    existing_cafe = db.query(Item.cafe_id).join(CartItem, CartItem.item_id == Item.id).filter(CartItem.cart_id == cart.id).distinct().first()
-    if existing_cafe and existing_cafe[0] != item.cafe_id:
+    if any(line.cafe_id != cafe_id for line in cart.lines.values()):
         raise HTTPException(status_code=400, detail="Cart contains items from another restaurant. Clear cart before adding items from a different restaurant.")
 
-    # If the same item already exists in the cart (same cart_id & item_id), increment quantity
-    existing_ci = db.query(CartItem).filter(CartItem.cart_id == cart.id, CartItem.item_id == item.id).first()
-    if existing_ci:
-        existing_ci.quantity = (existing_ci.quantity or 0) + int(data.quantity)
-        db.add(existing_ci)
-        db.commit()
-        return {"status": "updated", "cart_item_id": existing_ci.id}
+    # If the same item already exists in the cart, increment quantity
+    for line_no, line in cart.lines.items():
+        if line.item_id == item_id:
+            line.quantity += int(quantity)
+            line.updated_at = datetime.utcnow()
+            return {"status": "updated", "cart_item_id": line_no}
+
+    line_no = cart.add_line(CartLine(item_id=item_id, cafe_id=cafe_id, quantity=quantity, assignee_user_id=assignee_id))
+    return {"status": "added", "cart_item_id": line_no}
+
+def _lines_table(db: Session, cart: CartState):
+    """
+    The cart's lines as a table (line_no, item_id, quantity, assignee_user_id) to join against
+    items and users in SQL. The lines travel as one JSON parameter, so the statement text is the
+    same whatever the cart size and SQLAlchemy's compiled-statement cache applies.
+    """
+    names = ("line_no", "item_id", "quantity", "assignee_user_id")
+    lines = json.dumps([dict(zip(names, (n, l.item_id, l.quantity, l.assignee_user_id))) for n, l in cart.lines.items()])
+    if db.get_bind().dialect.name == "postgresql":
+        return (
+            func.json_to_recordset(cast(lines, JSON))
+            .table_valued(*(column(name, Integer) for name in names))
+            .render_derived(name="cart_lines", with_types=True)
+        )
+    rows = func.json_each(lines).table_valued("value")
+    return select(*(func.json_extract(rows.c.value, f"$.{name}").label(name) for name in names)).select_from(rows).subquery("cart_lines")
+
+
+def summarize_cart(db: Session, cart: CartState) -> CartSummary:
+    """Calories and price per assignee, summed by one aggregate query over the cart's lines."""
+    by_person = {}
+    if cart.lines:
+        lines = _lines_table(db, cart)
+        rows = db.execute(
+            select(User.email, func.sum(Item.calories * lines.c.quantity).label("calories"), func.sum(Item.price * lines.c.quantity).label("price"))
+            .select_from(lines)
+            .join(Item, Item.id == lines.c.item_id)
+            .join(User, User.id == lines.c.assignee_user_id)
+            .group_by(User.email)
+        ).all()
+        by_person = {r.email: {"calories": float(r.calories), "price": float(r.price)} for r in rows}
+    total_cals = int(sum(p["calories"] for p in by_person.values()))
+    total_price = sum(p["price"] for p in by_person.values())
+    return CartSummary(by_person=by_person, total_calories=total_cals, total_price=round(total_price, 2))
 
-    ci = CartItem(cart_id=cart.id, item_id=item.id, quantity=data.quantity, assignee_user_id=assignee_id)
-    db.add(ci)
-    db.commit()
-    db.refresh(ci)
-    return {"status": "added", "cart_item_id": ci.id}
 
 @router.get("/summary", response_model=CartSummary)
 def cart_summary(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
     """Return calories and price totals grouped by assignee, plus cart totals."""
-    cart = get_or_create_cart(db, current.id)
-    rows = db.query(CartItem, Item, User).join(Item, CartItem.item_id == Item.id).join(User, CartItem.assignee_user_id == User.id).filter(CartItem.cart_id == cart.id).all()
-    by_person = defaultdict(lambda: {"calories": 0.0, "price": 0.0})
-    total_cals = 0
-    total_price = 0.0
-    for ci, it, person in rows:
-        cals = it.calories * ci.quantity
-        price = it.price * ci.quantity
-        email = person.email
-        by_person[email]["calories"] += cals
-        by_person[email]["price"] += price
-        total_cals += cals
-        total_price += price
-    return CartSummary(by_person=by_person, total_calories=total_cals, total_price=round(total_price, 2))
+    return summarize_cart(db, get_or_create_cart(current.id))
 
 @router.delete("/clear", response_model=dict)
-def clear_cart(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def clear_cart(current: User = Depends(get_current_user)):
     """Remove all items from the current user's cart."""
-    cart = get_or_create_cart(db, current.id)
-    db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
-    db.commit()
+    with cart_store.mutate(current.id) as cart:
+        cart.lines.clear()
     return {"status": "cleared"}
 
 
+def cart_item_rows(db: Session, cart: CartState) -> list[dict]:
+    """Detailed cart lines, read with one column-only query joining the cart's lines to items."""
+    if not cart.lines:
+        return []
+    lines = _lines_table(db, cart)
+    rows = db.execute(
+        select(lines.c.line_no, lines.c.quantity, lines.c.assignee_user_id, Item.id, Item.cafe_id, Item.name, Item.description,
+               Item.price, Item.calories, Item.kind, Item.veg_flag)
+        .select_from(lines)
+        .join(Item, Item.id == lines.c.item_id)
+        .order_by(lines.c.line_no)
+    ).all()
+    return [
+        {
+            "id": r.line_no,
+            "cart_id": cart.cart_id,
+            "item": {
+                "id": r.id,
+                "cafe_id": r.cafe_id,
+                "name": r.name,
+                "description": r.description,
+                "price": float(r.price),
+                "calories": r.calories,
+                "category": r.kind or "",
+                # items carry no image column yet; send null to simplify frontend handling
+                "image": None,
+                "veg_flag": bool(r.veg_flag),
+            },
+            "quantity": r.quantity,
+            "assignee_user_id": r.assignee_user_id
+        }
+        for r in rows
+    ]
+
+
 @router.get("/items", response_model=list)
 def get_cart_items(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
     """Return detailed cart items for the current user."""
-    cart = get_or_create_cart(db, current.id)
-    rows = db.query(CartItem, Item).join(Item, CartItem.item_id == Item.id).filter(CartItem.cart_id == cart.id).all()
-    results = []
-    for ci, it in rows:
-        results.append({
-            "id": ci.id,
-            "cart_id": ci.cart_id,
-            "item": {
-                "id": it.id,
-                "cafe_id": it.cafe_id,
-                "name": it.name,
-                "description": it.description,
-                "price": float(it.price),
-                "calories": it.calories,
-                "category": it.kind or "",
-                # send empty string when no image is available to simplify frontend handling
-                "image": getattr(it, "image", None) or None,
-                "veg_flag": bool(it.veg_flag),
-            },
-            "quantity": ci.quantity,
-            "assignee_user_id": ci.assignee_user_id
-        })
-    return results
+    return cart_item_rows(db, get_or_create_cart(current.id))
 
 
 @router.put("/item/{cart_item_id}")
 def update_cart_item(cart_item_id: int, payload: dict, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
     """Update quantity (and optionally assignee) for a cart item belonging to the current user."""
-    cart = get_or_create_cart(db, current.id)
-    ci = db.query(CartItem).filter(CartItem.id == cart_item_id, CartItem.cart_id == cart.id).first()
-    if not ci:
-        raise HTTPException(status_code=404, detail="Cart item not found")
-    if "quantity" in payload:
-        qty = int(payload.get("quantity") or 0)
-        if qty <= 0:
-            db.delete(ci)
-            db.commit()
-            return {"status": "removed"}
-        ci.quantity = qty
-    if "assignee_email" in payload and payload.get("assignee_email"):
-        from ..models import User as UserModel
-        ass = db.query(UserModel).filter(UserModel.email == payload.get("assignee_email")).first()
-        if not ass:
-            raise HTTPException(status_code=400, detail="Assignee not found or inactive")
-        ci.assignee_user_id = ass.id
-    db.add(ci)
-    db.commit()
+    with cart_store.mutate(current.id) as cart:
+        line = cart.lines.get(cart_item_id)
+        if not line:
+            raise HTTPException(status_code=404, detail="Cart item not found")
+        qty = line.quantity
+        if "quantity" in payload:
+            qty = int(payload.get("quantity") or 0)
+            if qty <= 0:
+                del cart.lines[cart_item_id]
+                return {"status": "removed"}
+        assignee_id = line.assignee_user_id
+        if "assignee_email" in payload and payload.get("assignee_email"):
+            ass = db.query(User.id).filter(User.email == payload.get("assignee_email")).first()
+            if not ass:
+                raise HTTPException(status_code=400, detail="Assignee not found or inactive")
+            assignee_id = ass.id
+        line.quantity, line.assignee_user_id, line.updated_at = qty, assignee_id, datetime.utcnow()
     return {"status": "updated"}
 
 
 @router.delete("/item/{cart_item_id}")
-def delete_cart_item(cart_item_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def delete_cart_item(cart_item_id: int, current: User = Depends(get_current_user)):
     """Delete a specific cart item belonging to the current user."""
-    cart = get_or_create_cart(db, current.id)
-    ci = db.query(CartItem).filter(CartItem.id == cart_item_id, CartItem.cart_id == cart.id).first()
-    if not ci:
-        raise HTTPException(status_code=404, detail="Cart item not found")
-    db.delete(ci)
-    db.commit()
+    with cart_store.mutate(current.id) as cart:
+        if cart.lines.pop(cart_item_id, None) is None:
+            raise HTTPException(status_code=404, detail="Cart item not found")
     return {"status": "deleted"}
+
+
+def _apply_op(cart: CartState, op: CartBatchOp, items: dict, assignees: dict, user_id: int) -> dict:
+    """Apply one batch operation to `cart`, with items and assignees already looked up."""
+    if op.op == "add":
+        if op.item_id is None:
+            raise HTTPException(status_code=400, detail="item_id is required")
+        if op.item_id not in items:
+            raise HTTPException(status_code=404, detail="Item not found")
+        quantity = 1 if op.quantity is None else op.quantity
+        if quantity < 1:
+            raise HTTPException(status_code=400, detail="quantity must be at least 1")
+        assignee_id = user_id
+        if op.assignee_email:
+            assignee = assignees.get(op.assignee_email)
+            if not assignee or not assignee.is_active:
+                raise HTTPException(status_code=400, detail="Assignee must be a registered active user")
+            assignee_id = assignee.id
+        return _add_line(cart, op.item_id, items[op.item_id], quantity, assignee_id)
+
+    if op.cart_item_id is None:
+        raise HTTPException(status_code=400, detail="cart_item_id is required")
+    line = cart.lines.get(op.cart_item_id)
+    if not line:
+        raise HTTPException(status_code=404, detail="Cart item not found")
+    if op.op == "remove" or (op.quantity is not None and op.quantity <= 0):
+        del cart.lines[op.cart_item_id]
+        return {"status": "removed", "cart_item_id": op.cart_item_id}
+    if op.assignee_email:
+        assignee = assignees.get(op.assignee_email)
+        if not assignee or not assignee.is_active:
+            raise HTTPException(status_code=400, detail="Assignee not found or inactive")
+        line.assignee_user_id = assignee.id
+    if op.quantity is not None:
+        line.quantity = op.quantity
+    line.updated_at = datetime.utcnow()
+    return {"status": "updated", "cart_item_id": op.cart_item_id}
+
+
+@router.post("/batch", response_model=dict)
+def batch_cart(batch: CartBatchIn, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+    """
+    Apply add/update/remove operations to the cart in order, all or nothing. Items and assignees
+    for the whole batch are looked up with one IN query each; an operation may refer to a line
+    added earlier in the batch. A failing operation rejects the batch, naming its index.
+    """
+    if len(batch.ops) > settings.CART_BATCH_MAX_OPS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.CART_BATCH_MAX_OPS} operations per batch")
+    item_ids = {op.item_id for op in batch.ops if op.op == "add" and op.item_id is not None}
+    emails = {op.assignee_email for op in batch.ops if op.assignee_email}
+    items = dict(db.query(Item.id, Item.cafe_id).filter(Item.id.in_(item_ids), Item.active == True).all()) if item_ids else {}
+    assignees = {u.email: u for u in db.query(User.id, User.email, User.is_active).filter(User.email.in_(emails))} if emails else {}
+
+    with cart_store.mutate(current.id) as cart:
+        # Work on a copy so a failing operation leaves the cart untouched
+        draft = copy.deepcopy(cart)
+        results = []
+        for i, op in enumerate(batch.ops):
+            try:
+                results.append(_apply_op(draft, op, items, assignees, current.id))
+            except HTTPException as exc:
+                raise HTTPException(status_code=exc.status_code, detail=f"Operation {i}: {exc.detail}")
+        cart.lines, cart.next_line_no = draft.lines, draft.next_line_no
+    return {"status": "ok", "results": results}
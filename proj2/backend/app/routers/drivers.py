@@ -7,18 +7,19 @@
 # - Sachi Vyas
 # - Supraj Gijre
 
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, WebSocket
 from sqlalchemy.orm import Session
 from ..database import get_db
-from ..schemas import DriverLoginRequest, Token, AssignedOrderOut, DriverLocationIn, DriverStatusUpdate, DriverLocationWithStatus, IdleDriverInfo
+from ..schemas import DriverLoginRequest, Token, AssignedOrderOut, DriverLocationIn, DriverStatusUpdate, DriverLocationWithStatus, IdleDriverInfo, DriverLocationBatchIn
 from ..models import User, Order, OrderStatus, DriverLocation, DriverStatus, Role
-from ..auth import verify_password, create_token
+from ..auth import verify_password, create_token, decode_token
 from ..auth import hash_password
 from ..schemas import UserCreate, UserOut
 from ..deps import get_current_user
 from datetime import timedelta, datetime
 from ..config import settings
-from ..services.driver import update_driver_status_to_occupied, update_driver_status_to_idle, get_idle_drivers_with_locations
+from ..services.driver import update_driver_status_to_occupied, update_driver_status_to_idle, get_idle_drivers_with_locations, get_latest_driver_location, ingest_driver_locations
+from ..services.pubsub import hub, driver_topic, stream_to_websocket
 
 router = APIRouter(prefix="/drivers", tags=["drivers"])
 
@@ -67,6 +68,24 @@ def get_assigned_orders(driver_id: int, db: Session = Depends(get_db), current:
     return orders
 
 
+@router.post("/locations:batch")
+def post_locations_batch(batch: DriverLocationBatchIn, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+    """Post many location points at once: a driver's offline buffer, or any drivers' points from an admin gateway."""
+    if current.role != Role.DRIVER and current.role != Role.ADMIN:
+        raise HTTPException(status_code=403, detail="Insufficient role")
+    driver_ids = {p.driver_id for p in batch.points}
+    if current.role == Role.DRIVER and driver_ids - {current.id}:
+        raise HTTPException(status_code=403, detail="Can only post own location")
+    if len(batch.points) > settings.DRIVER_LOCATION_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {settings.DRIVER_LOCATION_BATCH_MAX} points per batch")
+    known = {uid for (uid,) in db.query(User.id).filter(User.id.in_(driver_ids), User.role == Role.DRIVER)}
+    unknown = sorted(driver_ids - known)
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown drivers: {unknown}")
+    written = ingest_driver_locations(batch.points, db)
+    return {"status": "ok", "points": written, "drivers": len(driver_ids)}
+
+
 @router.post("/{driver_id}/location")
 def post_location(driver_id: int, loc: DriverLocationIn, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
     """Post a driver's current location (driver/admin only)."""
@@ -77,7 +96,6 @@ def post_location(driver_id: int, loc: DriverLocationIn, db: Session = Depends(g
     dl = DriverLocation(driver_id=driver_id, lat=loc.lat, lng=loc.lng, timestamp=loc.timestamp)
     db.add(dl)
     db.commit()
-    # TODO: push websocket notification to any interested parties about location update
     return {"status": "ok"}
 
 
@@ -94,7 +112,6 @@ def post_location_with_status(driver_id: int, loc: DriverLocationWithStatus, db:
     db.add(dl)
     db.commit()
     db.refresh(dl)
-    # TODO: push websocket notification to any interested parties about location update
     return {"status": "ok", "location": dl}
 
 
@@ -107,9 +124,7 @@ def update_driver_status(driver_id: int, status_update: DriverStatusUpdate, db:
         raise HTTPException(status_code=403, detail="Can only update own status")
     
     # Get the latest location to maintain location data
-    latest_location = db.query(DriverLocation).filter(
-        DriverLocation.driver_id == driver_id
-    ).order_by(DriverLocation.timestamp.desc()).first()
+    latest_location = get_latest_driver_location(driver_id, db)
     
     if not latest_location:
         raise HTTPException(status_code=404, detail="Driver location not found. Please post location first.")
@@ -129,12 +144,12 @@ def update_driver_status(driver_id: int, status_update: DriverStatusUpdate, db:
 
 
 @router.get("/available", response_model=list[IdleDriverInfo])
-def get_available_drivers(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    """Get all idle drivers available for assignment."""
+def get_available_drivers(lat: float | None = None, lng: float | None = None, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+    """Get all idle drivers available for assignment, nearest first when lat/lng are given."""
     if current.role not in [Role.ADMIN, Role.OWNER, Role.STAFF]:
         raise HTTPException(status_code=403, detail="Only admins, owners, and staff can view available drivers")
     
-    idle_drivers = get_idle_drivers_with_locations(db)
+    idle_drivers = get_idle_drivers_with_locations(db, lat, lng)
     return idle_drivers
 
 
@@ -213,13 +228,18 @@ def driver_update_order_status(driver_id: int, order_id: int, new_status: OrderS
 
 
 @router.websocket("/driver/{driver_id}/ws")
-async def driver_ws(websocket: WebSocket, driver_id: int):
-    """WebSocket endpoint for driver real-time messaging (minimal demo implementation)."""
-    await websocket.accept()
+async def driver_ws(websocket: WebSocket, driver_id: int, token: str | None = None):
+    """Stream a driver's real-time events (location/status updates, order assignments) over a WebSocket.
+
+    Authenticate with `?token=<access token>`; drivers may only open their own stream, admins any.
+    """
     try:
-        while True:
-            data = await websocket.receive_text()
-            # echo for now
-            await websocket.send_text(f"received: {data}")
-    except WebSocketDisconnect:
+        payload = decode_token(token or "")
+    except HTTPException:
+        await websocket.close(code=1008)
         return
+    if payload.role != Role.ADMIN and not (payload.role == Role.DRIVER and payload.uid == driver_id):
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    await stream_to_websocket(websocket, hub.subscribe([driver_topic(driver_id)]))
@@ -7,13 +7,19 @@
 # - Sachi Vyas
 # - Supraj Gijre
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import tuple_
+from typing import List, Literal
 from ..database import get_db
 from ..schemas import ItemCreate, ItemOut
-from ..models import Item, Cafe, User, Role
+from ..models import Item, Cafe, User, Role, ITEM_CALORIES_PER_DOLLAR
 from ..deps import get_current_user
+from ..services.menu_search import apply_search
+from ..services.fuzzy_search import fuzzy_search, fetch_ranked
+from ..services.menu_cache import menu_cache, ALL_CAFES
+from ..config import settings
+from ..pagination import encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/items", tags=["items"])
 
@@ -62,19 +68,94 @@ def delete_item(item_id: int, db: Session = Depends(get_db), user: User = Depend
 
 # NEW: Get all items across all cafes (for AI recommendations)
 @router.get("", response_model=List[ItemOut])
-def list_all_items(q: str | None = None, db: Session = Depends(get_db)):
-    """List all active menu items across all cafes (for AI recommendations)"""
-    query = db.query(Item).filter(Item.active == True)
-    if q:
-        like = f"%{q}%"
-        query = query.filter(Item.name.ilike(like))
-    return query.order_by(Item.name).all()
+def list_all_items(q: str | None = None, match: Literal["exact", "fulltext", "fuzzy"] = "exact",
+                   if_none_match: str | None = Header(None), db: Session = Depends(get_db)):
+    """List all active menu items across all cafes (for AI recommendations).
+    With `q`, filtered by case-insensitive name match; `match=fulltext` runs the full-text search
+    over name, description and ingredients and `match=fuzzy` a typo-tolerant search over item
+    names (the FUZZY_SEARCH_LIMIT best matches), both best match first.
+    Served from the menu cache with an ETag; a matching If-None-Match gets a 304."""
+    def load():
+        query = db.query(Item).filter(Item.active == True)
+        if q and match == "fuzzy":
+            return fetch_ranked(query, Item.id, fuzzy_search.search_items(q))
+        if q and match == "fulltext":
+            return apply_search(query, q).all()
+        if q:
+            like = f"%{q}%"
+            query = query.filter(Item.name.ilike(like))
+        return query.order_by(Item.name).all()
+    return menu_cache.respond(ALL_CAFES, (q, match) if q else (), if_none_match, load)
+
+ITEM_LIST_COLUMNS = (Item.id, Item.cafe_id, Item.name, Item.description, Item.ingredients, Item.calories, Item.price,
+                     Item.quantity, Item.servings, Item.veg_flag, Item.kind, Item.active)
+
+# Sort keys for /items/search, each backed by an (active, key, id) index
+ITEM_SORT_KEYS = {"calories": Item.calories, "price": Item.price, "calories_per_dollar": ITEM_CALORIES_PER_DOLLAR}
+
+@router.get("/search", response_model=List[ItemOut])
+def search_items(response: Response,
+                 min_calories: int | None = Query(None, ge=0), max_calories: int | None = Query(None, ge=0),
+                 max_price: float | None = Query(None, ge=0), veg_flag: bool | None = None, kind: str | None = None,
+                 cafe_id: list[int] | None = Query(None),
+                 sort: Literal["calories", "price", "calories_per_dollar"] = "calories",
+                 order: Literal["asc", "desc"] = "asc",
+                 limit: int = Query(settings.ITEM_PAGE_DEFAULT_LIMIT, ge=1, le=settings.ITEM_PAGE_MAX_LIMIT),
+                 cursor: str | None = None,
+                 db: Session = Depends(get_db)):
+    """
+    Active items within a calorie range and price cap, optionally only vegetarian, of one `kind`
+    or from the given cafes, sorted by calories, price or calories per dollar (items with a price
+    only), one page at a time: pass the X-Next-Cursor header of a page as `cursor` for the next.
+    Pages are read in (sort key, id) order from the matching (active, key, id) index.
+    """
+    key = ITEM_SORT_KEYS[sort]
+    q = db.query(*ITEM_LIST_COLUMNS, key.label("sort_key")).filter(Item.active == True)
+    if min_calories is not None:
+        q = q.filter(Item.calories >= min_calories)
+    if max_calories is not None:
+        q = q.filter(Item.calories <= max_calories)
+    if max_price is not None:
+        q = q.filter(Item.price <= max_price)
+    if sort == "calories_per_dollar":
+        q = q.filter(Item.price > 0)
+    if veg_flag is not None:
+        q = q.filter(Item.veg_flag == veg_flag)
+    if kind:
+        q = q.filter(Item.kind == kind)
+    if cafe_id:
+        q = q.filter(Item.cafe_id.in_(cafe_id))
+    if cursor:
+        value, item_id = decode_cursor(cursor, float)
+        # The plain range on the key lets the index seek; the row comparison breaks ties by id
+        if order == "asc":
+            q = q.filter(key >= value, tuple_(key, Item.id) > tuple_(value, item_id))
+        else:
+            q = q.filter(key <= value, tuple_(key, Item.id) < tuple_(value, item_id))
+    if order == "asc":
+        q = q.order_by(key, Item.id)
+    else:
+        q = q.order_by(key.desc(), Item.id.desc())
+    rows = q.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].sort_key, rows[-1].id)
+    return [row._asdict() for row in rows]
 
 @router.get("/{cafe_id}", response_model=List[ItemOut])
-def list_items(cafe_id: int, q: str | None = None, db: Session = Depends(get_db)):
-    """List active items for a given cafe, optionally filtered by name."""
-    query = db.query(Item).filter(Item.cafe_id == cafe_id, Item.active == True)
-    if q:
-        like = f"%{q}%"
-        query = query.filter(Item.name.ilike(like))
-    return query.order_by(Item.name).all()
+def list_items(cafe_id: int, q: str | None = None, match: Literal["exact", "fulltext", "fuzzy"] = "exact",
+               if_none_match: str | None = Header(None), db: Session = Depends(get_db)):
+    """List active items for a given cafe, optionally filtered by name (or searched full-text with
+    `match=fulltext`, typo-tolerant by item name with `match=fuzzy`, most relevant first).
+    Served from the menu cache with an ETag; a matching If-None-Match gets a 304."""
+    def load():
+        query = db.query(Item).filter(Item.cafe_id == cafe_id, Item.active == True)
+        if q and match == "fuzzy":
+            return fetch_ranked(query, Item.id, fuzzy_search.search_items(q, cafe_id))
+        if q and match == "fulltext":
+            return apply_search(query, q, within_cafe=True).all()
+        if q:
+            like = f"%{q}%"
+            query = query.filter(Item.name.ilike(like))
+        return query.order_by(Item.name).all()
+    return menu_cache.respond(cafe_id, (q, match) if q else (), if_none_match, load)
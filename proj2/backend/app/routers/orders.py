@@ -7,53 +7,81 @@
 # - Sachi Vyas
 # - Supraj Gijre
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Header, Response
+from fastapi.responses import StreamingResponse
+from anyio import from_thread
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert, tuple_, exists
 from datetime import datetime
 from ..database import get_db
-from ..schemas import PlaceOrderRequest, OrderOut, AssignDriverRequest, OrderSummaryOut
-from ..models import Cart, CartItem, Item, Order, OrderItem, OrderStatus, User, Cafe
+from ..schemas import PlaceOrderRequest, OrderOut, AssignDriverRequest, OrderSummaryOut, OrderChangesOut
+from ..models import CartItem, Item, Order, OrderItem, OrderStatus, User, Cafe, Role, StaffAssignment, ArchivedOrder
 from ..deps import get_current_user, require_cafe_staff_or_owner
-from ..services.driver import find_nearest_idle_driver, update_driver_status_to_occupied
+from ..services.driver import claim_driver_for_order, claim_nearest_idle_driver, get_latest_driver_location
+from ..services.pubsub import hub, order_topic, driver_topic
+from ..services.tracking import order_tracking_events
+from ..services.idempotency import Idempotency, Replayed
+from ..services.order_events import order_changes_since
+from ..services.dispatch_queue import dispatch_queue, assign_nearest_driver
+from ..services.cart_store import cart_store
+from ..config import settings
+from ..pagination import encode_cursor, decode_cursor
 import secrets
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 @router.post("/place", response_model=OrderOut)
-def place_order(data: PlaceOrderRequest, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    """Create an order from the user's cart for a single cafe, then clear the cart."""
-    cart = db.query(Cart).filter(Cart.user_id == current.id).first()
-    if not cart:
-        raise HTTPException(status_code=400, detail="Empty cart")
-    rows = db.query(CartItem, Item).join(Item, CartItem.item_id == Item.id).filter(CartItem.cart_id == cart.id).all()
-    if not rows:
-        raise HTTPException(status_code=400, detail="Empty cart")
-    if any(it.cafe_id != data.cafe_id for _, it in rows):
-        raise HTTPException(status_code=400, detail="All items must be from the same cafe")
+def place_order(data: PlaceOrderRequest, db: Session = Depends(get_db), current: User = Depends(get_current_user),
+                idempotency_key: str | None = Header(None, alias="Idempotency-Key")):
+    """Create an order from the user's cart for a single cafe, then clear the cart.
 
-    total_price = round(sum(it.price * ci.quantity for ci, it in rows), 2)
-    total_calories = sum(it.calories * ci.quantity for ci, it in rows)
+    Runs as one transaction: the cart store's pending changes are written back, the cart lines
+    and item prices come back in a single query, the order items go in with one bulk insert and
+    the cart is cleared with one delete. The user's cart is locked until the order commits.
+    A retry carrying the same Idempotency-Key gets the original response back.
+    """
+    idem = Idempotency(db, current.id, "POST /orders/place", idempotency_key, data)
+    replay = idem.replay()
+    if replay:
+        return replay
+    try:
+        with cart_store.checkout(db, current.id) as cart:
+            # A retry that waited on the cart lock while the first request placed the order gets its response
+            idem.recheck()
+            rows = (
+                db.query(CartItem.id, CartItem.quantity, CartItem.assignee_user_id, Item.id.label("item_id"), Item.cafe_id, Item.price, Item.calories)
+                .join(Item, CartItem.item_id == Item.id)
+                .filter(CartItem.cart_id == cart.cart_id)
+                .all()
+            )
+            if not rows:
+                raise HTTPException(status_code=400, detail="Empty cart")
+            if any(r.cafe_id != data.cafe_id for r in rows):
+                raise HTTPException(status_code=400, detail="All items must be from the same cafe")
 
-    order = Order(user_id=current.id, cafe_id=data.cafe_id, status=OrderStatus.PENDING, total_price=total_price, total_calories=total_calories)
-    db.add(order)
-    db.commit()
-    db.refresh(order)
+            total_price = round(sum(r.price * r.quantity for r in rows), 2)
+            total_calories = sum(r.calories * r.quantity for r in rows)
 
-    for ci, it in rows:
-        oi = OrderItem(order_id=order.id, item_id=it.id, quantity=ci.quantity, assignee_user_id=ci.assignee_user_id,
-                       subtotal_price=round(it.price * ci.quantity, 2), subtotal_calories=it.calories * ci.quantity)
-        db.add(oi)
-    order.pickup_code = secrets.token_hex(3).upper()
-    db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
-    db.add(order)
-    db.commit()
-    db.refresh(order)
-    return order
+            order = Order(user_id=current.id, cafe_id=data.cafe_id, status=OrderStatus.PENDING, total_price=total_price,
+                          total_calories=total_calories, pickup_code=secrets.token_hex(3).upper())
+            db.add(order)
+            db.flush()
+            db.execute(insert(OrderItem), [
+                {"order_id": order.id, "item_id": r.item_id, "quantity": r.quantity, "assignee_user_id": r.assignee_user_id,
+                 "subtotal_price": round(r.price * r.quantity, 2), "subtotal_calories": r.calories * r.quantity}
+                for r in rows
+            ])
+            db.query(CartItem).filter(CartItem.cart_id == cart.cart_id).delete(synchronize_session=False)
+            return idem.commit(OrderOut.model_validate(order))
+    except Replayed as replayed:
+        db.rollback()
+        return replayed.response
 
 @router.get("/o/{order_id}", response_model=OrderOut)
 def get_order(order_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    """Fetch a single order if requester is owner, cafe staff/owner, or admin."""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    """Fetch a single order if requester is owner, cafe staff/owner, or admin.
+    Orders moved to cold storage are read from the archive."""
+    order = db.query(Order).filter(Order.id == order_id).first() or db.get(ArchivedOrder, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     # Check if the current user is either the order owner, cafe staff/owner, or admin
@@ -64,37 +92,49 @@ def get_order(order_id: int, db: Session = Depends(get_db), current: User = Depe
             raise HTTPException(status_code=403, detail="Not authorized to view this order")
     return order
 
-@router.get("/{order_id}/summary", response_model=OrderSummaryOut)
-def order_summary(order_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    """Return order with item breakdown and (if any) minimal driver info."""
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
+def _get_viewable_order(order_id: int, db: Session, current: User) -> Order:
+    """
+    Load an order the requester may view (order owner or cafe staff/owner), else 404/403.
+
+    One query fetches the order with its items, their names and the driver eagerly loaded,
+    together with everything the permission check needs (cafe owner, staff assignment).
+    """
+    is_staff = exists().where(StaffAssignment.cafe_id == Order.cafe_id, StaffAssignment.user_id == current.id)
+    row = (
+        db.query(Order, is_staff)
+        .options(
+            joinedload(Order.items).joinedload(OrderItem.item).load_only(Item.id, Item.name),
+            joinedload(Order.driver).load_only(User.id, User.email),
+            joinedload(Order.cafe).load_only(Cafe.id, Cafe.owner_id),
+        )
+        .filter(Order.id == order_id)
+        .first()
+    )
+    if not row:
         raise HTTPException(status_code=404, detail="Order not found")
+    order, staff = row
     
     # Check authorization: either order owner OR cafe staff/owner
-    if order.user_id != current.id:
-        try:
-            require_cafe_staff_or_owner(order.cafe_id, db, current)
-        except HTTPException:
-            raise HTTPException(status_code=403, detail="Not authorized to view this order")
-    
-    items = db.query(OrderItem, Item).join(Item, OrderItem.item_id == Item.id).filter(OrderItem.order_id == order.id).all()
+    allowed = order.user_id == current.id or current.role == Role.ADMIN or staff or (order.cafe is not None and order.cafe.owner_id == current.id)
+    if not allowed:
+        raise HTTPException(status_code=403, detail="Not authorized to view this order")
+    return order
+
+def _build_order_summary(order: Order) -> OrderSummaryOut:
+    """Summary of an order loaded by _get_viewable_order; reads only its eager-loaded relationships."""
     item_summaries = [
         {
-            "item_id": it.id,
-            "name": it.name,
+            "item_id": oi.item.id,
+            "name": oi.item.name,
             "quantity": oi.quantity,
             "subtotal_price": oi.subtotal_price,
             "subtotal_calories": oi.subtotal_calories
         }
-        for oi, it in items
+        for oi in order.items
+        if oi.item is not None
     ]
-    driver_id = order.driver_id
-    if driver_id:
-        driver = db.query(User).filter(User.id == driver_id).first()
-        driver_info = {"driver_id": driver.id, "driver_email": driver.email} if driver else None
-    else:
-        driver_info = None
+    driver = order.driver
+    driver_info = {"driver_id": driver.id, "driver_email": driver.email} if driver else None
     return OrderSummaryOut(
         id=order.id,
         cafe_id=order.cafe_id,
@@ -106,6 +146,33 @@ def order_summary(order_id: int, db: Session = Depends(get_db), current: User =
         driver_info=driver_info
     )
 
+@router.get("/{order_id}/summary", response_model=OrderSummaryOut)
+def order_summary(order_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+    """Return order with item breakdown and (if any) minimal driver info."""
+    return _build_order_summary(_get_viewable_order(order_id, db, current))
+
+@router.get("/{order_id}/stream")
+def order_stream(order_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+    """Live order tracking as Server-Sent Events: one `snapshot` (the order summary plus the
+    driver's position), then only `status`, `driver_assigned` and throttled `driver_location` deltas."""
+    order = _get_viewable_order(order_id, db, current)
+    # Subscribe before reading the snapshot so no change can fall between the two
+    sub = from_thread.run_sync(hub.subscribe, [order_topic(order.id)])
+    db.refresh(order)
+    driver_location = None
+    if order.driver_id:
+        from_thread.run_sync(hub.add_topics, sub, [driver_topic(order.driver_id)])
+        state = get_latest_driver_location(order.driver_id, db)
+        if state:
+            driver_location = {"driver_id": state.driver_id, "lat": state.lat, "lng": state.lng, "timestamp": state.timestamp.isoformat()}
+    snapshot = _build_order_summary(order).model_dump(mode="json")
+    snapshot["driver_location"] = driver_location
+    return StreamingResponse(
+        order_tracking_events(sub, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @router.post("/{order_id}/cancel", response_model=OrderOut)
 def cancel_order(order_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
@@ -123,62 +190,69 @@ def cancel_order(order_id: int, db: Session = Depends(get_db), current: User = D
     db.refresh(order)
     return order
 
+ORDER_LIST_COLUMNS = (Order.id, Order.cafe_id, Order.status, Order.created_at, Order.total_price, Order.total_calories, Order.can_cancel_until, Order.driver_id)
+
+def _order_page(db: Session, response: Response, criteria, status: list[OrderStatus] | None,
+                created_from: datetime | None, created_to: datetime | None, limit: int | None, cursor: str | None) -> list[dict]:
+    """
+    One page of orders matching `criteria`, newest first, ordered on (created_at, id).
+    Fetches limit + 1 rows; when there are more, the cursor for the next page goes in X-Next-Cursor.
+    Without `limit` and `cursor` every matching order is returned, as before the listings paged.
+    """
+    q = db.query(*ORDER_LIST_COLUMNS).filter(criteria)
+    if status:
+        q = q.filter(Order.status.in_(status))
+    if created_from:
+        q = q.filter(Order.created_at >= created_from)
+    if created_to:
+        q = q.filter(Order.created_at < created_to)
+    if cursor:
+        q = q.filter(tuple_(Order.created_at, Order.id) < tuple_(*decode_cursor(cursor, datetime)))
+    q = q.order_by(Order.created_at.desc(), Order.id.desc())
+    if limit is None and cursor is None:
+        return [row._asdict() for row in q.all()]
+    limit = limit or settings.ORDER_PAGE_DEFAULT_LIMIT
+    rows = q.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [row._asdict() for row in rows]
+
 @router.get("/my", response_model=list[OrderOut])
-def my_orders(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    """List the authenticated user's orders, newest first."""
-    return db.query(Order).filter(Order.user_id == current.id).order_by(Order.created_at.desc()).all()
+def my_orders(response: Response,
+              status: list[OrderStatus] | None = Query(None),
+              created_from: datetime | None = None, created_to: datetime | None = None,
+              limit: int | None = Query(None, ge=1, le=settings.ORDER_PAGE_MAX_LIMIT),
+              cursor: str | None = None,
+              db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+    """List the authenticated user's orders, newest first; with `limit` or `cursor`, one page at a time (see X-Next-Cursor)."""
+    return _order_page(db, response, Order.user_id == current.id, status, created_from, created_to, limit, cursor)
 
 @router.get("/{cafe_id}", response_model=list[OrderOut])
-def cafe_orders(cafe_id: int, status: OrderStatus | None = None, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    """List cafe orders for staff/owners, optionally filtered by status."""
+def cafe_orders(cafe_id: int, response: Response,
+                status: list[OrderStatus] | None = Query(None),
+                created_from: datetime | None = None, created_to: datetime | None = None,
+                limit: int | None = Query(None, ge=1, le=settings.ORDER_PAGE_MAX_LIMIT),
+                cursor: str | None = None,
+                db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+    """
+    List cafe orders for staff/owners, newest first; with `limit` or `cursor`, one page at a time.
+    Filter by one or more `status` values and a [created_from, created_to) window;
+    pass the X-Next-Cursor header of a page as `cursor` to get the next one.
+    """
     require_cafe_staff_or_owner(cafe_id, db, current)
-    q = db.query(Order).filter(Order.cafe_id == cafe_id)
-    if status:
-        q = q.filter(Order.status == status)
-    return q.order_by(Order.created_at.desc()).all()
+    return _order_page(db, response, Order.cafe_id == cafe_id, status, created_from, created_to, limit, cursor)
 
-def _try_auto_assign_driver(order: Order, db: Session) -> bool:
+@router.get("/{cafe_id}/changes", response_model=OrderChangesOut)
+def cafe_order_changes(cafe_id: int, since: int = Query(0, ge=0),
+                       limit: int = Query(settings.ORDER_PAGE_MAX_LIMIT, ge=1, le=settings.ORDER_PAGE_MAX_LIMIT),
+                       db: Session = Depends(get_db), current: User = Depends(get_current_user)):
     """
-    Helper function to automatically assign the nearest idle driver to an order.
-    Returns True if assignment was successful, False otherwise.
+    Order events for a cafe newer than sequence number `since` (staff/owners only).
+    Dashboards load the list once, then poll with the returned `last_seq` to pick up only what changed.
     """
-    # Skip if order already has a driver
-    if order.driver_id:
-        return False
-    
-    # Only auto-assign for ACCEPTED or READY status
-    if order.status not in [OrderStatus.ACCEPTED, OrderStatus.READY]:
-        return False
-    
-    try:
-        # Get cafe location
-        cafe = db.query(Cafe).filter(Cafe.id == order.cafe_id).first()
-        if not cafe:
-            return False
-        
-        # Find nearest idle driver using Haversine distance
-        result = find_nearest_idle_driver(cafe.lat, cafe.lng, db)
-        if not result:
-            return False
-        
-        driver, distance = result
-        driver_id = driver.id
-        
-        # Assign driver to order
-        order.driver_id = driver_id
-        db.add(order)
-        db.commit()
-        
-        # Update driver status to OCCUPIED
-        update_driver_status_to_occupied(driver_id, db)
-        
-        db.refresh(order)
-        return True
-    except Exception:
-        # If auto-assignment fails, don't fail the status update
-        # Just log or silently continue
-        db.rollback()
-        return False
+    require_cafe_staff_or_owner(cafe_id, db, current)
+    return order_changes_since(db, cafe_id, since, limit)
 
 @router.post("/{order_id}/status", response_model=OrderOut)
 def update_status(
@@ -230,11 +304,16 @@ def update_status(
         db.commit()
         db.refresh(order)
         
-        # Automatically try to assign a driver when order reaches ACCEPTED or READY status
-        if new_status_enum in [OrderStatus.ACCEPTED, OrderStatus.READY] and not order.driver_id:
-            _try_auto_assign_driver(order, db)
-            # Refresh order to get updated driver_id
-            db.refresh(order)
+        # Queue automatic driver assignment when the order reaches ACCEPTED or READY; the response
+        # does not wait for it (in batch dispatch mode the periodic dispatcher picks the order up instead)
+        if new_status_enum in [OrderStatus.ACCEPTED, OrderStatus.READY] and not order.driver_id and settings.DISPATCH_MODE == "greedy":
+            if not dispatch_queue.enqueue(order.id, order.cafe_id):
+                # No running queue (app started without its lifespan): assign inline
+                try:
+                    assign_nearest_driver(order.id, db)
+                except Exception:
+                    db.rollback()
+                db.refresh(order)
         
         # If order is delivered, set driver back to IDLE
         if new_status_enum == OrderStatus.DELIVERED and order.driver_id:
@@ -267,9 +346,6 @@ def assign_driver(order_id: int, assignment: AssignDriverRequest = None, db: Ses
     if order.status not in [OrderStatus.ACCEPTED, OrderStatus.READY]:
         raise HTTPException(status_code=400, detail="Order must be ACCEPTED or READY to assign a driver")
     
-    driver_id = None
-    distance = None
-    
     if assignment and assignment.driver_id:
         # Manually assign specific driver
         driver_id = assignment.driver_id
@@ -279,11 +355,11 @@ def assign_driver(order_id: int, assignment: AssignDriverRequest = None, db: Ses
         if not driver:
             raise HTTPException(status_code=404, detail="Driver not found")
         
-        # Verify driver is idle
-        from ..services.driver import get_latest_driver_location
-        from ..models import DriverStatus
-        latest_location = get_latest_driver_location(driver_id, db)
-        if not latest_location or latest_location.status != DriverStatus.IDLE:
+        # Claim the driver only if they are still idle and the order is still unassigned
+        if not claim_driver_for_order(order.id, driver_id, db):
+            db.refresh(order)
+            if order.driver_id:
+                raise HTTPException(status_code=400, detail="Order already has a driver assigned")
             raise HTTPException(status_code=400, detail="Driver is not available (not idle)")
     else:
         # Auto-assign nearest idle driver
@@ -291,20 +367,12 @@ def assign_driver(order_id: int, assignment: AssignDriverRequest = None, db: Ses
         if not cafe:
             raise HTTPException(status_code=404, detail="Cafe not found")
         
-        result = find_nearest_idle_driver(cafe.lat, cafe.lng, db)
+        result = claim_nearest_idle_driver(order.id, cafe.lat, cafe.lng, db)
         if not result:
+            db.refresh(order)
+            if order.driver_id:
+                raise HTTPException(status_code=400, detail="Order already has a driver assigned")
             raise HTTPException(status_code=404, detail="No idle drivers available")
-        
-        driver, distance = result
-        driver_id = driver.id
-    
-    # Assign driver to order
-    order.driver_id = driver_id
-    db.add(order)
-    db.commit()
-    
-    # Update driver status to OCCUPIED
-    update_driver_status_to_occupied(driver_id, db)
     
     db.refresh(order)
     
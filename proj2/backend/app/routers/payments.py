@@ -7,17 +7,26 @@
 # - Sachi Vyas
 # - Supraj Gijre
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import Payment, PaymentStatus, Order, OrderStatus, User
 from ..deps import get_current_user
+from ..services.idempotency import Idempotency
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
 @router.post("/{order_id}")
-def create_payment(order_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    """Create a mock payment record for an order (order owner only, payable statuses only)."""
+def create_payment(order_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user),
+                   idempotency_key: str | None = Header(None, alias="Idempotency-Key")):
+    """Create a mock payment record for an order (order owner only, payable statuses only).
+
+    A retry carrying the same Idempotency-Key gets the original payment back instead of a second one.
+    """
+    idem = Idempotency(db, current.id, f"POST /payments/{order_id}", idempotency_key)
+    replay = idem.replay()
+    if replay:
+        return replay
     order = db.query(Order).filter(Order.id == order_id, Order.user_id == current.id).first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -25,6 +34,5 @@ def create_payment(order_id: int, db: Session = Depends(get_db), current: User =
         raise HTTPException(status_code=400, detail="Order not payable in current status")
     p = Payment(order_id=order.id, amount=order.total_price, status=PaymentStatus.PAID, provider="MOCK")
     db.add(p)
-    db.commit()
-    db.refresh(p)
-    return p
+    db.flush()
+    return idem.commit(p)
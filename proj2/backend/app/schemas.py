@@ -9,7 +9,7 @@
 
 """Pydantic schemas for request/response validation and serialization."""
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Literal
 from datetime import datetime, date
 from .models import Role, OrderStatus, PaymentStatus, DriverStatus
 
@@ -82,6 +82,10 @@ class CafeOut(BaseModel):
     class Config:
         from_attributes = True
 
+class CafeNearbyOut(CafeOut):
+    """Schema for a cafe returned by /cafes/nearby, with its distance from the searched point."""
+    distance_km: float
+
 class ItemCreate(BaseModel):
     """Schema for creating a new menu item."""
     name: str
@@ -108,6 +112,18 @@ class CartAddItem(BaseModel):
     quantity: int = Field(ge=1, default=1)
     assignee_email: Optional[EmailStr] = None
 
+class CartBatchOp(BaseModel):
+    """Schema for one operation of a bulk cart change: add an item, or update/remove a cart line."""
+    op: Literal["add", "update", "remove"]
+    item_id: Optional[int] = None  # add
+    cart_item_id: Optional[int] = None  # update, remove
+    quantity: Optional[int] = None  # add (default 1), update (0 or less removes the line)
+    assignee_email: Optional[EmailStr] = None
+
+class CartBatchIn(BaseModel):
+    """Schema for a bulk cart change, applied in order as one unit."""
+    ops: List[CartBatchOp]
+
 class CartSummary(BaseModel):
     """Schema for cart summary showing calories and prices grouped by person."""
     by_person: Dict[str, Dict[str, float]]
@@ -127,6 +143,7 @@ class OrderOut(BaseModel):
     total_price: float
     total_calories: int
     can_cancel_until: datetime
+    driver_id: Optional[int] = None
     class Config:
         from_attributes = True
 
@@ -209,6 +226,18 @@ class DriverLocationWithStatus(BaseModel):
     status: DriverStatus
     timestamp: Optional[datetime] = None
 
+class DriverLocationPoint(BaseModel):
+    """Schema for one point in a bulk driver location upload."""
+    driver_id: int
+    lat: float
+    lng: float
+    timestamp: Optional[datetime] = None
+    status: Optional[DriverStatus] = None
+
+class DriverLocationBatchIn(BaseModel):
+    """Schema for a bulk driver location upload (one driver's offline buffer or a gateway batch)."""
+    points: List[DriverLocationPoint]
+
 class AssignDriverRequest(BaseModel):
     """Schema for assigning a driver to an order (auto-assign if driver_id is None)."""
     driver_id: Optional[int] = None  # If None, auto-assign nearest driver
@@ -222,6 +251,7 @@ class IdleDriverInfo(BaseModel):
     lng: float
     status: str
     last_update: datetime
+    distance_km: Optional[float] = None
 
 class DriverLoginRequest(BaseModel):
     """Schema for driver login request."""
@@ -256,6 +286,21 @@ class ReviewOut(ReviewBase):
     class Config:
         from_attributes = True
 
+class OrderEventOut(BaseModel):
+    """Schema for one entry of the order change log."""
+    seq: int
+    order_id: int
+    type: str
+    status: OrderStatus
+    driver_id: Optional[int] = None
+    created_at: datetime
+
+class OrderChangesOut(BaseModel):
+    """Schema for a page of the order change feed; pass `last_seq` as `since` to continue."""
+    events: List[OrderEventOut]
+    last_seq: int
+    has_more: bool
+
 class OrderSummaryOut(BaseModel):
     """Schema for detailed order summary including items and driver information."""
     id: int
@@ -0,0 +1,97 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Order archival: move finished orders, with their items, payments and refunds, into archive tables."""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, delete, select, literal
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import (
+    Order, OrderItem, OrderEvent, OrderStatus, Payment, RefundRequest,
+    ArchivedOrder, ArchivedOrderItem, ArchivedPayment, ArchivedRefundRequest,
+)
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_STATUSES = (OrderStatus.DELIVERED, OrderStatus.CANCELLED, OrderStatus.DECLINED, OrderStatus.REFUNDED)
+
+# (live model, archive model, column holding the order id), children before their order
+_ARCHIVED_TABLES = (
+    (OrderItem, ArchivedOrderItem, "order_id"),
+    (Payment, ArchivedPayment, "order_id"),
+    (RefundRequest, ArchivedRefundRequest, "order_id"),
+    (Order, ArchivedOrder, "id"),
+)
+
+def _move_rows(db: Session, model, archive_model, order_col: str, order_ids: list[int], archived_at: datetime) -> int:
+    """Copy the rows of `model` belonging to `order_ids` into `archive_model`, then delete them."""
+    table = model.__table__
+    names = [c.name for c in table.columns]
+    criterion = table.c[order_col].in_(order_ids)
+    rows = select(*table.c, literal(archived_at, ArchivedOrder.archived_at.type).label("archived_at")).where(criterion)
+    db.execute(insert(archive_model).from_select(names + ["archived_at"], rows))
+    return db.execute(delete(model).where(criterion)).rowcount
+
+def archive_orders(db: Session, now: datetime | None = None, max_chunks: int | None = None) -> dict:
+    """
+    Move orders in a finished status created more than ARCHIVE_AFTER_DAYS ago to the archive
+    tables, ARCHIVE_BATCH orders per transaction, oldest first.
+
+    Each chunk copies and deletes an order together with its items, payments and refund
+    requests in one transaction, so a run that stops part-way leaves only whole orders moved
+    and the next run carries on from there. The orders' change-log events are dropped; the
+    change feed only covers live orders. Returns how many rows were moved per table.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    report = {"orders": 0, "order_items": 0, "payments": 0, "refund_requests": 0, "chunks": 0, "cutoff": cutoff}
+    keys = {Order: "orders", OrderItem: "order_items", Payment: "payments", RefundRequest: "refund_requests"}
+    while max_chunks is None or report["chunks"] < max_chunks:
+        ids = [
+            i for (i,) in db.query(Order.id)
+            .filter(Order.status.in_(ARCHIVABLE_STATUSES), Order.created_at < cutoff)
+            .order_by(Order.created_at, Order.id)
+            .limit(settings.ARCHIVE_BATCH)
+        ]
+        if not ids:
+            break
+        try:
+            db.execute(delete(OrderEvent).where(OrderEvent.order_id.in_(ids)))
+            for model, archive_model, order_col in _ARCHIVED_TABLES:
+                report[keys[model]] += _move_rows(db, model, archive_model, order_col, ids, now)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        report["chunks"] += 1
+    return report
+
+def run_archive_job() -> dict:
+    """Run one archival pass in its own session."""
+    with SessionLocal() as db:
+        return archive_orders(db)
+
+async def archive_loop(interval_seconds: float) -> None:
+    """Archive finished orders every `interval_seconds` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            report = await asyncio.to_thread(run_archive_job)
+        except Exception:
+            logger.exception("Order archival failed")
+            continue
+        logger.info(
+            "Order archival: %d orders, %d items, %d payments, %d refund requests moved in %d chunks",
+            report["orders"], report["order_items"], report["payments"], report["refund_requests"], report["chunks"],
+        )
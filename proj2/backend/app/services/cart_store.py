@@ -0,0 +1,324 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Server-side cart store: carts live in a cache and are written behind to carts/cart_items."""
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict, replace
+from datetime import datetime
+
+from sqlalchemy import insert, delete, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Cart, CartItem, Item
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CartLine:
+    item_id: int
+    cafe_id: int
+    quantity: int
+    assignee_user_id: int
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+@dataclass
+class CartState:
+    """
+    A user's cart as held by the store. Line numbers are the `cart_item_id`s the API hands out;
+    they come from `next_line_no` and are never reused within a cart, so a stale id cannot
+    change or remove a line added after its own was removed.
+    """
+    cart_id: int
+    user_id: int
+    created_at: datetime
+    lines: dict[int, CartLine] = field(default_factory=dict)
+    dirty: bool = False
+    next_line_no: int = 1
+
+    def add_line(self, line: CartLine) -> int:
+        line_no = self.next_line_no
+        self.next_line_no += 1
+        self.lines[line_no] = line
+        return line_no
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat()
+        data["lines"] = {str(n): {**asdict(l), "updated_at": l.updated_at.isoformat()} for n, l in self.lines.items()}
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "CartState":
+        data = json.loads(raw)
+        lines = {
+            int(n): CartLine(**{**l, "updated_at": datetime.fromisoformat(l["updated_at"])})
+            for n, l in data.pop("lines").items()
+        }
+        data.setdefault("next_line_no", max(lines, default=0) + 1)
+        return cls(**{**data, "created_at": datetime.fromisoformat(data["created_at"]), "lines": lines})
+
+class MemoryCartBackend:
+    """
+    In-process LRU of carts keyed by user id, holding at most `max_carts` of them. Only carts
+    already written to the database are evicted; per-user locks are striped over `lock_stripes`
+    mutexes. Carts are per process, so multi-worker deployments should use the Redis backend.
+    """
+
+    def __init__(self, max_carts: int = 10000, lock_stripes: int = 64):
+        self.max_carts = max_carts
+        self._carts: OrderedDict[int, CartState] = OrderedDict()
+        self._guard = threading.Lock()
+        self._locks = [threading.Lock() for _ in range(lock_stripes)]
+
+    def lock(self, user_id: int):
+        return self._locks[user_id % len(self._locks)]
+
+    def get(self, user_id: int) -> CartState | None:
+        with self._guard:
+            state = self._carts.get(user_id)
+            if state is not None:
+                self._carts.move_to_end(user_id)
+            return state
+
+    def put(self, user_id: int, state: CartState) -> None:
+        with self._guard:
+            self._carts[user_id] = state
+            self._carts.move_to_end(user_id)
+            if len(self._carts) > self.max_carts:
+                clean = [uid for uid, s in self._carts.items() if not s.dirty][: len(self._carts) - self.max_carts]
+                for uid in clean:
+                    del self._carts[uid]
+
+    def discard(self, user_id: int) -> None:
+        with self._guard:
+            self._carts.pop(user_id, None)
+
+    def dirty_users(self) -> list[int]:
+        with self._guard:
+            return [uid for uid, s in self._carts.items() if s.dirty]
+
+class RedisCartBackend:
+    """
+    Carts as JSON strings in a Redis-compatible server, shared by every app process. Dirty carts
+    are tracked in a set; clean ones expire after CART_TTL_HOURS. `client` needs get/set/delete,
+    sadd/srem/smembers and lock, e.g. a `redis.Redis`.
+    """
+
+    DIRTY_KEY = "cart:dirty"
+
+    def __init__(self, client, lock_timeout_seconds: float = 10.0):
+        self.client = client
+        self.lock_timeout_seconds = lock_timeout_seconds
+
+    def lock(self, user_id: int):
+        return self.client.lock(f"cart:lock:{user_id}", timeout=self.lock_timeout_seconds)
+
+    def get(self, user_id: int) -> CartState | None:
+        raw = self.client.get(f"cart:{user_id}")
+        return CartState.from_json(raw) if raw is not None else None
+
+    def put(self, user_id: int, state: CartState) -> None:
+        ttl = None if state.dirty else int(settings.CART_TTL_HOURS * 3600) or None
+        self.client.set(f"cart:{user_id}", state.to_json(), ex=ttl)
+        if state.dirty:
+            self.client.sadd(self.DIRTY_KEY, user_id)
+        else:
+            self.client.srem(self.DIRTY_KEY, user_id)
+
+    def discard(self, user_id: int) -> None:
+        self.client.delete(f"cart:{user_id}")
+        self.client.srem(self.DIRTY_KEY, user_id)
+
+    def dirty_users(self) -> list[int]:
+        return [int(uid) for uid in self.client.smembers(self.DIRTY_KEY)]
+
+class CartStore:
+    """
+    Cart reads and writes against a backend, with the database as the store of record.
+
+    A cart is loaded from carts/cart_items on first use; after that adds, updates and removals
+    only touch the backend and mark the cart dirty. Dirty carts are written back, replacing the
+    cart's cart_items rows, by `flush_dirty` (on a timer) and by `checkout` (in the order's
+    transaction), so a burst of clicks costs one write.
+    """
+
+    def __init__(self, backend, session_factory=SessionLocal):
+        self.backend = backend
+        self.session_factory = session_factory
+
+    def _load(self, user_id: int) -> CartState:
+        state = self.backend.get(user_id)
+        if state is not None:
+            return state
+        with self.session_factory() as db:
+            cart = db.query(Cart).filter(Cart.user_id == user_id).first()
+            if not cart:
+                cart = Cart(user_id=user_id)
+                db.add(cart)
+                db.commit()
+                db.refresh(cart)
+            state = CartState(cart_id=cart.id, user_id=user_id, created_at=cart.created_at, next_line_no=cart.next_line_no or 1)
+            rows = (
+                db.query(CartItem.line_no, CartItem.item_id, Item.cafe_id, CartItem.quantity, CartItem.assignee_user_id, CartItem.updated_at)
+                .join(Item, Item.id == CartItem.item_id)
+                .filter(CartItem.cart_id == cart.id)
+                .order_by(CartItem.id)
+                .all()
+            )
+        for r in rows:
+            line = CartLine(r.item_id, r.cafe_id, r.quantity or 1, r.assignee_user_id or user_id, r.updated_at or datetime.utcnow())
+            if r.line_no and r.line_no not in state.lines:
+                state.lines[r.line_no] = line
+                state.next_line_no = max(state.next_line_no, r.line_no + 1)
+            else:
+                state.add_line(line)
+        self.backend.put(user_id, state)
+        return state
+
+    def get(self, user_id: int) -> CartState:
+        """
+        A copy of the user's cart (loading or creating it if needed), taken under its lock so
+        readers never see a `mutate` half done; changes to the copy are not kept.
+        """
+        with self.backend.lock(user_id):
+            state = self._load(user_id)
+            return replace(state, lines={n: replace(line) for n, line in state.lines.items()})
+
+    @contextmanager
+    def mutate(self, user_id: int):
+        """
+        Yield the user's cart under its lock for changes; they are kept and the cart marked dirty
+        when the block exits normally. Validate before changing anything: on an exception the
+        in-process backend may still hold partial changes.
+        """
+        with self.backend.lock(user_id):
+            state = self._load(user_id)
+            yield state
+            state.dirty = True
+            self.backend.put(user_id, state)
+
+    def write_back(self, db: Session, state: CartState) -> None:
+        """Replace the cart's cart_items rows with its current lines in `db`'s transaction (not committed)."""
+        cart = db.get(Cart, state.cart_id)
+        if cart is None:
+            # Expired by the sweeper while only the store had the cart's latest lines
+            cart = Cart(user_id=state.user_id, created_at=state.created_at)
+            db.add(cart)
+            db.flush()
+            state.cart_id = cart.id
+        cart.next_line_no = state.next_line_no
+        db.execute(delete(CartItem).where(CartItem.cart_id == state.cart_id))
+        if state.lines:
+            db.execute(insert(CartItem), [
+                {"cart_id": state.cart_id, "line_no": n, "item_id": l.item_id, "quantity": l.quantity,
+                 "assignee_user_id": l.assignee_user_id, "updated_at": l.updated_at}
+                for n, l in state.lines.items()
+            ])
+
+    @contextmanager
+    def checkout(self, db: Session, user_id: int):
+        """
+        Hold the user's cart for an order: its lines are written back into `db`'s transaction so
+        the order can be priced from cart_items. When the block exits normally (after the caller
+        committed) the store's copy is emptied; on an exception it is left as it was.
+        """
+        with self.backend.lock(user_id):
+            state = self._load(user_id)
+            if state.dirty:
+                self.write_back(db, state)
+            yield state
+            state.lines.clear()
+            state.dirty = False
+            self.backend.put(user_id, state)
+
+    def discard(self, user_id: int) -> None:
+        """Drop a cart from the backend unless it has changes not yet written back."""
+        with self.backend.lock(user_id):
+            state = self.backend.get(user_id)
+            if state is not None and not state.dirty:
+                self.backend.discard(user_id)
+
+    def flush_dirty(self) -> int:
+        """Write every dirty cart back, one transaction each. Returns how many were written."""
+        flushed = 0
+        for user_id in self.backend.dirty_users():
+            with self.backend.lock(user_id):
+                state = self.backend.get(user_id)
+                if state is None or not state.dirty:
+                    continue
+                with self.session_factory() as db:
+                    self.write_back(db, state)
+                    db.commit()
+                state.dirty = False
+                self.backend.put(user_id, state)
+                flushed += 1
+        return flushed
+
+# Columns the cart store added to carts/cart_items, as (table, column, DDL type)
+_CART_COLUMNS = (
+    ("carts", "next_line_no", "INTEGER DEFAULT 1"),
+    ("cart_items", "updated_at", "TIMESTAMP"),
+    ("cart_items", "line_no", "INTEGER"),
+)
+
+def ensure_cart_columns(conn: Connection) -> None:
+    """
+    Add the cart store's columns to carts/cart_items tables created before it, numbering the
+    existing lines of each cart in insertion order and starting its line counter after them.
+    Safe to run on every startup.
+    """
+    inspector = inspect(conn)
+    existing = {t: {c["name"] for c in inspector.get_columns(t)} for t in ("carts", "cart_items")}
+    added = set()
+    for table, name, ddl in _CART_COLUMNS:
+        if name not in existing[table]:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+            added.add(name)
+    if "line_no" in added:
+        numbered: dict[int, int] = {}
+        updates = []
+        for row_id, cart_id in conn.execute(text("SELECT id, cart_id FROM cart_items ORDER BY cart_id, id")):
+            numbered[cart_id] = numbered.get(cart_id, 0) + 1
+            updates.append({"id": row_id, "line_no": numbered[cart_id]})
+        if updates:
+            conn.execute(text("UPDATE cart_items SET line_no = :line_no WHERE id = :id"), updates)
+    if added & {"line_no", "next_line_no"}:
+        conn.execute(text(
+            "UPDATE carts SET next_line_no = "
+            "COALESCE((SELECT MAX(line_no) FROM cart_items WHERE cart_items.cart_id = carts.id), 0) + 1"
+        ))
+
+def _backend_from_settings():
+    if settings.CART_STORE_BACKEND == "redis":
+        import redis  # optional dependency, only needed for this backend
+        return RedisCartBackend(redis.Redis.from_url(settings.CART_STORE_REDIS_URL))
+    return MemoryCartBackend(max_carts=settings.CART_STORE_MAX_CARTS)
+
+cart_store = CartStore(_backend_from_settings())
+"""Process-wide cart store used by the cart and order routers."""
+
+async def cart_flush_loop(interval_seconds: float) -> None:
+    """Write dirty carts back every `interval_seconds` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            flushed = await asyncio.to_thread(cart_store.flush_dirty)
+        except Exception:
+            logger.exception("Cart flush failed")
+            continue
+        if flushed:
+            logger.info("Cart flush: %d carts written", flushed)
@@ -0,0 +1,152 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Batch dispatcher: matches all pending orders to idle drivers with a min-cost assignment."""
+import asyncio
+import logging
+import numpy as np
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Order, OrderStatus, Cafe, User, Role, DriverCurrentState, DriverStatus
+from .driver import calculate_distance_matrix, claim_driver_for_order
+
+logger = logging.getLogger(__name__)
+
+def solve_assignment(cost) -> list[tuple[int, int]]:
+    """
+    Solve the rectangular min-cost assignment problem with the Hungarian algorithm
+    (shortest augmenting paths with potentials, vectorized over columns).
+    Returns (row, col) pairs; every row is matched when rows <= cols, otherwise every col.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 2 or cost.size == 0:
+        return []
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)    # p[j]: row (1-based) matched to column j, 0 if free
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+            used_cols = np.nonzero(used)[0]
+            u[p[used_cols]] += delta
+            v[used_cols] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    pairs = [(int(p[j]) - 1, j - 1) for j in range(1, m + 1) if p[j]]
+    if transposed:
+        pairs = [(c, r) for r, c in pairs]
+    return sorted(pairs)
+
+def _candidate_columns(dist: np.ndarray, per_row: int) -> np.ndarray:
+    """Columns that are among some row's `per_row` nearest; keeps the solve small when drivers far outnumber orders."""
+    n, m = dist.shape
+    if m <= per_row or n * per_row >= m:
+        return np.arange(m)
+    nearest = np.argpartition(dist, per_row - 1, axis=1)[:, :per_row]
+    cols = np.unique(nearest)
+    if len(cols) < n:
+        return np.arange(m)
+    return cols
+
+def dispatch_pending_orders(db: Session, max_distance_km: float | None = None) -> list[dict]:
+    """
+    Assign every unassigned ACCEPTED/READY order to an idle driver so that the total
+    cafe-to-driver distance is minimal, and commit all assignments in one transaction.
+    Orders left over (more orders than drivers, or no driver within `max_distance_km`)
+    stay unassigned for the next tick. Returns one dict per assignment made.
+    """
+    if max_distance_km is None:
+        max_distance_km = settings.DISPATCH_MAX_DISTANCE_KM
+    orders = (
+        db.query(Order, Cafe.lat, Cafe.lng)
+        .join(Cafe, Cafe.id == Order.cafe_id)
+        .filter(Order.driver_id.is_(None), Order.status.in_([OrderStatus.ACCEPTED, OrderStatus.READY]))
+        .order_by(Order.created_at, Order.id)
+        .limit(settings.DISPATCH_MAX_BATCH)
+        .all()
+    )
+    if not orders:
+        return []
+    drivers = (
+        db.query(DriverCurrentState)
+        .join(User, User.id == DriverCurrentState.driver_id)
+        .filter(User.role == Role.DRIVER, DriverCurrentState.status == DriverStatus.IDLE)
+        .all()
+    )
+    if not drivers:
+        return []
+
+    dist = calculate_distance_matrix(
+        [lat for _, lat, _ in orders], [lng for _, _, lng in orders],
+        [d.lat for d in drivers], [d.lng for d in drivers],
+    )
+    cols = _candidate_columns(dist, settings.DISPATCH_CANDIDATES_PER_ORDER)
+    sub = dist[:, cols]
+    # Out-of-range pairs get a prohibitive but finite cost so the solver stays well-defined
+    cost = np.where(sub <= max_distance_km, sub, 1e9) if max_distance_km > 0 else sub
+
+    assignments = []
+    for row, col in solve_assignment(cost):
+        distance = float(sub[row, col])
+        if max_distance_km > 0 and distance > max_distance_km:
+            continue
+        order_id = orders[row][0].id
+        driver_id = drivers[int(cols[col])].driver_id
+        # A manual assignment may have taken the order or driver since they were read
+        if claim_driver_for_order(order_id, driver_id, db, commit=False):
+            assignments.append({"order_id": order_id, "driver_id": driver_id, "distance_km": distance})
+    db.commit()
+    return assignments
+
+def run_dispatch_tick() -> list[dict]:
+    """Run one batch dispatch in its own session; errors are logged and roll back the whole batch."""
+    db = SessionLocal()
+    try:
+        return dispatch_pending_orders(db)
+    except Exception:
+        logger.exception("Batch dispatch tick failed")
+        db.rollback()
+        return []
+    finally:
+        db.close()
+
+async def dispatch_loop(interval_seconds: float) -> None:
+    """Run batch dispatch every `interval_seconds` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        assignments = await asyncio.to_thread(run_dispatch_tick)
+        if assignments:
+            logger.info("Batch dispatch assigned %d orders", len(assignments))
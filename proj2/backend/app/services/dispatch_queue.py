@@ -0,0 +1,193 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Greedy dispatch off the request path: an in-process queue of "find this order a driver" jobs."""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Order, OrderStatus, Cafe
+from .driver import claim_nearest_idle_driver
+from .pubsub import hub, order_topic, cafe_topic
+
+logger = logging.getLogger(__name__)
+
+ASSIGNED = "assigned"
+SKIPPED = "skipped"
+RETRY = "retry"
+
+def assign_nearest_driver(order_id: int, db: Session) -> str:
+    """
+    Claim the nearest idle driver for an order that still needs one.
+    Returns ASSIGNED, SKIPPED (order gone, already assigned or no longer ACCEPTED/READY)
+    or RETRY (no driver could be claimed right now).
+    """
+    row = (
+        db.query(Order.driver_id, Order.status, Cafe.lat, Cafe.lng)
+        .join(Cafe, Cafe.id == Order.cafe_id)
+        .filter(Order.id == order_id)
+        .first()
+    )
+    if row is None or row.driver_id is not None or row.status not in (OrderStatus.ACCEPTED, OrderStatus.READY):
+        return SKIPPED
+    return ASSIGNED if claim_nearest_idle_driver(order_id, row.lat, row.lng, db) else RETRY
+
+@dataclass
+class DispatchJob:
+    order_id: int
+    cafe_id: int
+    attempt: int = 1
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+class DispatchQueue:
+    """
+    Runs assign_nearest_driver for enqueued orders on `workers` asyncio tasks, each job in a
+    worker thread with its own session. Jobs that find no driver (or fail) are retried with
+    exponential backoff, up to `max_attempts`; an order gets at most one job in the queue at a
+    time. The assignment itself is published by the driver claim; giving up publishes
+    `dispatch_failed` on the order and cafe topics.
+    """
+
+    def __init__(self, session_factory=SessionLocal, workers: int = 2, max_attempts: int = 5,
+                 backoff_seconds: float = 1.0, max_backoff_seconds: float = 30.0, samples: int = 1000):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._lock = threading.Lock()
+        self._pending: set[int] = set()
+        self._waiting_retry = 0
+        self._in_flight = 0
+        self._counts = {"enqueued": 0, "assigned": 0, "skipped": 0, "retried": 0, "failed": 0}
+        self._time_to_assign = deque(maxlen=samples)
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued and scheduled jobs are dropped."""
+        loop, self._loop = self._loop, None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        with self._lock:
+            self._pending.clear()
+            self._waiting_retry = 0
+
+    def enqueue(self, order_id: int, cafe_id: int) -> bool:
+        """
+        Queue a dispatch job for an order; safe to call from any thread. Returns False when the
+        queue is not running (the caller should assign inline), True otherwise, including when
+        the order already has a job queued.
+        """
+        loop = self._loop
+        if loop is None:
+            return False
+        with self._lock:
+            if order_id in self._pending:
+                return True
+            self._pending.add(order_id)
+            self._counts["enqueued"] += 1
+        loop.call_soon_threadsafe(self._queue.put_nowait, DispatchJob(order_id, cafe_id))
+        return True
+
+    def _run_job(self, job: DispatchJob) -> str:
+        with self.session_factory() as db:
+            return assign_nearest_driver(job.order_id, db)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            with self._lock:
+                self._in_flight += 1
+            try:
+                outcome = await asyncio.to_thread(self._run_job, job)
+            except Exception:
+                logger.exception("Dispatch job for order %d failed", job.order_id)
+                outcome = RETRY
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+            self._finish(job, outcome)
+
+    def _finish(self, job: DispatchJob, outcome: str) -> None:
+        if outcome == RETRY and job.attempt < self.max_attempts and self._loop is not None:
+            delay = min(self.backoff_seconds * 2 ** (job.attempt - 1), self.max_backoff_seconds)
+            job.attempt += 1
+            with self._lock:
+                self._counts["retried"] += 1
+                self._waiting_retry += 1
+            self._loop.call_later(delay, self._requeue, job)
+            return
+        with self._lock:
+            self._pending.discard(job.order_id)
+            if outcome == ASSIGNED:
+                self._counts["assigned"] += 1
+                self._time_to_assign.append(time.monotonic() - job.enqueued_at)
+            elif outcome == SKIPPED:
+                self._counts["skipped"] += 1
+            else:
+                self._counts["failed"] += 1
+        if outcome == RETRY:
+            logger.warning("Gave up dispatching order %d after %d attempts", job.order_id, job.attempt)
+            data = {"order_id": job.order_id, "cafe_id": job.cafe_id, "attempts": job.attempt}
+            hub.publish(order_topic(job.order_id), "dispatch_failed", data)
+            hub.publish(cafe_topic(job.cafe_id), "dispatch_failed", data)
+
+    def _requeue(self, job: DispatchJob) -> None:
+        with self._lock:
+            self._waiting_retry -= 1
+        if self._loop is not None:
+            self._queue.put_nowait(job)
+
+    def metrics(self) -> dict:
+        """Queue depth, job outcome counts and time-to-assign percentiles (seconds) over recent assignments."""
+        with self._lock:
+            samples = np.array(self._time_to_assign)
+            report = {
+                "running": self.running,
+                "queued": self._queue.qsize() if self._queue is not None else 0,
+                "waiting_retry": self._waiting_retry,
+                "in_flight": self._in_flight,
+                **self._counts,
+            }
+        report["time_to_assign"] = {
+            "samples": int(samples.size),
+            **({f"p{q}": float(np.percentile(samples, q)) for q in (50, 95, 99)} if samples.size else {}),
+            "max": float(samples.max()) if samples.size else None,
+        }
+        return report
+
+dispatch_queue = DispatchQueue(
+    workers=settings.DISPATCH_QUEUE_WORKERS,
+    max_attempts=settings.DISPATCH_QUEUE_MAX_ATTEMPTS,
+    backoff_seconds=settings.DISPATCH_QUEUE_BACKOFF_SECONDS,
+    max_backoff_seconds=settings.DISPATCH_QUEUE_MAX_BACKOFF_SECONDS,
+)
+"""Process-wide dispatch queue, started by the app lifespan in greedy dispatch mode."""
@@ -1,166 +1,421 @@
-# Copyright (c) 2025 Group 2
-# All rights reserved.
-# 
-# This project and its source code are the property of Group 2:
-# - Aryan Tapkire
-# - Dilip Irala Narasimhareddy
-# - Sachi Vyas
-# - Supraj Gijre
-
-import math
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from ..models import DriverLocation, User, Role, Order, DriverStatus
-
-def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    """
-    Calculate the distance between two points using the Haversine formula.
-    Returns distance in kilometers.
-    """
-    # Radius of the Earth in kilometers
-    R = 6371.0
-    
-    # Convert latitude and longitude from degrees to radians
-    lat1_rad = math.radians(lat1)
-    lng1_rad = math.radians(lng1)
-    lat2_rad = math.radians(lat2)
-    lng2_rad = math.radians(lng2)
-    
-    # Differences in coordinates
-    dlat = lat2_rad - lat1_rad
-    dlng = lng2_rad - lng1_rad
-    
-    # Haversine formula
-    a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlng / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    
-    # Distance in kilometers
-    distance = R * c
-    
-    return distance
-
-def get_latest_driver_location(driver_id: int, db: Session) -> DriverLocation | None:
-    """
-    Get the most recent location for a driver.
-    """
-    return db.query(DriverLocation).filter(
-        DriverLocation.driver_id == driver_id
-    ).order_by(DriverLocation.timestamp.desc()).first()
-
-def find_nearest_idle_driver(cafe_lat: float, cafe_lng: float, db: Session) -> tuple[User, float] | None:
-    """
-    Find the nearest idle driver to a cafe location.
-    Returns (driver_user, distance_in_km) or None if no idle drivers found.
-    """
-    # Get all drivers
-    drivers = db.query(User).filter(User.role == Role.DRIVER).all()
-    
-    if not drivers:
-        return None
-    
-    nearest_driver = None
-    min_distance = float('inf')
-    
-    for driver in drivers:
-        # Get the latest location for this driver
-        latest_location = get_latest_driver_location(driver.id, db)
-        
-        if not latest_location:
-            continue
-        
-        # Check if driver is idle
-        if latest_location.status != DriverStatus.IDLE:
-            continue
-        
-        # Calculate distance
-        distance = calculate_distance(cafe_lat, cafe_lng, latest_location.lat, latest_location.lng)
-        
-        if distance < min_distance:
-            min_distance = distance
-            nearest_driver = driver
-    
-    if nearest_driver is None:
-        return None
-    
-    return (nearest_driver, min_distance)
-
-def get_driver_current_location(driver_id: int, db: Session) -> DriverLocation | None:
-    """
-    Get the current location and status of a driver.
-    """
-    return db.query(DriverLocation).filter(
-        DriverLocation.driver_id == driver_id
-    ).order_by(DriverLocation.timestamp.desc()).first()
-
-def update_driver_status_to_occupied(driver_id: int, db: Session) -> DriverLocation | None:
-    """
-    Update the driver's status to OCCUPIED when they take an order.
-    Creates a new location record with OCCUPIED status.
-    """
-    latest_location = get_latest_driver_location(driver_id, db)
-    
-    if not latest_location:
-        return None
-    
-    # Create new location record with OCCUPIED status
-    new_location = DriverLocation(
-        driver_id=driver_id,
-        lat=latest_location.lat,
-        lng=latest_location.lng,
-        status=DriverStatus.OCCUPIED
-    )
-    db.add(new_location)
-    db.commit()
-    db.refresh(new_location)
-    
-    return new_location
-
-def update_driver_status_to_idle(driver_id: int, db: Session) -> DriverLocation | None:
-    """
-    Update the driver's status to IDLE when they complete a delivery.
-    Creates a new location record with IDLE status.
-    """
-    latest_location = get_latest_driver_location(driver_id, db)
-    
-    if not latest_location:
-        return None
-    
-    # Create new location record with IDLE status
-    new_location = DriverLocation(
-        driver_id=driver_id,
-        lat=latest_location.lat,
-        lng=latest_location.lng,
-        status=DriverStatus.IDLE
-    )
-    db.add(new_location)
-    db.commit()
-    db.refresh(new_location)
-    
-    return new_location
-
-def get_idle_drivers_with_locations(db: Session) -> list[dict]:
-    """
-    Get all idle drivers with their current locations.
-    Returns list of dictionaries with driver info and location.
-    """
-    # Get all drivers
-    drivers = db.query(User).filter(User.role == Role.DRIVER).all()
-    
-    idle_drivers = []
-    
-    for driver in drivers:
-        latest_location = get_latest_driver_location(driver.id, db)
-        
-        if latest_location and latest_location.status == DriverStatus.IDLE:
-            idle_drivers.append({
-                'driver_id': driver.id,
-                'driver_name': driver.name,
-                'driver_email': driver.email,
-                'lat': latest_location.lat,
-                'lng': latest_location.lng,
-                'status': latest_location.status.value,
-                'last_update': latest_location.timestamp
-            })
-    
-    return idle_drivers
-
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+# 
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import math
+import threading
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy import func, event, insert
+from sqlalchemy.exc import OperationalError
+from ..models import DriverLocation, DriverCurrentState, User, Role, Order, DriverStatus
+from .spatial import GeoGridIndex, haversine_km_array, haversine_km_matrix
+from .pubsub import hub, publish_after_commit, driver_topic, order_topic, cafe_topic
+from .order_events import record_order_event
+import numpy as np
+
+idle_driver_index = GeoGridIndex()
+"""Process-wide spatial index of IDLE drivers, keyed by driver id."""
+
+_index_lock = threading.Lock()
+_index_loaded = False
+_index_seen: dict[int, datetime] = {}
+
+def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Calculate the distance between two points using the Haversine formula.
+    Returns distance in kilometers.
+    """
+    # Radius of the Earth in kilometers
+    R = 6371.0
+    
+    # Convert latitude and longitude from degrees to radians
+    lat1_rad = math.radians(lat1)
+    lng1_rad = math.radians(lng1)
+    lat2_rad = math.radians(lat2)
+    lng2_rad = math.radians(lng2)
+    
+    # Differences in coordinates
+    dlat = lat2_rad - lat1_rad
+    dlng = lng2_rad - lng1_rad
+    
+    # Haversine formula
+    a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlng / 2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    
+    # Distance in kilometers
+    distance = R * c
+    
+    return distance
+
+def calculate_distances(lat: float, lng: float, lats, lngs) -> np.ndarray:
+    """
+    Vectorized calculate_distance: Haversine distances in kilometers from one point
+    to every point in the `lats`/`lngs` arrays, computed in a single NumPy call.
+    """
+    return haversine_km_array(lat, lng, lats, lngs)
+
+def calculate_distance_matrix(from_lats, from_lngs, to_lats, to_lngs) -> np.ndarray:
+    """
+    Many-to-many Haversine distances in kilometers, e.g. cafes x drivers.
+    Returns an array of shape (len(from_lats), len(to_lats)).
+    """
+    return haversine_km_matrix(from_lats, from_lngs, to_lats, to_lngs)
+
+def get_latest_driver_location(driver_id: int, db: Session) -> DriverCurrentState | None:
+    """
+    Get the most recent location for a driver.
+    Reads the one-row-per-driver current state rather than the location history.
+    """
+    return db.query(DriverCurrentState).filter(DriverCurrentState.driver_id == driver_id).first()
+
+def _to_naive_utc(ts: datetime | None) -> datetime:
+    """Normalize a timestamp to naive UTC so client-supplied and server-side times compare."""
+    if ts is None:
+        return datetime.utcnow()
+    if ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+def index_driver_location(driver_id: int, lat: float, lng: float, status: DriverStatus, timestamp: datetime | None = None) -> None:
+    """
+    Apply a driver location/status write to the idle-driver index.
+    Writes older than the newest one already seen for the driver are ignored, matching
+    the ORDER BY timestamp DESC semantics of get_latest_driver_location.
+    """
+    ts = _to_naive_utc(timestamp)
+    with _index_lock:
+        seen = _index_seen.get(driver_id)
+        if seen is not None and ts < seen:
+            return
+        _index_seen[driver_id] = ts
+        if status == DriverStatus.IDLE:
+            idle_driver_index.insert(driver_id, lat, lng)
+        else:
+            idle_driver_index.remove(driver_id)
+
+def _ensure_driver_index_loaded(db: Session) -> None:
+    """Populate the idle-driver index from the current-state table on first use."""
+    global _index_loaded
+    if _index_loaded:
+        return
+    rows = (
+        db.query(DriverCurrentState)
+        .join(User, User.id == DriverCurrentState.driver_id)
+        .filter(User.role == Role.DRIVER, DriverCurrentState.status == DriverStatus.IDLE)
+        .all()
+    )
+    for state in rows:
+        index_driver_location(state.driver_id, state.lat, state.lng, state.status, state.timestamp)
+    _index_loaded = True
+
+def reset_driver_index() -> None:
+    """Forget all indexed drivers; the index is rebuilt from the database on next use."""
+    global _index_loaded
+    with _index_lock:
+        idle_driver_index.clear()
+        _index_seen.clear()
+        _index_loaded = False
+
+def _load_current_states(session: Session, driver_ids) -> dict[int, DriverCurrentState]:
+    """Fetch the current-state rows for a set of drivers in one query, keyed by driver id."""
+    ids = set(driver_ids)
+    if not ids:
+        return {}
+    rows = session.query(DriverCurrentState).filter(DriverCurrentState.driver_id.in_(ids)).all()
+    return {state.driver_id: state for state in rows}
+
+def _apply_current_state(session: Session, states: dict[int, DriverCurrentState], driver_id: int, lat: float, lng: float, status: DriverStatus, ts: datetime) -> bool:
+    """
+    Move a driver's current state to a new location/status unless it is already newer.
+    Creates the state row when missing; returns whether the state changed.
+    """
+    state = states.get(driver_id)
+    if state is None:
+        state = DriverCurrentState(driver_id=driver_id)
+        session.add(state)
+        states[driver_id] = state
+    elif state.timestamp is not None and ts < state.timestamp:
+        # Late-arriving history row; the current state is already newer
+        return False
+    state.lat = lat
+    state.lng = lng
+    state.status = status
+    state.timestamp = ts
+    return True
+
+@event.listens_for(Session, "before_flush")
+def _sync_driver_current_state(session: Session, flush_context, instances) -> None:
+    """
+    Upsert driver_current_state for every DriverLocation about to be inserted, in the same
+    transaction, and stage the change for the idle-driver index until the commit lands.
+    """
+    locations = [obj for obj in session.new if isinstance(obj, DriverLocation)]
+    if not locations:
+        return
+    staged = session.info.setdefault("driver_index_updates", [])
+    with session.no_autoflush:
+        states = _load_current_states(session, (loc.driver_id for loc in locations))
+        for loc in sorted(locations, key=lambda l: _to_naive_utc(l.timestamp)):
+            if loc.timestamp is None:
+                loc.timestamp = datetime.utcnow()
+            if loc.status is None:
+                loc.status = DriverStatus.IDLE
+            ts = _to_naive_utc(loc.timestamp)
+            if _apply_current_state(session, states, loc.driver_id, loc.lat, loc.lng, loc.status, ts):
+                staged.append((loc.driver_id, loc.lat, loc.lng, loc.status, ts))
+
+def ingest_driver_locations(points, db: Session) -> int:
+    """
+    Record many driver location points in one transaction.
+
+    `points` are objects with driver_id, lat, lng and optional timestamp/status (see
+    DriverLocationPoint). History rows go in with a single bulk INSERT, and each driver's
+    current state is updated once, to its newest point. A point without a status keeps the
+    driver's current status (IDLE for a driver with no state yet), so replaying an offline
+    buffer never frees an OCCUPIED driver. Returns the number of points written.
+    """
+    entries = sorted(
+        ((p.driver_id, p.lat, p.lng, p.status, _to_naive_utc(p.timestamp)) for p in points),
+        key=lambda e: e[4],
+    )
+    if not entries:
+        return 0
+    staged = db.info.setdefault("driver_index_updates", [])
+    rows = []
+    with db.no_autoflush:
+        states = _load_current_states(db, (e[0] for e in entries))
+        for driver_id, lat, lng, status, ts in entries:
+            if status is None:
+                state = states.get(driver_id)
+                status = state.status if state is not None else DriverStatus.IDLE
+            rows.append({"driver_id": driver_id, "lat": lat, "lng": lng, "timestamp": ts, "status": status})
+            if _apply_current_state(db, states, driver_id, lat, lng, status, ts):
+                staged.append((driver_id, lat, lng, status, ts))
+    db.execute(insert(DriverLocation), rows)
+    db.commit()
+    return len(rows)
+
+@event.listens_for(Session, "after_commit")
+def _apply_driver_index_updates(session: Session) -> None:
+    for update in session.info.pop("driver_index_updates", []):
+        index_driver_location(*update)
+        driver_id, lat, lng, status, ts = update
+        hub.publish(driver_topic(driver_id), "location", {"driver_id": driver_id, "lat": lat, "lng": lng, "status": status, "timestamp": ts})
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_driver_index_updates(session: Session, previous_transaction) -> None:
+    session.info.pop("driver_index_updates", None)
+
+def backfill_driver_current_state(db: Session) -> int:
+    """
+    Create missing driver_current_state rows from each driver's latest DriverLocation.
+    Used once at startup for databases that predate the current-state table; returns rows created.
+    """
+    latest = (
+        db.query(DriverLocation.driver_id, func.max(DriverLocation.timestamp).label("ts"))
+        .group_by(DriverLocation.driver_id)
+        .subquery()
+    )
+    rows = (
+        db.query(DriverLocation)
+        .join(latest, (DriverLocation.driver_id == latest.c.driver_id) & (DriverLocation.timestamp == latest.c.ts))
+        .outerjoin(DriverCurrentState, DriverCurrentState.driver_id == DriverLocation.driver_id)
+        .filter(DriverCurrentState.driver_id.is_(None))
+        .order_by(DriverLocation.id)
+        .all()
+    )
+    states: dict[int, DriverCurrentState] = {}
+    for loc in rows:
+        # Ties on timestamp resolve to the highest id, i.e. the last row written
+        states[loc.driver_id] = DriverCurrentState(driver_id=loc.driver_id, lat=loc.lat, lng=loc.lng, status=loc.status, timestamp=loc.timestamp)
+    db.add_all(states.values())
+    db.commit()
+    return len(states)
+
+def find_nearest_idle_driver(cafe_lat: float, cafe_lng: float, db: Session) -> tuple[User, float] | None:
+    """
+    Find the nearest idle driver to a cafe location.
+    Returns (driver_user, distance_in_km) or None if no idle drivers found.
+
+    Candidates come from the in-process idle-driver index, searched outward ring by ring
+    from the cafe (falling back to one vectorized distance pass when the rings outgrow the
+    occupied cells); each candidate is confirmed against the database before it is returned
+    so a stale index entry can never hand out an occupied driver.
+    """
+    _ensure_driver_index_loaded(db)
+    rejected: set[int] = set()
+    while True:
+        hit = idle_driver_index.nearest(cafe_lat, cafe_lng, exclude=rejected)
+        if hit is None:
+            return None
+        driver_id, distance = hit
+        driver = db.query(User).filter(User.id == driver_id, User.role == Role.DRIVER).first()
+        latest_location = get_latest_driver_location(driver_id, db) if driver else None
+        if not driver or not latest_location:
+            rejected.add(driver_id)
+            continue
+        position = (latest_location.lat, latest_location.lng)
+        if latest_location.status != DriverStatus.IDLE or idle_driver_index.position(driver_id) != position:
+            # The index lagged a write made elsewhere: apply what we read, under the index lock and
+            # unless a newer write has already been indexed, then search again. If the index still
+            # disagrees, our read is the stale one, so skip the driver this time
+            index_driver_location(driver_id, *position, latest_location.status, latest_location.timestamp)
+            if latest_location.status != DriverStatus.IDLE or idle_driver_index.position(driver_id) != position:
+                rejected.add(driver_id)
+            continue
+        return (driver, distance)
+
+def get_driver_current_location(driver_id: int, db: Session) -> DriverCurrentState | None:
+    """
+    Get the current location and status of a driver.
+    """
+    return get_latest_driver_location(driver_id, db)
+
+def update_driver_status_to_occupied(driver_id: int, db: Session) -> DriverLocation | None:
+    """
+    Update the driver's status to OCCUPIED when they take an order.
+    Creates a new location record with OCCUPIED status.
+    """
+    latest_location = get_latest_driver_location(driver_id, db)
+    
+    if not latest_location:
+        return None
+    
+    # Create new location record with OCCUPIED status
+    new_location = DriverLocation(
+        driver_id=driver_id,
+        lat=latest_location.lat,
+        lng=latest_location.lng,
+        status=DriverStatus.OCCUPIED
+    )
+    db.add(new_location)
+    db.commit()
+    db.refresh(new_location)
+    
+    return new_location
+
+def update_driver_status_to_idle(driver_id: int, db: Session) -> DriverLocation | None:
+    """
+    Update the driver's status to IDLE when they complete a delivery.
+    Creates a new location record with IDLE status.
+    """
+    latest_location = get_latest_driver_location(driver_id, db)
+    
+    if not latest_location:
+        return None
+    
+    # Create new location record with IDLE status
+    new_location = DriverLocation(
+        driver_id=driver_id,
+        lat=latest_location.lat,
+        lng=latest_location.lng,
+        status=DriverStatus.IDLE
+    )
+    db.add(new_location)
+    db.commit()
+    db.refresh(new_location)
+    
+    return new_location
+
+def claim_driver_for_order(order_id: int, driver_id: int, db: Session, commit: bool = True) -> bool:
+    """
+    Atomically attach an IDLE driver to an order that has no driver yet.
+
+    Both checks are conditional UPDATEs (order.driver_id IS NULL, driver state IDLE), so two
+    concurrent claims can never both succeed: on Postgres the loser blocks on the row lock and
+    then matches zero rows, on SQLite the database write lock serializes them the same way.
+    On success the driver is marked OCCUPIED (with a history row) and, if `commit`, the
+    transaction is committed. On failure nothing is changed: with `commit` the transaction
+    is rolled back, without it the order claim is reverted in place so a caller batching
+    several claims into one transaction can carry on.
+    """
+    try:
+        claimed_order = db.query(Order).filter(Order.id == order_id, Order.driver_id.is_(None)).update(
+            {Order.driver_id: driver_id}, synchronize_session="fetch"
+        )
+        if claimed_order != 1:
+            if commit:
+                db.rollback()
+            return False
+        claimed_driver = db.query(DriverCurrentState).filter(
+            DriverCurrentState.driver_id == driver_id, DriverCurrentState.status == DriverStatus.IDLE
+        ).update({DriverCurrentState.status: DriverStatus.OCCUPIED}, synchronize_session="fetch")
+        if claimed_driver != 1:
+            if commit:
+                db.rollback()
+            else:
+                db.query(Order).filter(Order.id == order_id).update({Order.driver_id: None}, synchronize_session="fetch")
+            return False
+        state = db.get(DriverCurrentState, driver_id)
+        db.add(DriverLocation(driver_id=driver_id, lat=state.lat, lng=state.lng, status=DriverStatus.OCCUPIED))
+        order = db.query(Order.cafe_id, Order.status).filter(Order.id == order_id).one()
+        record_order_event(db, order_id, order.cafe_id, "assigned", order.status, driver_id)
+        data = {"order_id": order_id, "cafe_id": order.cafe_id, "status": order.status, "driver_id": driver_id}
+        for topic in (order_topic(order_id), cafe_topic(order.cafe_id), driver_topic(driver_id)):
+            publish_after_commit(db, topic, "order_assigned", data)
+        if commit:
+            db.commit()
+        return True
+    except OperationalError:
+        # SQLite reports lock contention between concurrent writers as "database is locked";
+        # treat it as a lost claim so the caller can retry
+        if not commit:
+            raise
+        db.rollback()
+        return False
+
+def claim_nearest_idle_driver(order_id: int, cafe_lat: float, cafe_lng: float, db: Session, attempts: int = 5) -> tuple[User, float] | None:
+    """
+    Find the nearest idle driver to a cafe and atomically claim them for the order,
+    retrying with the next candidate when another assignment wins the race.
+    Returns (driver_user, distance_in_km) or None if no driver could be claimed.
+    """
+    for _ in range(attempts):
+        result = find_nearest_idle_driver(cafe_lat, cafe_lng, db)
+        if not result:
+            return None
+        driver, distance = result
+        if claim_driver_for_order(order_id, driver.id, db):
+            return (driver, distance)
+        order_driver = db.query(Order.driver_id).filter(Order.id == order_id).scalar()
+        if order_driver is not None:
+            return None
+    return None
+
+def get_idle_drivers_with_locations(db: Session, lat: float | None = None, lng: float | None = None) -> list[dict]:
+    """
+    Get all idle drivers with their current locations.
+    Returns list of dictionaries with driver info and location.
+    When an origin (lat, lng) is given, each entry also carries `distance_km`, computed
+    for all drivers in one vectorized call, and the list is sorted nearest first.
+    """
+    rows = (
+        db.query(User, DriverCurrentState)
+        .join(DriverCurrentState, DriverCurrentState.driver_id == User.id)
+        .filter(User.role == Role.DRIVER, DriverCurrentState.status == DriverStatus.IDLE)
+        .all()
+    )
+    idle_drivers = [
+        {
+            'driver_id': driver.id,
+            'driver_name': driver.name,
+            'driver_email': driver.email,
+            'lat': state.lat,
+            'lng': state.lng,
+            'status': state.status.value,
+            'last_update': state.timestamp
+        }
+        for driver, state in rows
+    ]
+    if lat is not None and lng is not None and idle_drivers:
+        distances = calculate_distances(lat, lng, [d['lat'] for d in idle_drivers], [d['lng'] for d in idle_drivers])
+        for entry, distance in zip(idle_drivers, distances.tolist()):
+            entry['distance_km'] = distance
+        idle_drivers.sort(key=lambda d: d['distance_km'])
+    return idle_drivers
@@ -0,0 +1,261 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""In-process trigram indexes for typo-tolerant cafe and item name search."""
+import math
+import re
+import threading
+import unicodedata
+from typing import Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Query, Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Cafe, Item
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """
+    The trigrams of `text`, pg_trgm style: lowercased and stripped of accents, each word padded
+    with two spaces in front and one behind so word starts and ends carry extra weight.
+    """
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    grams = set()
+    for word in re.findall(r"\w+", folded):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigram to the texts containing it, and from each text to its keys.
+
+    A key matches a query when at least `threshold` of the query's trigrams occur in its text,
+    so "capuccino" finds "Iced Cappuccino". Matches rank by that share, then by trigram
+    similarity (shared / all distinct trigrams of both), which prefers shorter, closer texts.
+    Keys sharing a text (the same dish on many menus) are scored once, as one posting.
+    Keys may carry a tag (e.g. the item's cafe) to restrict a search to one group.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, set[frozenset[str]]] = {}
+        self._keys: dict[frozenset[str], set[Hashable]] = {}
+        self._grams: dict[Hashable, frozenset[str]] = {}
+        self._tags: dict[Hashable, Hashable] = {}
+        self._by_tag: dict[Hashable, set[Hashable]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._grams
+
+    def insert(self, key: Hashable, text: str, tag: Hashable = None) -> None:
+        """Index `key` under `text`, replacing whatever it was indexed under before."""
+        grams = trigrams(text)
+        with self._lock:
+            self._discard(key)
+            self._grams[key] = grams
+            keys = self._keys.get(grams)
+            if keys is None:
+                keys = self._keys[grams] = set()
+                for g in grams:
+                    self._postings.setdefault(g, set()).add(grams)
+            keys.add(key)
+            if tag is not None:
+                self._tags[key] = tag
+                self._by_tag.setdefault(tag, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """Drop `key` from the index if present."""
+        with self._lock:
+            self._discard(key)
+
+    def remove_tag(self, tag: Hashable) -> None:
+        """Drop every key carrying `tag`."""
+        with self._lock:
+            for key in list(self._by_tag.get(tag, ())):
+                self._discard(key)
+
+    def clear(self) -> None:
+        """Remove every key from the index."""
+        with self._lock:
+            self._postings.clear()
+            self._keys.clear()
+            self._grams.clear()
+            self._tags.clear()
+            self._by_tag.clear()
+
+    def _discard(self, key: Hashable) -> None:
+        grams = self._grams.pop(key, None)
+        if grams is None:
+            return
+        keys = self._keys[grams]
+        keys.discard(key)
+        if not keys:
+            del self._keys[grams]
+            for g in grams:
+                texts = self._postings[g]
+                texts.discard(grams)
+                if not texts:
+                    del self._postings[g]
+        tag = self._tags.pop(key, None)
+        if tag is not None:
+            members = self._by_tag[tag]
+            members.discard(key)
+            if not members:
+                del self._by_tag[tag]
+
+    def search(self, query: str, limit: int = 50, threshold: float = 0.5, tag: Hashable = None) -> list[tuple[Hashable, float]]:
+        """Return up to `limit` (key, similarity) pairs for `query`, best first."""
+        q = trigrams(query)
+        if not q:
+            return []
+        need = max(1, math.ceil(threshold * len(q)))
+        with self._lock:
+            if tag is None:
+                postings = sorted((self._postings.get(g, ()) for g in q), key=len)
+                # A text sharing `need` of the query's trigrams must hold one of any
+                # len(q) - need + 1 of them, so only the rarest few posting lists are walked
+                texts = set().union(*postings[:len(q) - need + 1])
+                candidates = [(grams, self._keys[grams]) for grams in texts]
+            else:
+                # A menu is small: score its items directly
+                by_text: dict[frozenset[str], list[Hashable]] = {}
+                for key in self._by_tag.get(tag, ()):
+                    by_text.setdefault(self._grams[key], []).append(key)
+                candidates = list(by_text.items())
+            hits = []
+            for grams, keys in candidates:
+                shared = len(q & grams)
+                if shared >= need:
+                    hits.append((shared, shared / (len(q) + len(grams) - shared), keys))
+            hits.sort(key=lambda h: (-h[0], -h[1]))
+            results = []
+            for _, similarity, keys in hits:
+                results.extend((key, similarity) for key in sorted(keys)[:limit - len(results)])
+                if len(results) >= limit:
+                    break
+        return results
+
+
+def _cafe_text(cafe) -> str:
+    return f"{cafe.name} {cafe.cuisine or ''}"
+
+
+class FuzzySearch:
+    """
+    Trigram indexes over active cafes (name and cuisine) and active items (name, tagged with
+    their cafe). Built from the database at startup, or on first use, and then kept in step
+    with ORM writes as their transactions commit. The indexes are per process: writes made by
+    other workers are only seen after a restart.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.cafes = TrigramIndex()
+        self.items = TrigramIndex()
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def load(self) -> None:
+        """(Re)build both indexes from the database."""
+        with self._lock, self.session_factory() as db:
+            self.cafes.clear()
+            self.items.clear()
+            for cafe in db.query(Cafe.id, Cafe.name, Cafe.cuisine).filter(Cafe.active == True):
+                self.cafes.insert(cafe.id, _cafe_text(cafe))
+            for item_id, cafe_id, name in db.query(Item.id, Item.cafe_id, Item.name).filter(Item.active == True):
+                self.items.insert(item_id, name, tag=cafe_id)
+            self._loaded = True
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+    def search_cafes(self, q: str) -> list[int]:
+        """Ids of the active cafes best matching `q`, best first."""
+        self._ensure_loaded()
+        hits = self.cafes.search(q, settings.FUZZY_SEARCH_LIMIT, settings.FUZZY_SEARCH_THRESHOLD)
+        return [key for key, _ in hits]
+
+    def search_items(self, q: str, cafe_id: int | None = None) -> list[int]:
+        """Ids of the active items best matching `q`, optionally on one cafe's menu, best first."""
+        self._ensure_loaded()
+        hits = self.items.search(q, settings.FUZZY_SEARCH_LIMIT, settings.FUZZY_SEARCH_THRESHOLD, tag=cafe_id)
+        return [key for key, _ in hits]
+
+    def apply(self, updates) -> None:
+        """Apply committed changes staged by the session listeners below."""
+        with self._lock:
+            if not self._loaded:
+                # The first search loads the indexes with these changes in them
+                return
+            for kind, key, text, tag in updates:
+                if kind == "menu":
+                    self.items.remove_tag(key)
+                    continue
+                index = self.cafes if kind == "cafe" else self.items
+                if text is None:
+                    index.remove(key)
+                else:
+                    index.insert(key, text, tag=tag)
+
+
+fuzzy_search = FuzzySearch()
+"""Process-wide cafe and item trigram indexes."""
+
+
+def fetch_ranked(query: Query, id_column, ids: list[int]) -> list:
+    """Load the rows of `query` whose id is in `ids`, in the order of `ids`."""
+    if not ids:
+        return []
+    rank = {key: n for n, key in enumerate(ids)}
+    return sorted(query.filter(id_column.in_(ids)).all(), key=lambda row: rank[row.id])
+
+
+def unindex_menu_after_commit(session: Session, cafe_id: int) -> None:
+    """
+    Stage the removal of every indexed item of a cafe, for bulk deletes that bypass the ORM
+    (and so the listeners below); it is applied if and when the transaction commits.
+    """
+    session.info.setdefault("fuzzy_index_updates", []).append(("menu", cafe_id, None, None))
+
+
+@event.listens_for(Session, "after_flush")
+def _stage_index_updates(session: Session, flush_context) -> None:
+    """Stage index changes for cafes and items written through the ORM."""
+    updates = []
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Cafe):
+            updates.append(("cafe", obj.id, _cafe_text(obj) if obj.active else None, None))
+        elif isinstance(obj, Item):
+            updates.append(("item", obj.id, obj.name if obj.active else None, obj.cafe_id))
+    for obj in session.deleted:
+        if isinstance(obj, (Cafe, Item)):
+            updates.append(("cafe" if isinstance(obj, Cafe) else "item", obj.id, None, None))
+    if updates:
+        session.info.setdefault("fuzzy_index_updates", []).extend(updates)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_index_updates(session: Session) -> None:
+    updates = session.info.pop("fuzzy_index_updates", None)
+    if updates:
+        fuzzy_search.apply(updates)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_index_updates(session: Session, previous_transaction) -> None:
+    session.info.pop("fuzzy_index_updates", None)
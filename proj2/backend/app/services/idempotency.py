@@ -0,0 +1,143 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Idempotency-Key support: store a write's response and replay it for retried requests."""
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+class Replayed(Exception):
+    """Raised by `Idempotency.recheck` to abandon a write in favour of the stored response."""
+
+    def __init__(self, response: JSONResponse):
+        super().__init__("Idempotent request already completed")
+        self.response = response
+
+class Idempotency:
+    """
+    Per-request helper for an endpoint that honours the Idempotency-Key header.
+
+    Call `replay()` first and return its response if there is one; otherwise do the write
+    without committing and finish with `commit(body)`, which stores the response in the same
+    transaction. Keys are scoped per user and endpoint and expire after IDEMPOTENCY_TTL_HOURS.
+    Without a key both calls reduce to the plain behaviour (no replay, ordinary commit).
+    """
+
+    def __init__(self, db: Session, user_id: int, scope: str, key: str | None, payload=None):
+        if key is not None and not 0 < len(key) <= MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+        self.db = db
+        self.user_id = user_id
+        self.scope = scope
+        self.key = key
+        self.request_hash = hashlib.sha256(json.dumps(jsonable_encoder(payload), sort_keys=True).encode()).hexdigest()
+
+    def _stored(self) -> IdempotencyKey | None:
+        return (
+            self.db.query(IdempotencyKey)
+            .filter(IdempotencyKey.user_id == self.user_id, IdempotencyKey.scope == self.scope, IdempotencyKey.key == self.key)
+            .first()
+        )
+
+    def _response(self, row: IdempotencyKey) -> JSONResponse:
+        if row.request_hash != self.request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+        return JSONResponse(json.loads(row.response_body), status_code=row.status_code, headers={"Idempotent-Replayed": "true"})
+
+    def replay(self) -> JSONResponse | None:
+        """The stored response for this key, if the request was already completed."""
+        if self.key is None:
+            return None
+        row = self._stored()
+        if row is None:
+            return None
+        if row.expires_at <= datetime.utcnow():
+            # Expired but not yet purged: free the key for this request
+            self.db.delete(row)
+            self.db.flush()
+            return None
+        return self._response(row)
+
+    def recheck(self) -> None:
+        """
+        Look for a stored response again once the endpoint holds the lock that serializes its
+        writes, and raise Replayed with it: a retry that waited on that lock while the original
+        request completed gets its response instead of acting on the state it left behind.
+        """
+        replay = self.replay()
+        if replay:
+            raise Replayed(replay)
+
+    def commit(self, body, status_code: int = 200):
+        """
+        Commit the pending write together with its stored response and return `body`.
+        If a concurrent retry with the same key committed first, roll this write back and
+        return that request's response instead.
+        """
+        body = jsonable_encoder(body)
+        if self.key is not None:
+            now = datetime.utcnow()
+            self.db.add(IdempotencyKey(
+                user_id=self.user_id, scope=self.scope, key=self.key, request_hash=self.request_hash,
+                status_code=status_code, response_body=json.dumps(body),
+                created_at=now, expires_at=now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+            ))
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            row = self._stored() if self.key is not None else None
+            if row is None:
+                raise
+            return self._response(row)
+        return body
+
+def purge_expired_idempotency_keys(db: Session) -> int:
+    """Delete expired idempotency keys in IDEMPOTENCY_PURGE_BATCH sized transactions; returns rows removed."""
+    removed = 0
+    while True:
+        ids = [i for (i,) in db.query(IdempotencyKey.id).filter(IdempotencyKey.expires_at <= datetime.utcnow()).limit(settings.IDEMPOTENCY_PURGE_BATCH)]
+        if not ids:
+            return removed
+        db.query(IdempotencyKey).filter(IdempotencyKey.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        removed += len(ids)
+
+def run_idempotency_purge() -> int:
+    """Purge expired keys in its own session."""
+    with SessionLocal() as db:
+        return purge_expired_idempotency_keys(db)
+
+async def idempotency_purge_loop(interval_seconds: float) -> None:
+    """Evict expired idempotency keys every `interval_seconds` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await asyncio.to_thread(run_idempotency_purge)
+        except Exception:
+            logger.exception("Idempotency key purge failed")
+            continue
+        if removed:
+            logger.info("Purged %d expired idempotency keys", removed)
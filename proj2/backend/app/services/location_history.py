@@ -0,0 +1,183 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Driver location history retention: downsample old tracks and expire rows past the horizon."""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from itertools import groupby
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import DriverLocation
+from .spatial import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+def douglas_peucker(lats, lngs, tolerance_m: float) -> np.ndarray:
+    """
+    Douglas-Peucker line simplification of a track.
+    Returns a boolean mask of the points to keep; the first and last points are always kept.
+    Distances are measured in an equirectangular projection, which is accurate at track scale.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    n = len(lats)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    meters = EARTH_RADIUS_KM * 1000.0
+    x = np.radians(lngs) * np.cos(np.radians(lats.mean())) * meters
+    y = np.radians(lats) * meters
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        px, py = x[a + 1:b], y[a + 1:b]
+        dx, dy = x[b] - x[a], y[b] - y[a]
+        seg2 = dx * dx + dy * dy
+        # Distance to the segment (not the infinite line), so back-tracking is not flattened away
+        t = np.zeros_like(px) if seg2 == 0 else np.clip(((px - x[a]) * dx + (py - y[a]) * dy) / seg2, 0.0, 1.0)
+        dist = np.hypot(px - (x[a] + t * dx), py - (y[a] + t * dy))
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance_m:
+            k = a + 1 + i
+            keep[k] = True
+            stack.append((a, k))
+            stack.append((k, b))
+    return keep
+
+def one_per_interval(timestamps, seconds: float) -> np.ndarray:
+    """Keep the first point of every `seconds`-long time bucket, plus the last point of the track."""
+    n = len(timestamps)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    buckets = np.array([(ts - _EPOCH).total_seconds() // seconds for ts in timestamps])
+    keep[0] = True
+    keep[1:] = buckets[1:] != buckets[:-1]
+    keep[-1] = True
+    return keep
+
+def location_table_stats(db: Session) -> tuple[int, int | None]:
+    """Row count and on-disk size in bytes of driver_locations (size is None where the backend cannot report it)."""
+    rows = db.query(DriverLocation).count()
+    dialect = db.get_bind().dialect.name
+    try:
+        if dialect == "postgresql":
+            size = db.execute(text("SELECT pg_total_relation_size('driver_locations')")).scalar()
+        elif dialect == "sqlite":
+            # dbstat is compiled into most SQLite builds; it reports the pages each table uses
+            size = db.execute(text("SELECT SUM(pgsize) FROM dbstat WHERE name LIKE '%driver_locations%'")).scalar()
+        else:
+            size = None
+    except (OperationalError, ProgrammingError):
+        db.rollback()
+        size = None
+    return rows, (int(size) if size is not None else None)
+
+def _delete_ids(db: Session, ids: list[int], batch_size: int) -> int:
+    for start in range(0, len(ids), batch_size):
+        db.query(DriverLocation).filter(DriverLocation.id.in_(ids[start:start + batch_size])).delete(synchronize_session=False)
+        db.commit()
+    return len(ids)
+
+def _downsample_ids(rows) -> list[int]:
+    """Ids to drop from one driver's time-ordered rows; each run of one status is simplified on its own."""
+    drop = []
+    for _, run in groupby(rows, key=lambda r: r.status):
+        run = list(run)
+        if len(run) < 3:
+            continue
+        if settings.LOCATION_DOWNSAMPLE == "interval":
+            keep = one_per_interval([r.timestamp for r in run], settings.LOCATION_DOWNSAMPLE_SECONDS)
+        else:
+            keep = douglas_peucker([r.lat for r in run], [r.lng for r in run], settings.LOCATION_SIMPLIFY_TOLERANCE_M)
+        drop.extend(r.id for r, k in zip(run, keep) if not k)
+    return drop
+
+def compact_driver_locations(db: Session, now: datetime | None = None, since: datetime | None = None) -> dict:
+    """
+    Apply the location history retention policy:
+    rows newer than LOCATION_FULL_RESOLUTION_HOURS are untouched; older rows, back to
+    LOCATION_RETENTION_DAYS, are downsampled per driver and status run (Douglas-Peucker with
+    LOCATION_SIMPLIFY_TOLERANCE_M, or one point per LOCATION_DOWNSAMPLE_SECONDS when
+    LOCATION_DOWNSAMPLE is "interval"); rows past the retention horizon are deleted.
+    Deletes run in LOCATION_COMPACTION_BATCH sized transactions. `since` limits downsampling to
+    rows newer than a previous run's cutoff. Returns rows removed and table size before/after.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(hours=settings.LOCATION_FULL_RESOLUTION_HOURS)
+    horizon = now - timedelta(days=settings.LOCATION_RETENTION_DAYS)
+    batch_size = settings.LOCATION_COMPACTION_BATCH
+    rows_before, bytes_before = location_table_stats(db)
+
+    expired = 0
+    while True:
+        ids = [i for (i,) in db.query(DriverLocation.id).filter(DriverLocation.timestamp < horizon).limit(batch_size)]
+        if not ids:
+            break
+        expired += _delete_ids(db, ids, batch_size)
+
+    window_start = max(horizon, since) if since else horizon
+    window = (DriverLocation.timestamp >= window_start, DriverLocation.timestamp < cutoff)
+    driver_ids = [d for (d,) in db.query(DriverLocation.driver_id).filter(*window).distinct()]
+    downsampled = 0
+    for driver_id in driver_ids:
+        rows = (
+            db.query(DriverLocation.id, DriverLocation.lat, DriverLocation.lng, DriverLocation.timestamp, DriverLocation.status)
+            .filter(DriverLocation.driver_id == driver_id, *window)
+            .order_by(DriverLocation.timestamp, DriverLocation.id)
+            .all()
+        )
+        downsampled += _delete_ids(db, _downsample_ids(rows), batch_size)
+
+    rows_after, bytes_after = location_table_stats(db)
+    return {
+        "expired": expired,
+        "downsampled": downsampled,
+        "rows_before": rows_before,
+        "rows_after": rows_after,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "full_resolution_since": cutoff,
+        "retention_horizon": horizon,
+    }
+
+def run_compaction_job(since: datetime | None = None) -> dict:
+    """Run one compaction pass in its own session."""
+    with SessionLocal() as db:
+        return compact_driver_locations(db, since=since)
+
+async def compaction_loop(interval_seconds: float) -> None:
+    """Compact driver location history every `interval_seconds` until cancelled."""
+    since = None
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            report = await asyncio.to_thread(run_compaction_job, since)
+        except Exception:
+            logger.exception("Driver location compaction failed")
+            continue
+        # Rows before this cutoff are already downsampled; later passes only look at newer ones
+        since = report["full_resolution_since"]
+        logger.info(
+            "Driver location compaction: %d expired, %d downsampled, rows %d -> %d, bytes %s -> %s",
+            report["expired"], report["downsampled"], report["rows_before"], report["rows_after"],
+            report["bytes_before"], report["bytes_after"],
+        )
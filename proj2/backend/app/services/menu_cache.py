@@ -0,0 +1,138 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Versioned cache of serialized menu listings, answered with strong ETags and 304s."""
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, List
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Item
+from ..schemas import ItemOut
+# Fuzzy listings read its index: its commit hook must run, and so be registered, before ours
+from . import fuzzy_search  # noqa: F401
+
+_ITEM_LIST = TypeAdapter(List[ItemOut])
+
+ALL_CAFES = None
+"""Version key of the catalog-wide listing (GET /items); it moves with every cafe's menu."""
+
+
+def _etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """Weak comparison, as If-None-Match asks for: `W/` prefixes are ignored and `*` matches."""
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class MenuCache:
+    """
+    Per-cafe menu version counters and an LRU of serialized item listings keyed by
+    (cafe_id, version, query). A menu write bumps the cafe's version (and the catalog-wide one)
+    once its transaction commits, so older entries stop being hit and age out of the LRU.
+
+    The ETag is a hash of the body, so it is strong and stays valid across restarts and workers.
+    Versions and entries are per process: with several workers, one that did not serve a menu
+    write keeps its cached listing until it restarts.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._versions: dict[Hashable, int] = {}
+        self._entries: OrderedDict[tuple, tuple[bytes, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, cafe_id: int | None) -> int:
+        return self._versions.get(cafe_id, 0)
+
+    def bump(self, cafe_ids) -> None:
+        """Move the given cafes' menus, and the catalog-wide listing, to a new version."""
+        with self._lock:
+            for cafe_id in itertools.chain(set(cafe_ids), [ALL_CAFES]):
+                self._versions[cafe_id] = self._versions.get(cafe_id, 0) + 1
+
+    def _get(self, key: tuple) -> tuple[bytes, str] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: tuple, entry: tuple[bytes, str]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def respond(self, cafe_id: int | None, query: tuple, if_none_match: str | None, load: Callable[[], list]) -> Response:
+        """
+        The item listing of `cafe_id` (ALL_CAFES for the catalog) for `query`, from the cache when
+        the menu has not changed since it was stored, else from `load()`. A request whose
+        If-None-Match holds the listing's ETag gets a bodiless 304; on a hit neither touches the DB.
+        """
+        # Read before loading: a write committing meanwhile leaves newer rows under the old
+        # version at worst, never older rows under the new one
+        key = (cafe_id, self.version(cafe_id), query)
+        entry = self._get(key)
+        if entry is None:
+            body = _ITEM_LIST.dump_json(_ITEM_LIST.validate_python(load(), from_attributes=True))
+            entry = (body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+            self._put(key, entry)
+        body, etag = entry
+        # no-cache: clients may store the listing but must revalidate it with the ETag
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(etag, if_none_match):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+menu_cache = MenuCache(settings.MENU_CACHE_MAX_ENTRIES)
+"""Process-wide menu listing cache."""
+
+
+def bump_menu_after_commit(session: Session, cafe_id: int) -> None:
+    """
+    Stage a version bump for a cafe's menu, for bulk writes that bypass the ORM (and so the
+    listener below); it is applied if and when the transaction commits.
+    """
+    session.info.setdefault("menu_version_bumps", set()).add(cafe_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _stage_menu_bumps(session: Session, flush_context) -> None:
+    """Stage version bumps for the cafes whose items were written through the ORM."""
+    items = [obj for obj in itertools.chain(session.new, session.dirty, session.deleted) if isinstance(obj, Item)]
+    if not items:
+        return
+    cafe_ids = session.info.setdefault("menu_version_bumps", set())
+    for item in items:
+        # An item moved off a cafe (e.g. the cafe was deleted) changes the old menu too
+        history = inspect(item).attrs.cafe_id.history
+        cafe_ids.update(c for c in (item.cafe_id, *history.deleted) if c is not None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_menu_bumps(session: Session) -> None:
+    cafe_ids = session.info.pop("menu_version_bumps", None)
+    if cafe_ids is not None:
+        menu_cache.bump(cafe_ids)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_menu_bumps(session: Session, previous_transaction) -> None:
+    session.info.pop("menu_version_bumps", None)
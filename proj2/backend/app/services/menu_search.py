@@ -0,0 +1,111 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Full-text menu search over item name, description and ingredients, ranked by relevance."""
+import re
+
+from sqlalchemy import case, event, func, or_, text, table, column, literal_column
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query
+
+from ..models import Item
+
+# Column weights (bm25 on SQLite, menu scans): name matches count most, then description, then
+# ingredients. Postgres weighs them A/B/C in the document itself.
+_WEIGHTS = (10.0, 4.0, 1.0)
+
+_SQLITE_DDL = (
+    # External-content FTS5 table: it stores only the index, the text stays in items
+    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+    "name, description, ingredients, content='items', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN "
+    "INSERT INTO items_fts(rowid, name, description, ingredients) VALUES (new.id, new.name, new.description, new.ingredients); END",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN "
+    "INSERT INTO items_fts(items_fts, rowid, name, description, ingredients) VALUES ('delete', old.id, old.name, old.description, old.ingredients); END",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF name, description, ingredients ON items BEGIN "
+    "INSERT INTO items_fts(items_fts, rowid, name, description, ingredients) VALUES ('delete', old.id, old.name, old.description, old.ingredients); "
+    "INSERT INTO items_fts(rowid, name, description, ingredients) VALUES (new.id, new.name, new.description, new.ingredients); END",
+)
+
+_POSTGRES_DDL = (
+    # A generated column keeps the document in step with every write, bulk ones included
+    "ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(ingredients, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_items_search_vector ON items USING GIN (search_vector)",
+)
+
+_items_fts = table("items_fts", column("rowid"))
+
+def ensure_search_index(conn: Connection) -> None:
+    """
+    Create the search index for the connection's database if it is missing, filling it from
+    the items already there. Safe to run on every startup; other databases fall back to LIKE.
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        exists = conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'").first()
+        for ddl in _SQLITE_DDL:
+            conn.exec_driver_sql(ddl)
+        if not exists:
+            conn.exec_driver_sql("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        for ddl in _POSTGRES_DDL:
+            conn.exec_driver_sql(ddl)
+
+@event.listens_for(Item.__table__, "after_create")
+def _create_search_index(target, conn, **kw) -> None:
+    ensure_search_index(conn)
+
+@event.listens_for(Item.__table__, "before_drop")
+def _drop_search_index(target, conn, **kw) -> None:
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("DROP TABLE IF EXISTS items_fts")
+
+def _terms(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())
+
+def _scan_search(query: Query, terms: list[str]) -> Query:
+    # Each term must start a word in some column; columns score by _WEIGHTS, summed over terms
+    score = 0
+    for t in terms:
+        hits = []
+        for col, weight in zip((Item.name, Item.description, Item.ingredients), _WEIGHTS):
+            hit = or_(col.ilike(f"{t}%"), col.ilike(f"% {t}%"))
+            hits.append(hit)
+            score = score + case((hit, weight), else_=0)
+        query = query.filter(or_(*hits))
+    return query.order_by(score.desc(), Item.name)
+
+def apply_search(query: Query, q: str, within_cafe: bool = False) -> Query:
+    """
+    Restrict an Item query to items matching every word of `q` (as a word prefix, so results
+    follow the user's typing) in name, description or ingredients, best matches first.
+
+    Catalog-wide searches go through the full-text index. A search `within_cafe` (the query is
+    already filtered to one cafe) scans that cafe's menu through the cafe_id index instead: a
+    menu is small, and the index would walk every match in the catalog before the cafe filter.
+    """
+    terms = _terms(q)
+    dialect = query.session.get_bind().dialect.name
+    if not terms or dialect not in ("sqlite", "postgresql"):
+        return query.filter(Item.name.ilike(f"%{q}%")).order_by(Item.name)
+    if within_cafe:
+        return _scan_search(query, terms)
+    if dialect == "sqlite":
+        match = " ".join(f'"{t}"*' for t in terms)
+        return (
+            query.join(_items_fts, _items_fts.c.rowid == Item.id)
+            .filter(text("items_fts MATCH :fts_query").bindparams(fts_query=match))
+            .order_by(literal_column(f"bm25(items_fts, {', '.join(map(str, _WEIGHTS))})"), Item.name)
+        )
+    ts_query = func.to_tsquery("english", " & ".join(f"{t}:*" for t in terms))
+    document = literal_column("items.search_vector")
+    return query.filter(document.op("@@")(ts_query)).order_by(func.ts_rank_cd(document, ts_query).desc(), Item.name)
@@ -0,0 +1,82 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Order change log: an OrderEvent row for every order write, read back as a "changes since" feed."""
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from ..models import Order, OrderEvent, OrderStatus
+
+# First key of the two-int Postgres advisory lock taken per cafe while its events are written
+_EVENT_LOCK_NAMESPACE = 0x0E7E
+
+def _lock_cafe_sequence(session: Session, cafe_id: int) -> None:
+    """
+    Serialize event writers per cafe until commit on Postgres.
+
+    Sequence values are handed out at INSERT time, so without this two concurrent transactions
+    could commit their events out of sequence order and a reader polling in between would skip
+    the lower one for good. SQLite already serializes writers.
+    """
+    locked = session.info.setdefault("order_event_locks", set())
+    if cafe_id in locked or session.get_bind().dialect.name != "postgresql":
+        return
+    session.execute(text("SELECT pg_advisory_xact_lock(:ns, :cafe_id)"), {"ns": _EVENT_LOCK_NAMESPACE, "cafe_id": cafe_id})
+    locked.add(cafe_id)
+
+def record_order_event(db: Session, order_id: int, cafe_id: int, type: str, status: OrderStatus, driver_id: int | None) -> None:
+    """Append an event for an order change made outside the ORM unit of work (e.g. a Core UPDATE)."""
+    _lock_cafe_sequence(db, cafe_id)
+    db.add(OrderEvent(order_id=order_id, cafe_id=cafe_id, type=type, status=status, driver_id=driver_id))
+
+@event.listens_for(Session, "before_flush")
+def _log_order_changes(session: Session, flush_context, instances) -> None:
+    """Add an OrderEvent for every order being created, or whose status or driver is changing, in this flush."""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Order):
+            continue
+        if obj in session.new:
+            kind = "placed"
+        else:
+            state = inspect(obj)
+            if state.attrs.status.history.has_changes():
+                kind = "status"
+            elif state.attrs.driver_id.history.has_changes():
+                kind = "assigned"
+            else:
+                continue
+        with session.no_autoflush:
+            _lock_cafe_sequence(session, obj.cafe_id)
+        session.add(OrderEvent(order=obj, cafe_id=obj.cafe_id, type=kind, status=obj.status or OrderStatus.PENDING, driver_id=obj.driver_id))
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def _release_cafe_locks(session: Session, *args) -> None:
+    # Advisory xact locks end with the transaction
+    session.info.pop("order_event_locks", None)
+
+def order_changes_since(db: Session, cafe_id: int, since: int, limit: int) -> dict:
+    """
+    Events for a cafe with a sequence number above `since`, oldest first, at most `limit` of them.
+    One range scan on (cafe_id, id); `last_seq` is where the next call should resume.
+    """
+    rows = (
+        db.query(OrderEvent.id, OrderEvent.order_id, OrderEvent.type, OrderEvent.status, OrderEvent.driver_id, OrderEvent.created_at)
+        .filter(OrderEvent.cafe_id == cafe_id, OrderEvent.id > since)
+        .order_by(OrderEvent.id)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    events = [
+        {"seq": r.id, "order_id": r.order_id, "type": r.type, "status": r.status, "driver_id": r.driver_id, "created_at": r.created_at}
+        for r in rows
+    ]
+    return {"events": events, "last_seq": rows[-1].id if rows else since, "has_more": has_more}
@@ -0,0 +1,247 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""In-process asyncio pub/sub hub for real-time driver, order and cafe events."""
+import asyncio
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from typing import Iterable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from ..config import settings
+from ..models import Order
+
+
+def driver_topic(driver_id: int) -> str:
+    return f"driver:{driver_id}"
+
+def order_topic(order_id: int) -> str:
+    return f"order:{order_id}"
+
+def cafe_topic(cafe_id: int) -> str:
+    return f"cafe:{cafe_id}"
+
+
+def _jsonable(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class Subscription:
+    """
+    One subscriber's view of the hub: a bounded queue of pending events, coalesced per
+    (topic, type) so a burst of location updates for a driver collapses to the newest one.
+    A subscriber that falls more than `max_pending` distinct events behind is dropped.
+    """
+
+    def __init__(self, hub: "EventHub", topics: Iterable[str], max_pending: int, loop: asyncio.AbstractEventLoop):
+        self.hub = hub
+        self.topics = set(topics)
+        self.max_pending = max_pending
+        self.loop = loop
+        self.dropped = False
+        self.closed = False
+        self._pending: OrderedDict[tuple[str, str], dict] = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def offer(self, evt: dict) -> None:
+        """Queue an event (event-loop thread only)."""
+        if self.closed:
+            return
+        key = (evt["topic"], evt["type"])
+        if key in self._pending:
+            # Keep the queue position of the first pending event; deliver the latest payload
+            self._pending[key] = evt
+        elif len(self._pending) >= self.max_pending:
+            self.dropped = True
+            self.close()
+            return
+        else:
+            self._pending[key] = evt
+        self._ready.set()
+
+    async def get(self) -> dict | None:
+        """Wait for the next event; returns None once the subscription is closed or dropped."""
+        while not self._pending:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        if self.closed:
+            return None
+        _, evt = self._pending.popitem(last=False)
+        return evt
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._pending.clear()
+        self._ready.set()
+        self.hub.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        evt = await self.get()
+        if evt is None:
+            raise StopAsyncIteration
+        return evt
+
+
+class EventHub:
+    """
+    Topic-based fan-out to asyncio subscribers. `publish` may be called from any thread
+    (sync route handlers run in a worker pool); delivery always happens on each
+    subscriber's event loop.
+    """
+
+    def __init__(self, max_pending: int | None = None):
+        self.max_pending = max_pending or settings.PUBSUB_MAX_PENDING
+        self._topics: dict[str, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics: Iterable[str], max_pending: int | None = None) -> Subscription:
+        """Subscribe to one or more topics; must be called from a running event loop."""
+        sub = Subscription(self, topics, max_pending or self.max_pending, asyncio.get_running_loop())
+        with self._lock:
+            for topic in sub.topics:
+                self._topics.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self.remove_topics(sub, list(sub.topics))
+
+    def add_topics(self, sub: Subscription, topics: Iterable[str]) -> None:
+        """Widen a live subscription, e.g. to a driver's topic once an order gets one."""
+        if sub.closed:
+            return
+        with self._lock:
+            for topic in topics:
+                sub.topics.add(topic)
+                self._topics.setdefault(topic, set()).add(sub)
+
+    def remove_topics(self, sub: Subscription, topics: Iterable[str]) -> None:
+        with self._lock:
+            for topic in topics:
+                sub.topics.discard(topic)
+                subs = self._topics.get(topic)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._topics[topic]
+
+    def subscriber_count(self, topic: str | None = None) -> int:
+        with self._lock:
+            if topic is not None:
+                return len(self._topics.get(topic, ()))
+            return len({sub for subs in self._topics.values() for sub in subs})
+
+    def publish(self, topic: str, type: str, data: dict) -> int:
+        """Send an event to every subscriber of `topic`; returns the number of subscribers reached."""
+        with self._lock:
+            subs = list(self._topics.get(topic, ()))
+        if not subs:
+            return 0
+        evt = {"topic": topic, "type": type, "data": {k: _jsonable(v) for k, v in data.items()}}
+        by_loop: dict[asyncio.AbstractEventLoop, list[Subscription]] = {}
+        for sub in subs:
+            by_loop.setdefault(sub.loop, []).append(sub)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for loop, group in by_loop.items():
+            if loop is running:
+                _deliver(group, evt)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(_deliver, group, evt)
+        return len(subs)
+
+
+def _deliver(subs: list[Subscription], evt: dict) -> None:
+    for sub in subs:
+        sub.offer(evt)
+
+
+hub = EventHub()
+"""Process-wide event hub."""
+
+
+async def stream_to_websocket(websocket: WebSocket, sub: Subscription) -> None:
+    """
+    Forward a subscription's events to an accepted WebSocket until either side goes away.
+    Incoming frames are ignored. A consumer that is dropped for falling behind, or that
+    does not take a frame within PUBSUB_SEND_TIMEOUT_SECONDS, is closed with code 1013.
+    """
+    async def watch_disconnect():
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sub.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        async for evt in sub:
+            await asyncio.wait_for(websocket.send_json(evt), settings.PUBSUB_SEND_TIMEOUT_SECONDS)
+        if sub.dropped:
+            await websocket.close(code=1013)
+    except asyncio.TimeoutError:
+        sub.dropped = True
+        await websocket.close(code=1013)
+    except (WebSocketDisconnect, RuntimeError):
+        # Client went away mid-send
+        pass
+    finally:
+        sub.close()
+        watcher.cancel()
+
+
+def publish_after_commit(session: Session, topic: str, type: str, data: dict) -> None:
+    """Stage an event on the session; it is published if and when the transaction commits."""
+    session.info.setdefault("pubsub_events", []).append((topic, type, data))
+
+
+@event.listens_for(Session, "after_flush")
+def _stage_order_events(session: Session, flush_context) -> None:
+    """Stage status and driver-assignment events for orders written through the ORM."""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Order):
+            continue
+        state = inspect(obj)
+        changed = [attr for attr in ("status", "driver_id") if state.attrs[attr].history.has_changes()]
+        if not changed:
+            continue
+        data = {"order_id": obj.id, "cafe_id": obj.cafe_id, "status": obj.status, "driver_id": obj.driver_id}
+        kind = "order_status" if "status" in changed else "order_assigned"
+        publish_after_commit(session, order_topic(obj.id), kind, data)
+        publish_after_commit(session, cafe_topic(obj.cafe_id), kind, data)
+        if obj.driver_id is not None:
+            publish_after_commit(session, driver_topic(obj.driver_id), kind, data)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged_events(session: Session) -> None:
+    for topic, type, data in session.info.pop("pubsub_events", []):
+        hub.publish(topic, type, data)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_staged_events(session: Session, previous_transaction) -> None:
+    session.info.pop("pubsub_events", None)
@@ -0,0 +1,214 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""In-process spatial index used to answer nearest-neighbour queries without scanning every row."""
+import math
+import threading
+from typing import Container, Hashable, Iterator
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in kilometers between two (lat, lng) points."""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    dlat = lat2_rad - lat1_rad
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlng / 2)**2
+    return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_km_array(lat: float, lng: float, lats, lngs) -> np.ndarray:
+    """Distances in kilometers from one (lat, lng) point to every point in `lats`/`lngs`."""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(lngs, dtype=np.float64) - lng)
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2)**2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def haversine_km_matrix(from_lats, from_lngs, to_lats, to_lngs) -> np.ndarray:
+    """Distance matrix in kilometers; entry [i, j] is from point i of `from_*` to point j of `to_*`."""
+    lat1 = np.radians(np.asarray(from_lats, dtype=np.float64))[:, None]
+    lng1 = np.asarray(from_lngs, dtype=np.float64)[:, None]
+    lat2 = np.radians(np.asarray(to_lats, dtype=np.float64))[None, :]
+    lng2 = np.asarray(to_lngs, dtype=np.float64)[None, :]
+    dlat = lat2 - lat1
+    dlng = np.radians(lng2 - lng1)
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2)**2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> tuple[tuple[float, float], list[tuple[float, float]]]:
+    """
+    The latitude range and longitude range(s) of a box holding every point within `radius_km`
+    of (lat, lng). Longitudes split into two ranges where the box crosses the antimeridian and
+    cover the whole globe when the circle reaches a pole.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    lat_range = (max(lat - dlat, -90.0), min(lat + dlat, 90.0))
+    if lat - dlat <= -90.0 or lat + dlat >= 90.0:
+        return lat_range, [(-180.0, 180.0)]
+    # Longitude half-width of the circle at its widest point, which lies poleward of the centre
+    dlng = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+    lo, hi = lng - dlng, lng + dlng
+    if lo < -180.0:
+        return lat_range, [(lo + 360.0, 180.0), (-180.0, hi)]
+    if hi > 180.0:
+        return lat_range, [(lo, 180.0), (-180.0, hi - 360.0)]
+    return lat_range, [(lo, hi)]
+
+
+class GeoGridIndex:
+    """
+    Uniform lat/lng grid (a fixed-precision geohash) mapping each cell to the keys inside it.
+
+    Nearest-neighbour queries start in the query's own cell and search outward ring by ring,
+    stopping as soon as no unsearched cell can hold anything closer than the best match so far.
+    Cells do not wrap around the antimeridian, which is fine for a single-metro deployment.
+    """
+
+    def __init__(self, cell_deg: float = 0.01):
+        self.cell_deg = cell_deg
+        self._cells: dict[tuple[int, int], dict[Hashable, tuple[float, float]]] = {}
+        self._points: dict[Hashable, tuple[float, float]] = {}
+        self._lock = threading.RLock()
+        # Column arrays of every point for vectorized full scans; rebuilt lazily after writes
+        self._arrays: tuple[list[Hashable], np.ndarray, np.ndarray] | None = None
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+    def position(self, key: Hashable) -> tuple[float, float] | None:
+        """Return the indexed (lat, lng) for `key`, or None if it is not indexed."""
+        return self._points.get(key)
+
+    def _cell(self, lat: float, lng: float) -> tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def insert(self, key: Hashable, lat: float, lng: float) -> None:
+        """Add `key` at (lat, lng), moving it if it is already indexed."""
+        with self._lock:
+            self._discard(key)
+            self._arrays = None
+            self._points[key] = (lat, lng)
+            self._cells.setdefault(self._cell(lat, lng), {})[key] = (lat, lng)
+
+    def remove(self, key: Hashable) -> None:
+        """Drop `key` from the index if present."""
+        with self._lock:
+            self._discard(key)
+
+    def clear(self) -> None:
+        """Remove every key from the index."""
+        with self._lock:
+            self._cells.clear()
+            self._points.clear()
+            self._arrays = None
+
+    def _discard(self, key: Hashable) -> None:
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        self._arrays = None
+        cell = self._cell(*point)
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._cells[cell]
+
+    def _ring(self, ci: int, cj: int, k: int) -> Iterator[tuple[int, int]]:
+        """Yield the cells at Chebyshev distance exactly `k` from (ci, cj)."""
+        if k == 0:
+            yield (ci, cj)
+            return
+        for j in range(cj - k, cj + k + 1):
+            yield (ci - k, j)
+            yield (ci + k, j)
+        for i in range(ci - k + 1, ci + k):
+            yield (i, cj - k)
+            yield (i, cj + k)
+
+    def _unsearched_lower_bound_km(self, lat: float, lng: float, ci: int, cj: int, k: int, best_km: float) -> float:
+        """Smallest possible distance to any point outside the rings 0..k already searched."""
+        lat_gap = min(lat - (ci - k) * self.cell_deg, (ci + k + 1) * self.cell_deg - lat)
+        lng_gap = min(lng - (cj - k) * self.cell_deg, (cj + k + 1) * self.cell_deg - lng)
+        lat_bound = EARTH_RADIUS_KM * math.radians(lat_gap)
+        # A closer point must lie within best_km of the query latitude, which caps how much
+        # longitude lines can converge; hav(d) >= cos^2(max_lat) * hav(dlng) gives the bound.
+        max_lat = min(90.0, abs(lat) + math.degrees(best_km / EARTH_RADIUS_KM))
+        s = math.cos(math.radians(max_lat)) * math.sin(math.radians(min(lng_gap, 180.0)) / 2)
+        lng_bound = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, s))
+        return min(lat_bound, lng_bound)
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        exclude: Container[Hashable] = (),
+    ) -> tuple[Hashable, float] | None:
+        """
+        Return (key, distance_km) of the closest indexed point whose key is not in `exclude`, or None.
+        `exclude` lets callers skip candidates they found to be stale without mutating the index.
+        """
+        with self._lock:
+            if not self._points:
+                return None
+            ci, cj = self._cell(lat, lng)
+            best_key = None
+            best_km = math.inf
+            k = 0
+            searched = 0
+            while searched < len(self._cells):
+                ring = list(self._ring(ci, cj, k))
+                if len(ring) > len(self._cells):
+                    # Rings have grown past the number of occupied cells: scanning the points
+                    # directly is cheaper than walking mostly-empty rings.
+                    return self._scan_all(lat, lng, exclude)
+                for cell in ring:
+                    bucket = self._cells.get(cell)
+                    if not bucket:
+                        continue
+                    searched += 1
+                    for key, (plat, plng) in bucket.items():
+                        if key in exclude:
+                            continue
+                        d = haversine_km(lat, lng, plat, plng)
+                        if d < best_km:
+                            best_key, best_km = key, d
+                if best_key is not None and self._unsearched_lower_bound_km(lat, lng, ci, cj, k, best_km) >= best_km:
+                    break
+                k += 1
+            if best_key is None:
+                return None
+            return (best_key, best_km)
+
+    def _scan_all(self, lat: float, lng: float, exclude: Container[Hashable]) -> tuple[Hashable, float] | None:
+        if self._arrays is None:
+            keys = list(self._points)
+            coords = np.array([self._points[k] for k in keys], dtype=np.float64).reshape(-1, 2)
+            self._arrays = (keys, coords[:, 0], coords[:, 1])
+        keys, lats, lngs = self._arrays
+        dists = haversine_km_array(lat, lng, lats, lngs)
+        while True:
+            i = int(np.argmin(dists))
+            if not np.isfinite(dists[i]):
+                return None
+            if keys[i] not in exclude:
+                return (keys[i], float(dists[i]))
+            dists[i] = np.inf
@@ -0,0 +1,130 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Periodic sweeps: decline stale PENDING orders, release stuck drivers and expire idle carts."""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, exists, and_
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Order, OrderStatus, DriverCurrentState, DriverLocation, DriverStatus, Cart, CartItem
+from .cart_store import cart_store
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_ORDER_STATUSES = (OrderStatus.ACCEPTED, OrderStatus.READY, OrderStatus.PICKED_UP)
+
+def decline_stale_orders(db: Session, now: datetime | None = None) -> int:
+    """
+    Decline PENDING orders older than ORDER_PENDING_SLA_MINUTES, SWEEP_BATCH per transaction.
+    Orders are updated through the ORM so the change log and live events see each decline;
+    on Postgres rows locked by a concurrent accept are skipped until the next sweep.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(minutes=settings.ORDER_PENDING_SLA_MINUTES)
+    declined = 0
+    while True:
+        orders = (
+            db.query(Order)
+            .filter(Order.status == OrderStatus.PENDING, Order.created_at < cutoff)
+            .order_by(Order.created_at)
+            .limit(settings.SWEEP_BATCH)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not orders:
+            return declined
+        for order in orders:
+            order.status = OrderStatus.DECLINED
+        db.commit()
+        declined += len(orders)
+
+def release_stuck_drivers(db: Session, now: datetime | None = None) -> int:
+    """
+    Set drivers back to IDLE who are OCCUPIED although every order they were assigned is finished.
+    Only drivers whose state is older than DRIVER_RELEASE_GRACE_MINUTES are touched, and drivers
+    who never had an order (OCCUPIED by their own choice) are left alone.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(minutes=settings.DRIVER_RELEASE_GRACE_MINUTES)
+    has_active = exists().where(and_(Order.driver_id == DriverCurrentState.driver_id, Order.status.in_(ACTIVE_ORDER_STATUSES)))
+    had_order = exists().where(Order.driver_id == DriverCurrentState.driver_id)
+    released = 0
+    while True:
+        states = (
+            db.query(DriverCurrentState)
+            .filter(DriverCurrentState.status == DriverStatus.OCCUPIED, DriverCurrentState.timestamp < cutoff, had_order, ~has_active)
+            .limit(settings.SWEEP_BATCH)
+            .all()
+        )
+        if not states:
+            return released
+        # A history row per driver; the current state and idle-driver index follow it on flush/commit
+        db.add_all([DriverLocation(driver_id=s.driver_id, lat=s.lat, lng=s.lng, status=DriverStatus.IDLE) for s in states])
+        db.commit()
+        released += len(states)
+
+def expire_carts(db: Session, now: datetime | None = None) -> tuple[int, int]:
+    """
+    Delete carts (and their items) with no activity for CART_TTL_HOURS; the next cart call
+    creates a fresh one. A cart's last activity is its newest item change, or its creation
+    when empty. The carts are dropped from the cart store too, unless they changed there
+    since their last write-back. Returns (carts, items) removed.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(hours=settings.CART_TTL_HOURS)
+    last_activity = (
+        db.query(CartItem.cart_id, func.max(CartItem.updated_at).label("at"))
+        .group_by(CartItem.cart_id)
+        .subquery()
+    )
+    carts = items = 0
+    while True:
+        rows = (
+            db.query(Cart.id, Cart.user_id)
+            .outerjoin(last_activity, last_activity.c.cart_id == Cart.id)
+            .filter(func.coalesce(last_activity.c.at, Cart.created_at) < cutoff)
+            .limit(settings.SWEEP_BATCH)
+            .all()
+        )
+        if not rows:
+            return carts, items
+        ids = [r.id for r in rows]
+        items += db.query(CartItem).filter(CartItem.cart_id.in_(ids)).delete(synchronize_session=False)
+        carts += db.query(Cart).filter(Cart.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        for r in rows:
+            if r.user_id is not None:
+                cart_store.discard(r.user_id)
+
+def sweep(db: Session, now: datetime | None = None) -> dict:
+    """Run every sweep once and return how many rows each one changed."""
+    report = {"orders_declined": decline_stale_orders(db, now), "drivers_released": release_stuck_drivers(db, now)}
+    report["carts_expired"], report["cart_items_removed"] = expire_carts(db, now)
+    return report
+
+def run_sweep() -> dict:
+    """Run one sweep in its own session."""
+    with SessionLocal() as db:
+        return sweep(db)
+
+async def sweep_loop(interval_seconds: float) -> None:
+    """Sweep every `interval_seconds` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            report = await asyncio.to_thread(run_sweep)
+        except Exception:
+            logger.exception("Sweep failed")
+            continue
+        logger.info(
+            "Sweep: %d orders declined, %d drivers released, %d carts expired (%d items)",
+            report["orders_declined"], report["drivers_released"], report["carts_expired"], report["cart_items_removed"],
+        )
@@ -0,0 +1,86 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Live order tracking: turns pub/sub events into a Server-Sent Events delta stream."""
+import asyncio
+import json
+import time
+from typing import AsyncIterator
+
+from ..config import settings
+from ..models import OrderStatus
+from .pubsub import Subscription, hub, driver_topic
+
+TERMINAL_STATUSES = {s.value for s in (OrderStatus.DELIVERED, OrderStatus.DECLINED, OrderStatus.CANCELLED, OrderStatus.REFUNDED)}
+
+
+def sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def order_tracking_events(sub: Subscription, snapshot: dict) -> AsyncIterator[str]:
+    """
+    Yield a `snapshot` message, then only deltas for the order:
+    `status` on each status transition, `driver_assigned` when a driver is attached and
+    `driver_location` for the assigned driver, at most once per
+    ORDER_STREAM_LOCATION_INTERVAL_SECONDS (the newest position wins). The stream ends after
+    a terminal status; a comment line is sent every ORDER_STREAM_KEEPALIVE_SECONDS otherwise.
+    `sub` must already cover the order topic and, if assigned, the driver topic.
+    """
+    interval = settings.ORDER_STREAM_LOCATION_INTERVAL_SECONDS
+    keepalive = settings.ORDER_STREAM_KEEPALIVE_SECONDS
+    status = snapshot["status"]
+    driver_id = (snapshot.get("driver_info") or {}).get("driver_id")
+    last_location_at = float("-inf")
+    held_location: dict | None = None
+    try:
+        yield sse("snapshot", snapshot)
+        if status in TERMINAL_STATUSES:
+            return
+        while True:
+            now = time.monotonic()
+            timeout = keepalive
+            if held_location is not None:
+                timeout = min(timeout, max(0.0, last_location_at + interval - now))
+            try:
+                evt = await asyncio.wait_for(sub.get(), timeout)
+            except asyncio.TimeoutError:
+                if held_location is not None and time.monotonic() >= last_location_at + interval:
+                    yield sse("driver_location", held_location)
+                    held_location, last_location_at = None, time.monotonic()
+                else:
+                    yield ": keepalive\n\n"
+                continue
+            if evt is None:
+                # Dropped as a slow consumer; the client reconnects and gets a fresh snapshot
+                return
+            data = evt["data"]
+            if evt["topic"].startswith("driver:"):
+                if evt["type"] != "location" or data["driver_id"] != driver_id:
+                    continue
+                held_location = {k: data[k] for k in ("driver_id", "lat", "lng", "timestamp")}
+                if time.monotonic() >= last_location_at + interval:
+                    yield sse("driver_location", held_location)
+                    held_location, last_location_at = None, time.monotonic()
+                continue
+            if data.get("driver_id") != driver_id and data.get("driver_id") is not None:
+                if driver_id is not None:
+                    hub.remove_topics(sub, [driver_topic(driver_id)])
+                driver_id = data["driver_id"]
+                hub.add_topics(sub, [driver_topic(driver_id)])
+                held_location = None
+                yield sse("driver_assigned", {"driver_id": driver_id})
+            if data.get("status") != status:
+                status = data["status"]
+                yield sse("status", {"status": status})
+                if status in TERMINAL_STATUSES:
+                    return
+    finally:
+        sub.close()
@@ -0,0 +1,102 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Benchmark: "cafes near me", the whole cafe table plus client-side distances vs. /cafes/nearby.
+
+"table" is what clients used to do: fetch every active cafe as GET /cafes/ returns them, then
+compute distances and keep the nearest. "nearby" is nearby_cafes: an index-only bounding-box
+read through ix_cafes_lat_lng, exact haversine on the rows inside it, then one page of cafes.
+BENCH_CAFES (default 100,000) cafes spread over a 100 x 100 km metro area, on a scratch SQLite
+file; the query plan is printed so it can be checked to stay on the index.
+
+Run from the backend directory:
+    python benchmarks/bench_cafes_nearby.py
+"""
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import Response
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, Role, Cafe
+from app.routers.cafes import nearby_cafes
+from app.services.spatial import haversine_km
+
+CAFES = int(os.getenv("BENCH_CAFES", 100_000))
+CENTER = (35.78, -78.64)
+SPAN_DEG = 0.9  # about 100 km
+RADII_KM = (1, 5, 20)
+PAGE = 20
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench_nearby.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rng = random.Random(0)
+
+    with SessionLocal() as db:
+        owner = User(email="bench-owner@example.com", name="O", hashed_password="x", role=Role.OWNER)
+        db.add(owner)
+        db.commit()
+        rows = [{"name": f"Cafe{i}", "owner_id": owner.id, "active": rng.random() < 0.95,
+                 "lat": CENTER[0] + rng.uniform(-SPAN_DEG, SPAN_DEG) / 2, "lng": CENTER[1] + rng.uniform(-SPAN_DEG, SPAN_DEG) / 2}
+                for i in range(CAFES)]
+        db.execute(insert(Cafe), rows)
+        db.commit()
+        db.connection().exec_driver_sql("ANALYZE")
+        db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cur, stmt, params, ctx, many: statements.append((stmt, params)))
+    lat, lng = CENTER
+    print(f"{CAFES} cafes")
+    print(f"{'radius km':>10} {'in radius':>10} {'table ms':>9} {'nearby ms':>10}")
+    for radius in RADII_KM:
+        with SessionLocal() as db:
+            def table():
+                cafes = db.query(Cafe).filter(Cafe.active == True).order_by(Cafe.name).all()
+                near = sorted((d, c.id) for c in cafes if (d := haversine_km(lat, lng, c.lat, c.lng)) <= radius)
+                db.expunge_all()
+                return near
+            nearby = lambda: nearby_cafes(Response(), lat=lat, lng=lng, radius_km=radius, limit=PAGE, cursor=None, db=db)
+            expected = table()
+            assert [c["id"] for c in nearby()] == [cid for _, cid in expected[:PAGE]]
+            table_ms, nearby_ms = _best_of(table, 3), _best_of(nearby)
+        print(f"{radius:>10} {len(expected):>10} {table_ms:>9.1f} {nearby_ms:>10.2f}")
+
+    stmt, params = next(s for s in reversed(statements) if "BETWEEN" in s[0])
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {stmt}", params).all()
+    print("plan:", "; ".join(row[-1] for row in plan))
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Benchmark: cart summary and item list, per-row hydration in Python vs. one SQL statement.
+
+The "py" columns load the lines' Items and Users as ORM objects and sum in a loop (how
+/cart/summary and /cart/items used to work); "sql" is summarize_cart / cart_item_rows, one
+aggregate (or column-only) query over the cart's lines. Carts of 1 to 500 lines split across
+five assignees, on a scratch SQLite file.
+
+Run from the backend directory:
+    python benchmarks/bench_cart_summary.py
+"""
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, Role, Cafe, Item
+from app.routers.cart import summarize_cart, cart_item_rows
+from app.services.cart_store import CartState, CartLine
+
+LINE_COUNTS = (1, 10, 100, 500)
+ASSIGNEES = 5
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def _python_summary(db, cart: CartState) -> dict:
+    lines = list(cart.lines.values())
+    items = {it.id: it for it in db.query(Item).filter(Item.id.in_({l.item_id for l in lines}))}
+    people = {u.id: u for u in db.query(User).filter(User.id.in_({l.assignee_user_id for l in lines}))}
+    by_person = defaultdict(lambda: {"calories": 0.0, "price": 0.0})
+    for line in lines:
+        it, person = items[line.item_id], people[line.assignee_user_id]
+        by_person[person.email]["calories"] += it.calories * line.quantity
+        by_person[person.email]["price"] += it.price * line.quantity
+    db.expunge_all()
+    return by_person
+
+
+def _python_items(db, cart: CartState) -> list:
+    items = {it.id: it for it in db.query(Item).filter(Item.id.in_({l.item_id for l in cart.lines.values()}))}
+    rows = [{"id": n, "item": {"id": items[l.item_id].id, "name": items[l.item_id].name, "price": float(items[l.item_id].price)}, "quantity": l.quantity}
+            for n, l in cart.lines.items()]
+    db.expunge_all()
+    return rows
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench_cart.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with SessionLocal() as db:
+        users = [User(email=f"bench-{uuid.uuid4().hex}@example.com", name="U", hashed_password="x", role=Role.USER) for _ in range(ASSIGNEES)]
+        db.add_all(users)
+        db.commit()
+        cafe = Cafe(name="BenchCafe", lat=35.78, lng=-78.64, owner_id=users[0].id)
+        db.add(cafe)
+        db.commit()
+        items = [Item(cafe_id=cafe.id, name=f"Item{i}", description="d", calories=100 + i, price=3.0 + i % 7) for i in range(max(LINE_COUNTS))]
+        db.add_all(items)
+        db.commit()
+        user_ids, item_ids, cafe_id = [u.id for u in users], [it.id for it in items], cafe.id
+
+    print(f"{'lines':>6} {'summary py ms':>14} {'summary sql ms':>15} {'items py ms':>12} {'items sql ms':>13}")
+    for n in LINE_COUNTS:
+        cart = CartState(cart_id=0, user_id=user_ids[0], created_at=datetime.utcnow())
+        for i in range(n):
+            cart.add_line(CartLine(item_id=item_ids[i], cafe_id=cafe_id, quantity=1 + i % 3, assignee_user_id=user_ids[i % ASSIGNEES]))
+        with SessionLocal() as db:
+            py_sum = _best_of(lambda: _python_summary(db, cart))
+            sql_sum = _best_of(lambda: summarize_cart(db, cart))
+            py_items = _best_of(lambda: _python_items(db, cart))
+            sql_items = _best_of(lambda: cart_item_rows(db, cart))
+        print(f"{n:>6} {py_sum:>14.2f} {sql_sum:>15.2f} {py_items:>12.2f} {sql_items:>13.2f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
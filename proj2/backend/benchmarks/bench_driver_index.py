@@ -0,0 +1,77 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Benchmark: nearest idle driver lookup via the grid index vs. a linear haversine scan.
+
+Run from the backend directory:
+    python benchmarks/bench_driver_index.py
+"""
+import pathlib
+import random
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.spatial import GeoGridIndex, haversine_km
+
+# Roughly a metro area around Raleigh, NC
+CENTER_LAT, CENTER_LNG, SPREAD_DEG = 35.78, -78.64, 0.4
+QUERIES = 200
+
+
+def _points(n: int, rng: random.Random) -> list[tuple[float, float]]:
+    return [(CENTER_LAT + rng.uniform(-SPREAD_DEG, SPREAD_DEG), CENTER_LNG + rng.uniform(-SPREAD_DEG, SPREAD_DEG)) for _ in range(n)]
+
+
+def _linear_nearest(points, lat, lng):
+    best, best_km = None, float("inf")
+    for k, (plat, plng) in enumerate(points):
+        d = haversine_km(lat, lng, plat, plng)
+        if d < best_km:
+            best, best_km = k, d
+    return best, best_km
+
+
+def run(n: int) -> tuple[float, float, float]:
+    """Return (build_ms, grid_us_per_query, linear_us_per_query) for `n` drivers."""
+    rng = random.Random(n)
+    points = _points(n, rng)
+    queries = _points(QUERIES, rng)
+
+    t0 = time.perf_counter()
+    idx = GeoGridIndex()
+    for k, (lat, lng) in enumerate(points):
+        idx.insert(k, lat, lng)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    grid_hits = [idx.nearest(lat, lng) for lat, lng in queries]
+    grid_us = (time.perf_counter() - t0) / QUERIES * 1e6
+
+    linear_queries = queries if n <= 10_000 else queries[:20]
+    t0 = time.perf_counter()
+    linear_hits = [_linear_nearest(points, lat, lng) for lat, lng in linear_queries]
+    linear_us = (time.perf_counter() - t0) / len(linear_queries) * 1e6
+
+    assert [h[0] for h in grid_hits[:len(linear_hits)]] == [h[0] for h in linear_hits]
+    return build_ms, grid_us, linear_us
+
+
+def main():
+    print(f"{'drivers':>8} {'build ms':>10} {'grid us/q':>10} {'linear us/q':>12} {'speedup':>8}")
+    for n in (100, 1_000, 10_000, 100_000):
+        build_ms, grid_us, linear_us = run(n)
+        print(f"{n:>8} {build_ms:>10.1f} {grid_us:>10.1f} {linear_us:>12.1f} {linear_us / grid_us:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
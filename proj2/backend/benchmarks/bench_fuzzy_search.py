@@ -0,0 +1,76 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Benchmark: misspelled-name search, trigram inverted index vs. scoring every name.
+
+Indexes 1k to 100k generated item names (as the in-process item index would hold them) and
+times misspelled queries through TrigramIndex.search against a scan that computes the same
+trigram overlap for every name. Both return the same matches; the table shows index build
+time and per-query latency.
+
+Run from the backend directory:
+    python benchmarks/bench_fuzzy_search.py
+"""
+import math
+import pathlib
+import random
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.fuzzy_search import TrigramIndex, trigrams
+
+SIZES = (1_000, 10_000, 100_000)
+QUERIES = ("capuccino", "pistacio gelato", "chiken wrap", "matcha latte", "gochujan")
+THRESHOLD = 0.5
+
+BASES = ["latte", "mocha", "wrap", "bowl", "burger", "salad", "gelato", "smoothie", "toast", "curry", "ramen", "taco", "cappuccino"]
+FLAVOURS = ["spicy", "vanilla", "chicken", "paneer", "oat", "berry", "mango", "truffle", "pistachio", "matcha", "garden", "smoky"]
+EXTRAS = ["saffron", "yuzu", "sumac", "tahini", "miso", "gochujang", "iced", "double", "mini", "classic"]
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def _scan(names: list[frozenset], q: str) -> list[int]:
+    grams = trigrams(q)
+    need = max(1, math.ceil(THRESHOLD * len(grams)))
+    return [key for key, g in enumerate(names) if len(grams & g) >= need]
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'names':>8} {'build ms':>9} {'query':>16} {'matches':>8} {'scan ms':>8} {'index ms':>9}")
+    for n in SIZES:
+        names = [f"{rng.choice(EXTRAS).title()} {rng.choice(FLAVOURS).title()} {rng.choice(BASES).title()}" for _ in range(n)]
+        index = TrigramIndex()
+        t0 = time.perf_counter()
+        for key, name in enumerate(names):
+            index.insert(key, name)
+        build_ms = (time.perf_counter() - t0) * 1000
+        grams = [trigrams(name) for name in names]
+        for q in QUERIES:
+            matches = len(index.search(q, limit=n, threshold=THRESHOLD))
+            assert matches == len(_scan(grams, q))
+            scan_ms = _best_of(lambda: _scan(grams, q), 3)
+            index_ms = _best_of(lambda: index.search(q, limit=50, threshold=THRESHOLD))
+            print(f"{n:>8} {build_ms:>9.0f} {q:>16} {matches:>8} {scan_ms:>8.2f} {index_ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Benchmark: scalar calculate_distance loop vs. vectorized calculate_distances.
+
+Run from the backend directory:
+    python benchmarks/bench_haversine.py
+"""
+import pathlib
+import sys
+import time
+
+import numpy as np
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.driver import calculate_distance, calculate_distances, calculate_distance_matrix
+
+CENTER_LAT, CENTER_LNG, SPREAD_DEG = 35.78, -78.64, 0.4
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'drivers':>8} {'scalar ms':>10} {'numpy ms':>10} {'speedup':>8}")
+    for n in (100, 10_000, 100_000):
+        lats = CENTER_LAT + rng.uniform(-SPREAD_DEG, SPREAD_DEG, n)
+        lngs = CENTER_LNG + rng.uniform(-SPREAD_DEG, SPREAD_DEG, n)
+        lat_list, lng_list = lats.tolist(), lngs.tolist()
+        scalar = _best_of(lambda: [calculate_distance(CENTER_LAT, CENTER_LNG, a, b) for a, b in zip(lat_list, lng_list)])
+        vector = _best_of(lambda: calculate_distances(CENTER_LAT, CENTER_LNG, lats, lngs))
+        print(f"{n:>8} {scalar:>10.2f} {vector:>10.3f} {scalar / vector:>7.0f}x")
+
+    cafes = 200
+    clats = CENTER_LAT + rng.uniform(-SPREAD_DEG, SPREAD_DEG, cafes)
+    clngs = CENTER_LNG + rng.uniform(-SPREAD_DEG, SPREAD_DEG, cafes)
+    matrix_ms = _best_of(lambda: calculate_distance_matrix(clats, clngs, lats[:10_000], lngs[:10_000]))
+    print(f"distance matrix {cafes} cafes x 10000 drivers: {matrix_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Benchmark: "meals under 600 kcal", whole catalog filtered client-side vs. one /items/search page.
+
+"catalog" is what the frontend used to do: load every active item as GET /items returns them,
+then filter and sort in the client. "page" is search_items, served from the (active, key, id)
+indexes 50 rows at a time; "page 20" follows the X-Next-Cursor chain to the 20th page, which
+costs the same as the first. BENCH_ITEMS (default 200,000) items on a scratch SQLite file.
+
+Run from the backend directory:
+    python benchmarks/bench_item_search.py
+"""
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import Response
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, Role, Cafe, Item
+from app.routers.items import search_items
+
+ITEMS = int(os.getenv("BENCH_ITEMS", 200_000))
+CAFES = 500
+PAGE = 50
+# (label, search_items filters, the same filter and sort key for the client-side version)
+CASES = (
+    ("under 600 kcal", {"max_calories": 600}, lambda it: it.calories <= 600, lambda it: (it.calories, it.id)),
+    ("veg mains <= $8 by price", {"veg_flag": True, "kind": "main", "max_price": 8.0, "sort": "price"},
+     lambda it: it.veg_flag and it.kind == "main" and it.price <= 8.0, lambda it: (it.price, it.id)),
+    ("best kcal per $", {"sort": "calories_per_dollar", "order": "desc"},
+     lambda it: it.price > 0, lambda it: (-it.calories / it.price, -it.id)),
+)
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def _search(db, filters: dict, cursor: str | None = None) -> tuple[list, str | None]:
+    params = {"min_calories": None, "max_calories": None, "max_price": None, "veg_flag": None, "kind": None,
+              "cafe_id": None, "sort": "calories", "order": "asc", **filters}
+    response = Response()
+    rows = search_items(response, limit=PAGE, cursor=cursor, db=db, **params)
+    return rows, response.headers.get("X-Next-Cursor")
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench_items.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rng = random.Random(0)
+
+    with SessionLocal() as db:
+        owner = User(email="bench-owner@example.com", name="O", hashed_password="x", role=Role.OWNER)
+        db.add(owner)
+        db.commit()
+        cafes = [Cafe(name=f"Cafe{i}", lat=0.0, lng=0.0, owner_id=owner.id) for i in range(CAFES)]
+        db.add_all(cafes)
+        db.commit()
+        cafe_ids = [c.id for c in cafes]
+        rows = [{"cafe_id": rng.choice(cafe_ids), "name": f"Item{i}", "calories": rng.randint(50, 1500), "price": round(rng.uniform(1, 25), 2),
+                 "veg_flag": rng.random() < 0.4, "kind": rng.choice(["main", "dessert", "drink", "side"]), "active": rng.random() < 0.95}
+                for i in range(ITEMS)]
+        db.execute(insert(Item), rows)
+        db.commit()
+        db.connection().exec_driver_sql("ANALYZE")
+        db.commit()
+
+    print(f"{ITEMS} items")
+    print(f"{'case':>26} {'catalog ms':>11} {'page 1 ms':>10} {'page 20 ms':>11}")
+    for label, filters, keep, key in CASES:
+        with SessionLocal() as db:
+            def catalog():
+                items = db.query(Item).filter(Item.active == True).all()
+                page = sorted((it for it in items if keep(it)), key=key)[:PAGE]
+                db.expunge_all()
+                return page
+            expected = [it.id for it in catalog()]
+            assert [r["id"] for r in _search(db, filters)[0]] == expected
+            cursor = None
+            for _ in range(19):
+                cursor = _search(db, filters, cursor)[1]
+            catalog_ms = _best_of(catalog, 3)
+            first_ms = _best_of(lambda: _search(db, filters))
+            deep_ms = _best_of(lambda: _search(db, filters, cursor))
+        print(f"{label:>26} {catalog_ms:>11.1f} {first_ms:>10.2f} {deep_ms:>11.2f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
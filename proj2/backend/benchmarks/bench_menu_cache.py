@@ -0,0 +1,99 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Benchmark: menu listings rebuilt on every request vs. served from the versioned menu cache.
+
+"miss" is what every GET /items/{cafe_id} and GET /items used to cost: load the rows and
+serialize them (forced here by bumping the menu version before each call). "hit" is a cached
+body for an unchanged menu, and "304" a client revalidating with the ETag it already holds;
+neither touches the database. BENCH_ITEMS (default 50,000) items over BENCH_ITEM_CAFES (default
+250) cafes on a scratch SQLite file.
+
+Run from the backend directory:
+    python benchmarks/bench_menu_cache.py
+"""
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, Role, Cafe, Item
+from app.routers.items import list_items, list_all_items
+from app.services.menu_cache import menu_cache, ALL_CAFES
+
+ITEMS = int(os.getenv("BENCH_ITEMS", 50_000))
+CAFES = int(os.getenv("BENCH_ITEM_CAFES", 250))
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench_menu_cache.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rng = random.Random(0)
+
+    with SessionLocal() as db:
+        owner = User(email="bench-owner@example.com", name="O", hashed_password="x", role=Role.OWNER)
+        db.add(owner)
+        db.commit()
+        cafes = [Cafe(name=f"Cafe{i}", lat=0.0, lng=0.0, owner_id=owner.id) for i in range(CAFES)]
+        db.add_all(cafes)
+        db.commit()
+        cafe_ids = [c.id for c in cafes]
+        rows = [{"cafe_id": rng.choice(cafe_ids), "name": f"Item{i}", "description": "House special", "calories": rng.randint(50, 1500),
+                 "price": round(rng.uniform(1, 25), 2), "kind": rng.choice(["main", "dessert", "drink", "side"])}
+                for i in range(ITEMS)]
+        db.execute(insert(Item), rows)
+        db.commit()
+
+    cafe_id = cafe_ids[0]
+    cases = (
+        ("one cafe", cafe_id, lambda db, etag: list_items(cafe_id, q=None, match="fuzzy", if_none_match=etag, db=db)),
+        ("catalog", ALL_CAFES, lambda db, etag: list_all_items(q=None, match="fuzzy", if_none_match=etag, db=db)),
+    )
+    print(f"{ITEMS} items, {CAFES} cafes")
+    print(f"{'listing':>10} {'miss ms':>9} {'hit ms':>8} {'304 ms':>8}")
+    for label, key, listing in cases:
+        with SessionLocal() as db:
+            def miss():
+                menu_cache.bump([key])
+                listing(db, None)
+                db.expunge_all()
+            first = listing(db, None)
+            etag = first.headers["ETag"]
+            assert listing(db, etag).status_code == 304
+            miss_ms = _best_of(miss, 3)
+            listing(db, None)
+            hit_ms = _best_of(lambda: listing(db, None))
+            not_modified_ms = _best_of(lambda: listing(db, etag))
+        print(f"{label:>10} {miss_ms:>9.2f} {hit_ms:>8.3f} {not_modified_ms:>8.3f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Benchmark: menu search latency, `name ILIKE '%q%'` scan vs. the full-text index, on 1M items.
+
+Fills a scratch SQLite file with BENCH_ITEMS (default 1,000,000) generated items, the FTS5
+index following through its triggers, then times queries of varying selectivity both ways.
+Both sides read ids only, so the numbers are the lookup (plus ranking) rather than hydration.
+
+Run from the backend directory:
+    python benchmarks/bench_menu_search.py
+    BENCH_ITEMS=100000 python benchmarks/bench_menu_search.py
+"""
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, Role, Cafe, Item
+from app.services.menu_search import apply_search
+
+ITEMS = int(os.getenv("BENCH_ITEMS", 1_000_000))
+CAFES = 1000
+# From rare (a word in 1 in 1000 descriptions) to common (a flavour in 1 in 12 names)
+QUERIES = ("saffron", "pistachio gelato", "spicy chicken wrap", "latte", "oat")
+
+BASES = ["latte", "mocha", "wrap", "bowl", "burger", "salad", "gelato", "smoothie", "toast", "curry", "ramen", "taco"]
+FLAVOURS = ["spicy", "vanilla", "chicken", "paneer", "oat", "berry", "mango", "truffle", "pistachio", "matcha", "garden", "smoky"]
+EXTRAS = ["saffron", "yuzu", "sumac", "tahini", "miso", "gochujang"]
+INGREDIENTS = ["milk", "sugar", "flour", "egg", "rice", "kale", "tofu", "basil", "garlic", "onion", "tomato", "cheese",
+               "butter", "honey", "lime", "chili", "ginger", "cumin", "mint", "almond", "cocoa", "yogurt", "lentil", "pepper"]
+WORDS = ["fresh", "house", "roasted", "crispy", "creamy", "seasonal", "slow", "local", "grilled", "sweet"]
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def _rows(rng: random.Random, cafe_ids: list[int]):
+    for _ in range(ITEMS):
+        name = f"{rng.choice(FLAVOURS).title()} {rng.choice(BASES).title()}"
+        extra = rng.choice(EXTRAS) if rng.random() < 0.01 else rng.choice(WORDS)
+        yield {
+            "cafe_id": rng.choice(cafe_ids), "name": name, "calories": rng.randint(50, 1200), "price": round(rng.uniform(2, 20), 2),
+            "description": " ".join(rng.sample(WORDS, 4) + [extra]), "ingredients": ", ".join(rng.sample(INGREDIENTS, 3)), "active": True,
+        }
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench_search.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rng = random.Random(0)
+
+    with SessionLocal() as db:
+        owner = User(email="bench-owner@example.com", name="O", hashed_password="x", role=Role.OWNER)
+        db.add(owner)
+        db.commit()
+        cafes = [Cafe(name=f"Cafe{i}", lat=0.0, lng=0.0, owner_id=owner.id) for i in range(CAFES)]
+        db.add_all(cafes)
+        db.commit()
+        cafe_ids = [c.id for c in cafes]
+        t0 = time.perf_counter()
+        rows = _rows(rng, cafe_ids)
+        while chunk := [r for _, r in zip(range(50_000), rows)]:
+            db.execute(insert(Item), chunk)
+        db.commit()
+        print(f"loaded {ITEMS} items (with FTS index) in {time.perf_counter() - t0:.1f} s")
+
+        print(f"{'query':>20} {'matches':>8} {'ilike ms':>9} {'fts ms':>8} {'speedup':>8}")
+        base = db.query(Item.id).filter(Item.active == True)
+        for q in QUERIES:
+            ilike = lambda: base.filter(Item.name.ilike(f"%{q}%")).order_by(Item.name).all()
+            fts = lambda: apply_search(base, q).all()
+            matches = len(fts())
+            ilike_ms, fts_ms = _best_of(ilike, 3), _best_of(fts, 3)
+            print(f"{q:>20} {matches:>8} {ilike_ms:>9.1f} {fts_ms:>8.1f} {ilike_ms / fts_ms:>7.1f}x")
+
+        cafe_id = cafe_ids[0]
+        per_cafe = db.query(Item.id).filter(Item.cafe_id == cafe_id, Item.active == True)
+        ilike_ms = _best_of(lambda: per_cafe.filter(Item.name.ilike("%pistachio%")).order_by(Item.name).all())
+        fts_ms = _best_of(lambda: apply_search(per_cafe, "pistachio").all())
+        scan_ms = _best_of(lambda: apply_search(per_cafe, "pistachio", within_cafe=True).all())
+        print(f"one cafe, 'pistachio': ilike {ilike_ms:.2f} ms, fts {fts_ms:.2f} ms, within_cafe scan {scan_ms:.2f} ms")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
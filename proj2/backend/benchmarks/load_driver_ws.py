@@ -0,0 +1,91 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""Load test: thousands of concurrent driver WebSockets on the pub/sub hub.
+
+Starts the app under uvicorn on a local port, opens one /drivers/driver/{id}/ws socket per
+simulated driver, then publishes rounds of location events to every driver topic and
+reports connect time, memory held and end-to-end fan-out latency.
+
+Run from the backend directory (needs the `websockets` package):
+    python benchmarks/load_driver_ws.py            # 2000 sockets
+    python benchmarks/load_driver_ws.py 5000
+"""
+import asyncio
+import pathlib
+import resource
+import socket
+import sys
+import threading
+import time
+from datetime import timedelta
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import uvicorn
+import websockets
+
+from app.main import app
+from app.auth import create_token
+from app.models import Role
+from app.services.pubsub import hub, driver_topic
+
+ROUNDS = 5
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def main(n: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, 2 * n + 256)), hard))
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    rss0 = _rss_mb()
+    t0 = time.perf_counter()
+    sockets = []
+    for start in range(0, n, 500):
+        chunk = range(start + 1, min(n, start + 500) + 1)
+        tokens = [create_token(i, f"d{i}@example.com", Role.DRIVER, timedelta(minutes=30)) for i in chunk]
+        sockets += await asyncio.gather(*(
+            websockets.connect(f"ws://127.0.0.1:{port}/drivers/driver/{i}/ws?token={tok}", max_queue=None)
+            for i, tok in zip(chunk, tokens)
+        ))
+    while hub.subscriber_count() < n:
+        await asyncio.sleep(0.01)
+    print(f"connected {n} sockets in {time.perf_counter() - t0:.2f}s, subscribers={hub.subscriber_count()}, max RSS +{_rss_mb() - rss0:.0f} MB")
+
+    for r in range(ROUNDS):
+        t0 = time.perf_counter()
+        for i in range(1, n + 1):
+            hub.publish(driver_topic(i), "location", {"driver_id": i, "lat": 35.78 + r * 1e-4, "lng": -78.64, "status": "IDLE"})
+        publish_ms = (time.perf_counter() - t0) * 1000
+        await asyncio.gather(*(ws.recv() for ws in sockets))
+        print(f"round {r + 1}: published {n} events in {publish_ms:.1f} ms, all delivered after {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    await asyncio.gather(*(ws.close() for ws in sockets))
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
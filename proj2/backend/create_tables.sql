@@ -2,6 +2,12 @@
 -- This script creates all required enum types and tables
 
 -- Drop existing tables and types if they exist (in reverse dependency order)
+DROP TABLE IF EXISTS refund_requests_archive CASCADE;
+DROP TABLE IF EXISTS payments_archive CASCADE;
+DROP TABLE IF EXISTS order_items_archive CASCADE;
+DROP TABLE IF EXISTS orders_archive CASCADE;
+DROP TABLE IF EXISTS idempotency_keys CASCADE;
+DROP TABLE IF EXISTS order_events CASCADE;
 DROP TABLE IF EXISTS refund_requests CASCADE;
 DROP TABLE IF EXISTS payments CASCADE;
 DROP TABLE IF EXISTS order_items CASCADE;
@@ -11,6 +17,7 @@ DROP TABLE IF EXISTS carts CASCADE;
 DROP TABLE IF EXISTS items CASCADE;
 DROP TABLE IF EXISTS staff_assignments CASCADE;
 DROP TABLE IF EXISTS calorie_goals CASCADE;
+DROP TABLE IF EXISTS driver_current_state CASCADE;
 DROP TABLE IF EXISTS driver_locations CASCADE;
 DROP TABLE IF EXISTS cafes CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
@@ -59,6 +66,8 @@ CREATE TABLE cafes (
 
 -- Create index on name
 CREATE INDEX ix_cafes_name ON cafes (name);
+-- Bounding-box prefilter for /cafes/nearby; with active it covers the box scan
+CREATE INDEX ix_cafes_lat_lng ON cafes (lat, lng, active);
 
 -- Driver locations table
 CREATE TABLE driver_locations (
@@ -73,6 +82,19 @@ CREATE TABLE driver_locations (
 -- Create indexes
 CREATE INDEX ix_driver_locations_driver_id ON driver_locations (driver_id);
 CREATE INDEX ix_driver_locations_status ON driver_locations (status);
+CREATE INDEX ix_driver_locations_timestamp ON driver_locations (timestamp);
+
+-- Driver current state table (one row per driver, upserted on every location/status write)
+CREATE TABLE driver_current_state (
+    driver_id INTEGER PRIMARY KEY REFERENCES users(id),
+    lat DOUBLE PRECISION NOT NULL,
+    lng DOUBLE PRECISION NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    status driverstatus DEFAULT 'IDLE' NOT NULL
+);
+
+-- Create index
+CREATE INDEX ix_driver_current_state_status ON driver_current_state (status);
 
 -- Staff assignments table
 CREATE TABLE staff_assignments (
@@ -96,18 +118,30 @@ CREATE TABLE items (
     servings DOUBLE PRECISION,   -- per item
     veg_flag BOOLEAN DEFAULT TRUE,
     kind VARCHAR,  -- dessert, milkshake, etc.
-    active BOOLEAN DEFAULT TRUE
+    active BOOLEAN DEFAULT TRUE,
+    -- Full-text menu search document, weighted name > description > ingredients
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(ingredients, '')), 'C')
+    ) STORED
 );
 
 -- Create indexes
 CREATE INDEX ix_items_cafe_id ON items (cafe_id);
 CREATE INDEX ix_items_name ON items (name);
+CREATE INDEX ix_items_search_vector ON items USING GIN (search_vector);
+-- Range filters and keyset pagination for /items/search
+CREATE INDEX ix_items_active_calories ON items (active, calories, id);
+CREATE INDEX ix_items_active_price ON items (active, price, id);
+CREATE INDEX ix_items_active_calories_per_dollar ON items (active, (calories / CAST(price AS FLOAT)), id) WHERE price > 0;
 
 -- Carts table
 CREATE TABLE carts (
     id SERIAL PRIMARY KEY,
     user_id INTEGER REFERENCES users(id),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    next_line_no INTEGER DEFAULT 1
 );
 
 -- Create index on user_id
@@ -119,7 +153,9 @@ CREATE TABLE cart_items (
     cart_id INTEGER REFERENCES carts(id),
     item_id INTEGER REFERENCES items(id),
     quantity INTEGER DEFAULT 1,
-    assignee_user_id INTEGER REFERENCES users(id)
+    assignee_user_id INTEGER REFERENCES users(id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    line_no INTEGER
 );
 
 -- Create indexes
@@ -143,6 +179,24 @@ CREATE TABLE orders (
 CREATE INDEX ix_orders_user_id ON orders (user_id);
 CREATE INDEX ix_orders_cafe_id ON orders (cafe_id);
 CREATE INDEX ix_orders_driver_id ON orders (driver_id);
+CREATE INDEX ix_orders_cafe_created_id ON orders (cafe_id, created_at, id) INCLUDE (status, total_price, total_calories, can_cancel_until, driver_id);
+CREATE INDEX ix_orders_status_created ON orders (status, created_at);
+CREATE INDEX ix_orders_user_created_id ON orders (user_id, created_at, id) INCLUDE (status, cafe_id, total_price, total_calories, can_cancel_until, driver_id);
+
+-- Order events table (append-only change log; id is the sync sequence)
+CREATE TABLE order_events (
+    id SERIAL PRIMARY KEY,
+    order_id INTEGER NOT NULL REFERENCES orders(id),
+    cafe_id INTEGER NOT NULL REFERENCES cafes(id),
+    type VARCHAR NOT NULL,
+    status orderstatus NOT NULL,
+    driver_id INTEGER REFERENCES users(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create indexes
+CREATE INDEX ix_order_events_order_id ON order_events (order_id);
+CREATE INDEX ix_order_events_cafe_id_id ON order_events (cafe_id, id);
 
 -- Order items table
 CREATE TABLE order_items (
@@ -194,19 +248,91 @@ CREATE TABLE refund_requests (
 -- Create index
 CREATE INDEX ix_refund_requests_order_id ON refund_requests (order_id);
 
+-- Idempotency keys table (stored responses replayed for retried requests)
+CREATE TABLE idempotency_keys (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    scope VARCHAR NOT NULL,
+    key VARCHAR NOT NULL,
+    request_hash VARCHAR NOT NULL,
+    status_code INTEGER NOT NULL,
+    response_body TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    CONSTRAINT uq_idempotency_user_scope_key UNIQUE (user_id, scope, key)
+);
+
+-- Create index
+CREATE INDEX ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);
+
+-- Archive tables (finished orders moved out of the live tables; same ids, no foreign keys)
+CREATE TABLE orders_archive (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    cafe_id INTEGER,
+    driver_id INTEGER,
+    status orderstatus,
+    created_at TIMESTAMP,
+    can_cancel_until TIMESTAMP,
+    pickup_code VARCHAR,
+    total_price DOUBLE PRECISION,
+    total_calories INTEGER,
+    archived_at TIMESTAMP NOT NULL
+);
+
+CREATE TABLE order_items_archive (
+    id INTEGER PRIMARY KEY,
+    order_id INTEGER,
+    item_id INTEGER,
+    quantity INTEGER,
+    assignee_user_id INTEGER,
+    subtotal_price DOUBLE PRECISION,
+    subtotal_calories INTEGER,
+    archived_at TIMESTAMP NOT NULL
+);
+
+CREATE TABLE payments_archive (
+    id INTEGER PRIMARY KEY,
+    order_id INTEGER,
+    provider VARCHAR,
+    amount DOUBLE PRECISION,
+    status paymentstatus,
+    created_at TIMESTAMP,
+    archived_at TIMESTAMP NOT NULL
+);
+
+CREATE TABLE refund_requests_archive (
+    id INTEGER PRIMARY KEY,
+    order_id INTEGER,
+    reason TEXT,
+    status VARCHAR,
+    archived_at TIMESTAMP NOT NULL
+);
+
+-- Create indexes
+CREATE INDEX ix_orders_archive_user_id ON orders_archive (user_id);
+CREATE INDEX ix_orders_archive_cafe_id ON orders_archive (cafe_id);
+CREATE INDEX ix_order_items_archive_order_id ON order_items_archive (order_id);
+CREATE INDEX ix_payments_archive_order_id ON payments_archive (order_id);
+CREATE INDEX ix_refund_requests_archive_order_id ON refund_requests_archive (order_id);
+
 -- Add comments for documentation
 COMMENT ON TABLE users IS 'User accounts and profiles';
 COMMENT ON TABLE cafes IS 'Restaurant/cafe information';
 COMMENT ON TABLE staff_assignments IS 'Staff assignments to cafes';
 COMMENT ON TABLE driver_locations IS 'Driver location tracking and status';
+COMMENT ON TABLE driver_current_state IS 'Latest location and status per driver';
 COMMENT ON TABLE items IS 'Menu items';
 COMMENT ON TABLE carts IS 'Shopping carts';
 COMMENT ON TABLE cart_items IS 'Items in carts';
 COMMENT ON TABLE orders IS 'Customer orders';
+COMMENT ON TABLE order_events IS 'Order change log for incremental sync';
 COMMENT ON TABLE order_items IS 'Items in orders';
 COMMENT ON TABLE payments IS 'Payment records';
 COMMENT ON TABLE calorie_goals IS 'User calorie goals';
 COMMENT ON TABLE refund_requests IS 'Refund requests';
+COMMENT ON TABLE idempotency_keys IS 'Stored responses for Idempotency-Key retries';
+COMMENT ON TABLE orders_archive IS 'Finished orders moved out of orders by the archival job';
 
 -- Grant permissions (adjust as needed for your setup)
 -- GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO your_app_user;
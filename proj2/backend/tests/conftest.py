@@ -8,9 +8,10 @@
 # - Supraj Gijre
 
 import os
+from contextlib import contextmanager
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 import os, sys
 
@@ -52,6 +53,9 @@ if BACKEND_DIR not in sys.path:
 
 from app.main import app
 from app.database import Base, get_db
+from app.services.dispatch_queue import dispatch_queue
+from app.services.cart_store import cart_store
+from app.services.fuzzy_search import fuzzy_search
 
 # Use a temporary SQLite DB for tests
 TEST_DB_URL = "sqlite:///./test.db"
@@ -74,8 +78,31 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+# Background driver assignment must write to the same database as the requests
+dispatch_queue.session_factory = TestingSessionLocal
+cart_store.session_factory = TestingSessionLocal
+fuzzy_search.session_factory = TestingSessionLocal
 
 @pytest.fixture(scope="session")
 def client():
     with TestClient(app) as c:
-        yield c
\ No newline at end of file
+        yield c
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert that a block runs at most `limit` SQL statements against the test database, e.g.
+    `with query_budget(2): client.get(...)`. The failure message lists the statements.
+    """
+    @contextmanager
+    def _budget(limit: int):
+        statements = []
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+        assert len(statements) <= limit, f"{len(statements)} queries, budget {limit}:\n" + "\n".join(statements)
+    return _budget
@@ -0,0 +1,105 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for GET /cafes/nearby: radius filtering, distance order, keyset pagination
+and the bounding box being applied by the database rather than in Python.
+"""
+from app.database import get_db
+from app.main import app
+from app.models import Cafe
+from app.routers import cafes as cafes_router
+from app.services.spatial import bounding_box, haversine_km, haversine_km_array
+
+# Far from the (1, 1) and (0, 0) cafes other tests create
+ORIGIN = (-33.8688, 151.2093)
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _nearby(client, lat, lng, **params):
+    r = client.get("/cafes/nearby", params={"lat": lat, "lng": lng, **params})
+    assert r.status_code == 200
+    return r
+
+
+def test_nearby_cafes_sorted_by_distance_and_paginated(client, query_budget):
+    owner_hdr, _ = register_and_login(client, "nearby_owner@example.com", "opw", name="Own", role="OWNER")
+    # 0.01 degrees of latitude is about 1.1 km
+    offsets = [0.003, -0.012, 0.025, 0.004, -0.031, 0.046, 0.09]
+    ids = []
+    for n, dlat in enumerate(offsets):
+        cafe = {"name": f"Nearby{n}", "address": "A", "lat": ORIGIN[0] + dlat, "lng": ORIGIN[1]}
+        ids.append(client.post("/cafes", json=cafe, headers=owner_hdr).json()["id"])
+    # Inside the bounding box of a 5 km circle but outside the circle itself
+    corner = {"name": "NearbyCorner", "address": "A", "lat": ORIGIN[0] + 0.04, "lng": ORIGIN[1] + 0.05}
+    client.post("/cafes", json=corner, headers=owner_hdr)
+
+    cafes = _nearby(client, *ORIGIN, radius_km=5).json()
+    assert [c["name"] for c in cafes] == ["Nearby0", "Nearby3", "Nearby1", "Nearby2", "Nearby4"]
+    assert all(abs(c["distance_km"] - haversine_km(*ORIGIN, c["lat"], c["lng"])) < 1e-9 for c in cafes)
+    assert [c["name"] for c in _nearby(client, *ORIGIN, radius_km=12).json()][-2:] == ["NearbyCorner", "Nearby6"]
+
+    names, cursor, pages = [], None, 0
+    while True:
+        # The bounding-box scan and the page's cafes
+        with query_budget(2):
+            r = _nearby(client, *ORIGIN, radius_km=5, limit=2, **({"cursor": cursor} if cursor else {}))
+        names += [c["name"] for c in r.json()]
+        pages += 1
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert names == [c["name"] for c in cafes] and pages == 3
+
+    assert client.get("/cafes/nearby", params={"lat": 91, "lng": 0}).status_code == 422
+    assert client.get("/cafes/nearby", params={"lat": 0, "lng": 0, "radius_km": 1000}).status_code == 422
+    assert client.get("/cafes/nearby", params={"lat": 0, "lng": 0, "cursor": "bogus"}).status_code == 400
+
+
+def test_nearby_across_the_antimeridian(client):
+    owner_hdr, _ = register_and_login(client, "nearby_dateline_owner@example.com", "opw", name="Own", role="OWNER")
+    east = {"name": "DatelineEast", "address": "A", "lat": -16.5, "lng": 179.99}
+    west = {"name": "DatelineWest", "address": "A", "lat": -16.5, "lng": -179.99}
+    for cafe in (east, west):
+        client.post("/cafes", json=cafe, headers=owner_hdr)
+    assert [c["name"] for c in _nearby(client, -16.5, 179.995, radius_km=3).json()] == ["DatelineEast", "DatelineWest"]
+
+
+def test_bounding_box_is_applied_in_sql(client, query_budget, monkeypatch):
+    owner_hdr, _ = register_and_login(client, "nearby_box_owner@example.com", "opw", name="Own", role="OWNER")
+    # A ring of cafes about 20 km out, well outside a 5 km box, and two inside it
+    for n, (dlat, dlng) in enumerate([(0.18, 0.0), (-0.18, 0.0), (0.0, 0.22), (0.0, -0.22)] * 10):
+        cafe = {"name": f"BoxRing{n}", "address": "A", "lat": ORIGIN[0] + dlat, "lng": ORIGIN[1] + dlng}
+        client.post("/cafes", json=cafe, headers=owner_hdr)
+    for n, dlat in enumerate((0.001, -0.002)):
+        client.post("/cafes", json={"name": f"BoxInside{n}", "address": "A", "lat": ORIGIN[0] + dlat, "lng": ORIGIN[1]}, headers=owner_hdr)
+
+    candidates = []
+    def _record(lat, lng, lats, lngs):
+        candidates.append(len(lats))
+        return haversine_km_array(lat, lng, lats, lngs)
+    monkeypatch.setattr(cafes_router, "haversine_km_array", _record)
+    with query_budget(2):
+        names = [c["name"] for c in _nearby(client, *ORIGIN, radius_km=5).json()]
+    assert {"BoxInside0", "BoxInside1"} <= set(names) and not any(n.startswith("BoxRing") for n in names)
+
+    # Only the cafes inside the box reach Python; the ring is filtered out by the query itself
+    (lat_lo, lat_hi), [(lng_lo, lng_hi)] = bounding_box(*ORIGIN, 5)
+    db = next(app.dependency_overrides[get_db]())
+    in_box = db.query(Cafe).filter(Cafe.lat.between(lat_lo, lat_hi), Cafe.lng.between(lng_lo, lng_hi), Cafe.active == True).count()
+    total = db.query(Cafe).count()
+    db.close()
+    assert candidates == [in_box] and total - in_box >= 40
@@ -0,0 +1,105 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for POST /cart/batch: ordered add/update/remove operations applied all or
+nothing, with one lookup each for items and assignees.
+"""
+from app.database import get_db
+from app.main import app
+from app.models import User
+
+# get_current_user's lookup + one IN query for items + one for assignee emails
+BATCH_QUERY_BUDGET = 3
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _menu(client, prefix, count):
+    owner_hdr, _ = register_and_login(client, f"{prefix}_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": f"{prefix}Cafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    return [
+        client.post(f"/items/{cafe_id}", json={"name": f"{prefix}{i}", "description": "d", "calories": 100, "price": 2.0 + i}, headers=owner_hdr).json()["id"]
+        for i in range(count)
+    ]
+
+
+def test_group_order_in_one_batch(client, query_budget):
+    items = _menu(client, "batchgrp", 4)
+    user_hdr, user = register_and_login(client, "batchgrp_user@example.com", "upw")
+    friends = [register_and_login(client, f"batchgrp_f{i}@example.com", "fpw")[1] for i in range(2)]
+    client.get("/cart/", headers=user_hdr)
+
+    ops = [
+        {"op": "add", "item_id": items[0], "quantity": 2},
+        {"op": "add", "item_id": items[1], "assignee_email": friends[0]["email"]},
+        {"op": "add", "item_id": items[2], "assignee_email": friends[1]["email"]},
+        {"op": "add", "item_id": items[3]},
+        {"op": "add", "item_id": items[0]},
+        {"op": "update", "cart_item_id": 2, "quantity": 3},
+        {"op": "update", "cart_item_id": 3, "assignee_email": friends[0]["email"]},
+        {"op": "remove", "cart_item_id": 4},
+    ]
+    with query_budget(BATCH_QUERY_BUDGET):
+        r = client.post("/cart/batch", json={"ops": ops}, headers=user_hdr)
+    assert r.status_code == 200
+    assert [x["status"] for x in r.json()["results"]] == ["added", "added", "added", "added", "updated", "updated", "updated", "removed"]
+
+    lines = {it["id"]: (it["item"]["id"], it["quantity"], it["assignee_user_id"]) for it in client.get("/cart/items", headers=user_hdr).json()}
+    assert lines == {1: (items[0], 3, user["id"]), 2: (items[1], 3, friends[0]["id"]), 3: (items[2], 1, friends[0]["id"])}
+
+
+def test_failing_operation_leaves_cart_unchanged(client):
+    items = _menu(client, "batchfail", 1)
+    other = _menu(client, "batchother", 1)
+    user_hdr, _ = register_and_login(client, "batchfail_user@example.com", "upw")
+    _, gone = register_and_login(client, "batchfail_gone@example.com", "gpw")
+    db = next(app.dependency_overrides[get_db]())
+    db.query(User).filter(User.id == gone["id"]).update({User.is_active: False})
+    db.commit()
+    db.close()
+    client.post("/cart/add", json={"item_id": items[0], "quantity": 1}, headers=user_hdr)
+    before = client.get("/cart/items", headers=user_hdr).json()
+
+    cases = [
+        ([{"op": "update", "cart_item_id": 1, "quantity": 5}, {"op": "add", "item_id": 999999}], 404, "Operation 1: Item not found"),
+        ([{"op": "add", "item_id": other[0]}], 400, "Operation 0: Cart contains items from another restaurant"),
+        ([{"op": "update", "cart_item_id": 1, "assignee_email": "nobody@example.com"}], 400, "Operation 0: Assignee not found"),
+        ([{"op": "update", "cart_item_id": 1, "assignee_email": gone["email"]}], 400, "Operation 0: Assignee not found or inactive"),
+        ([{"op": "update", "quantity": 2}], 400, "Operation 0: cart_item_id is required"),
+        ([{"op": "remove"}], 400, "Operation 0: cart_item_id is required"),
+        ([{"op": "remove", "cart_item_id": 42}], 404, "Operation 0: Cart item not found"),
+    ]
+    for ops, status, detail in cases:
+        r = client.post("/cart/batch", json={"ops": ops}, headers=user_hdr)
+        assert r.status_code == status and r.json()["detail"].startswith(detail)
+        assert client.get("/cart/items", headers=user_hdr).json() == before
+
+    # Emptying the cart first makes switching restaurants valid within one batch
+    r = client.post("/cart/batch", json={"ops": [{"op": "remove", "cart_item_id": 1}, {"op": "add", "item_id": other[0]}]}, headers=user_hdr)
+    assert r.status_code == 200
+    assert [it["item"]["id"] for it in client.get("/cart/items", headers=user_hdr).json()] == [other[0]]
+
+
+def test_single_add_after_batch_gets_a_fresh_line(client):
+    items = _menu(client, "batchnext", 3)
+    user_hdr, _ = register_and_login(client, "batchnext_user@example.com", "upw")
+    ops = [{"op": "add", "item_id": items[0]}, {"op": "add", "item_id": items[1]}]
+    assert client.post("/cart/batch", json={"ops": ops}, headers=user_hdr).status_code == 200
+
+    r = client.post("/cart/add", json={"item_id": items[2], "quantity": 1}, headers=user_hdr)
+    assert r.json() == {"status": "added", "cart_item_id": 3}
+    lines = {it["id"]: it["item"]["id"] for it in client.get("/cart/items", headers=user_hdr).json()}
+    assert lines == {1: items[0], 2: items[1], 3: items[2]}
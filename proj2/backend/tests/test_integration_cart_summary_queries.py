@@ -0,0 +1,57 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Query budget for the cart summary and item list: authentication plus one statement each,
+however many lines and assignees the cart has.
+"""
+
+# get_current_user's lookup + the aggregate (or item) query
+CART_QUERY_BUDGET = 2
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def test_cart_summary_and_items_stay_within_query_budget(client, query_budget):
+    owner_hdr, _ = register_and_login(client, "cartq_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": "CartQCafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    user_hdr, user = register_and_login(client, "cartq_user@example.com", "upw")
+    _, friend = register_and_login(client, "cartq_friend@example.com", "fpw")
+    client.get("/cart/", headers=user_hdr)
+
+    with query_budget(CART_QUERY_BUDGET):
+        assert client.get("/cart/summary", headers=user_hdr).json() == {"by_person": {}, "total_calories": 0, "total_price": 0.0}
+
+    for i in range(6):
+        item = client.post(f"/items/{cafe_id}", json={"name": f"CartQ{i}", "description": "d", "calories": 10 * (i + 1), "price": 1.5 + i}, headers=owner_hdr).json()
+        payload = {"item_id": item["id"], "quantity": i + 1}
+        if i % 2:
+            payload["assignee_email"] = friend["email"]
+        client.post("/cart/add", json=payload, headers=user_hdr)
+
+    with query_budget(CART_QUERY_BUDGET):
+        summary = client.get("/cart/summary", headers=user_hdr).json()
+    mine, theirs = (0, 2, 4), (1, 3, 5)
+    assert summary["by_person"] == {
+        user["email"]: {"calories": sum(10 * (i + 1) * (i + 1) for i in mine), "price": sum((1.5 + i) * (i + 1) for i in mine)},
+        friend["email"]: {"calories": sum(10 * (i + 1) * (i + 1) for i in theirs), "price": sum((1.5 + i) * (i + 1) for i in theirs)},
+    }
+    assert summary["total_calories"] == sum(10 * (i + 1) * (i + 1) for i in range(6))
+    assert summary["total_price"] == round(sum((1.5 + i) * (i + 1) for i in range(6)), 2)
+
+    with query_budget(CART_QUERY_BUDGET):
+        items = client.get("/cart/items", headers=user_hdr).json()
+    assert [(it["item"]["name"], it["quantity"]) for it in items] == [(f"CartQ{i}", i + 1) for i in range(6)]
+    assert {it["assignee_user_id"] for it in items} == {user["id"], friend["id"]}
@@ -0,0 +1,86 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import DriverLocation, DriverCurrentState, DriverStatus
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _driver(client, email):
+    r = client.post("/drivers/register", json={"email": email, "name": "B", "password": "pw"})
+    assert r.status_code == 200
+    tok = client.post("/drivers/login", json={"email": email, "password": "pw"}).json()["access_token"]
+    return r.json()["id"], {"Authorization": f"Bearer {tok}"}
+
+
+def test_driver_uploads_offline_buffer(client):
+    driver_id, hdr = _driver(client, "batchdrv1@example.com")
+    t0 = datetime.utcnow() - timedelta(minutes=5)
+    points = [
+        {"driver_id": driver_id, "lat": 80.0 + i * 0.001, "lng": 10.0, "timestamp": (t0 + timedelta(seconds=i)).isoformat()}
+        for i in range(50)
+    ]
+    points[10]["status"] = "OCCUPIED"
+    # Out of order on the wire; the newest point still wins
+    points.reverse()
+    r = client.post("/drivers/locations:batch", json={"points": points}, headers=hdr)
+    assert r.status_code == 200
+    assert r.json() == {"status": "ok", "points": 50, "drivers": 1}
+
+    db = SessionLocal()
+    try:
+        assert db.query(DriverLocation).filter(DriverLocation.driver_id == driver_id).count() == 50
+        state = db.get(DriverCurrentState, driver_id)
+        # Points after the OCCUPIED one carry no status and keep the driver occupied
+        assert (state.lat, state.status) == (80.049, DriverStatus.OCCUPIED)
+    finally:
+        db.close()
+
+
+def test_driver_cannot_post_other_drivers_points(client):
+    driver_id, hdr = _driver(client, "batchdrv2@example.com")
+    other_id, _ = _driver(client, "batchdrv3@example.com")
+    points = [{"driver_id": driver_id, "lat": 1.0, "lng": 1.0}, {"driver_id": other_id, "lat": 1.0, "lng": 1.0}]
+    r = client.post("/drivers/locations:batch", json={"points": points}, headers=hdr)
+    assert r.status_code == 403
+
+
+def test_admin_gateway_batch_updates_each_driver_once(client):
+    client.post("/auth/seed_user", params={"email": "batchadmin@example.com", "name": "A", "password": "pw", "role": "ADMIN"})
+    tok = client.post("/auth/login", json={"email": "batchadmin@example.com", "password": "pw", "role": "ADMIN"}).json()["access_token"]
+    hdr = {"Authorization": f"Bearer {tok}"}
+    ids = [_driver(client, f"batchgw{i}@example.com")[0] for i in range(3)]
+    t0 = datetime.utcnow()
+    points = [
+        {"driver_id": d, "lat": 81.0 + j * 0.01, "lng": 11.0, "timestamp": (t0 + timedelta(seconds=j)).isoformat(), "status": "OCCUPIED"}
+        for d in ids for j in range(4)
+    ]
+    r = client.post("/drivers/locations:batch", json={"points": points}, headers=hdr)
+    assert r.status_code == 200
+    assert r.json()["points"] == 12 and r.json()["drivers"] == 3
+
+    db = SessionLocal()
+    try:
+        states = db.query(DriverCurrentState).filter(DriverCurrentState.driver_id.in_(ids)).all()
+        assert sorted(s.driver_id for s in states) == sorted(ids)
+        assert all(s.lat == 81.03 for s in states)
+    finally:
+        db.close()
+
+    r = client.post("/drivers/locations:batch", json={"points": [{"driver_id": 999999, "lat": 0, "lng": 0}]}, headers=hdr)
+    assert r.status_code == 404
@@ -0,0 +1,89 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for typo-tolerant cafe and item search: trigram matching and ranking, the
+exact-match mode, and the in-process index following cafe and item writes.
+"""
+from app.services.fuzzy_search import TrigramIndex
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _names(client, path, q, match="fuzzy"):
+    r = client.get(path, params={"q": q, "match": match})
+    assert r.status_code == 200
+    return [x["name"] for x in r.json()]
+
+
+def test_trigram_index_ranks_closest_names_first():
+    index = TrigramIndex()
+    for key, text in enumerate(["Cappuccino", "Iced Cappuccino", "Caramel Macchiato", "Chai Latte"]):
+        index.insert(key, text, tag=key % 2)
+    assert [k for k, _ in index.search("capuccino")] == [0, 1]
+    assert [k for k, _ in index.search("capuccino", tag=1)] == [1]
+    assert [k for k, _ in index.search("machiato")] == [2]
+    assert index.search("zzz") == [] and index.search("!!") == []
+    index.remove_tag(0)
+    assert len(index) == 2 and 0 not in index
+
+
+def test_fuzzy_search_finds_misspelled_cafes_and_items(client):
+    owner_hdr, _ = register_and_login(client, "fuzzy_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe = {"name": "Brewtopia Roasters", "address": "A", "lat": 1.0, "lng": 1.0, "cuisine": "Ethiopian"}
+    cafe_id = client.post("/cafes", json=cafe, headers=owner_hdr).json()["id"]
+    for name in ("Cardamom Cappuccino", "Iced Cardamom Cappuccino", "Teff Flatbread"):
+        client.post(f"/items/{cafe_id}", json={"name": name, "calories": 100, "price": 3.0}, headers=owner_hdr)
+
+    assert "Brewtopia Roasters" in _names(client, "/cafes/", "brewtopa")
+    assert "Brewtopia Roasters" in _names(client, "/cafes/", "ethiopain")
+    assert _names(client, f"/items/{cafe_id}", "cardamon capuccino") == ["Cardamom Cappuccino", "Iced Cardamom Cappuccino"]
+    assert _names(client, f"/items/{cafe_id}", "flat bred") == ["Teff Flatbread"]
+    assert "Teff Flatbread" in _names(client, "/items", "tef flatbred")
+
+    # The default exact-match mode keeps the case-insensitive substring match on names
+    assert _names(client, "/cafes/", "brewtopa", match="exact") == []
+    assert _names(client, "/cafes/", "brewtopia", match="exact") == ["Brewtopia Roasters"]
+    assert _names(client, f"/items/{cafe_id}", "capuccino", match="exact") == []
+    assert _names(client, f"/items/{cafe_id}", "PPUCC", match="exact") == ["Cardamom Cappuccino", "Iced Cardamom Cappuccino"]
+    assert [i["name"] for i in client.get("/items", params={"q": "amom cap"}).json()] == ["Cardamom Cappuccino", "Iced Cardamom Cappuccino"]
+    assert client.get("/cafes/", params={"q": "x", "match": "sloppy"}).status_code == 422
+
+
+def test_fuzzy_index_follows_writes(client):
+    owner_hdr, _ = register_and_login(client, "fuzzy_sync_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": "Gastropod Grill", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    item = client.post(f"/items/{cafe_id}", json={"name": "Axolotl Affogato", "calories": 100, "price": 3.0}, headers=owner_hdr).json()
+    assert _names(client, f"/items/{cafe_id}", "axolotl afogato") == ["Axolotl Affogato"]
+
+    client.put(f"/items/{item['id']}", json={"name": "Pangolin Pavlova", "calories": 100, "price": 3.0}, headers=owner_hdr)
+    assert _names(client, f"/items/{cafe_id}", "axolotl afogato") == []
+    assert _names(client, f"/items/{cafe_id}", "pangolin pavlva") == ["Pangolin Pavlova"]
+
+    client.delete(f"/items/{item['id']}", headers=owner_hdr)
+    assert _names(client, "/items", "pangolin pavlva") == []
+
+    client.post(f"/items/{cafe_id}", json={"name": "Narwhal Nachos", "calories": 100, "price": 3.0}, headers=owner_hdr)
+    menu = [{"name": "Okapi Omelette", "calories": 200, "price": 2.0}]
+    assert client.put(f"/cafes/{cafe_id}/menu", json=menu, headers=owner_hdr).status_code == 200
+    assert _names(client, "/items", "narwhal nachoes") == []
+    assert _names(client, f"/items/{cafe_id}", "okapi omlette") == ["Okapi Omelette"]
+
+    client.post("/auth/seed_user", params={"email": "fuzzy_admin@example.com", "name": "A", "password": "pw", "role": "ADMIN"})
+    tok = client.post("/auth/login", json={"email": "fuzzy_admin@example.com", "password": "pw", "role": "ADMIN"}).json()["access_token"]
+    other_id = client.post("/cafes", json={"name": "Tardigrade Tavern", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    assert "Tardigrade Tavern" in _names(client, "/cafes/", "tardigrad tavrn")
+    client.delete(f"/admin/cafes/{other_id}", headers={"Authorization": f"Bearer {tok}"})
+    assert "Tardigrade Tavern" not in _names(client, "/cafes/", "tardigrad tavrn")
@@ -0,0 +1,128 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for Idempotency-Key handling on order placement and payment creation.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import IdempotencyKey, Payment
+from app.services.cart_store import cart_store
+from app.services.idempotency import purge_expired_idempotency_keys
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _setup(client, prefix):
+    owner_hdr, _ = register_and_login(client, f"{prefix}_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": f"{prefix}Cafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    item = client.post(f"/items/{cafe_id}", json={"name": f"{prefix}Item", "description": "d", "calories": 100, "price": 4.0}, headers=owner_hdr).json()
+    user_hdr, user = register_and_login(client, f"{prefix}_user@example.com", "upw")
+    return cafe_id, item, user_hdr, user
+
+
+def test_retried_place_order_replays_without_new_order(client):
+    cafe_id, item, user_hdr, _ = _setup(client, "idem")
+    client.post("/cart/add", json={"item_id": item["id"], "quantity": 2}, headers=user_hdr)
+    hdr = {**user_hdr, "Idempotency-Key": "checkout-1"}
+
+    first = client.post("/orders/place", json={"cafe_id": cafe_id}, headers=hdr)
+    assert first.status_code == 200
+    # The cart is empty now, so only a replay can succeed
+    retry = client.post("/orders/place", json={"cafe_id": cafe_id}, headers=hdr)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers.get("Idempotent-Replayed") == "true"
+    assert len(client.get("/orders/my", headers=user_hdr).json()) == 1
+
+    # Same key, different body is rejected; a new key is a new checkout
+    assert client.post("/orders/place", json={"cafe_id": cafe_id + 1}, headers=hdr).status_code == 422
+    assert client.post("/orders/place", json={"cafe_id": cafe_id}, headers={**user_hdr, "Idempotency-Key": "checkout-2"}).status_code == 400
+
+
+def test_concurrent_retry_waits_for_the_first_checkout(client):
+    cafe_id, item, user_hdr, user = _setup(client, "idemrace")
+    client.post("/cart/add", json={"item_id": item["id"], "quantity": 1}, headers=user_hdr)
+    hdr = {**user_hdr, "Idempotency-Key": "race-1"}
+    responses = []
+    place = lambda: responses.append(client.post("/orders/place", json={"cafe_id": cafe_id}, headers=hdr))
+
+    # Both requests find no stored response, then queue on the user's cart lock
+    with cart_store.backend.lock(user["id"]):
+        threads = [threading.Thread(target=place) for _ in range(2)]
+        for t in threads:
+            t.start()
+        time.sleep(0.5)
+    for t in threads:
+        t.join()
+
+    assert sorted(r.status_code for r in responses) == [200, 200]
+    assert [r.headers.get("Idempotent-Replayed") for r in responses].count("true") == 1
+    assert responses[0].json() == responses[1].json()
+    assert len(client.get("/orders/my", headers=user_hdr).json()) == 1
+
+
+def test_retried_payment_creates_one_payment(client):
+    cafe_id, item, user_hdr, _ = _setup(client, "idempay")
+    client.post("/cart/add", json={"item_id": item["id"], "quantity": 1}, headers=user_hdr)
+    order = client.post("/orders/place", json={"cafe_id": cafe_id}, headers=user_hdr).json()
+    hdr = {**user_hdr, "Idempotency-Key": "pay-1"}
+
+    responses = [client.post(f"/payments/{order['id']}", headers=hdr) for _ in range(3)]
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert responses[0].json()["status"] == "PAID" and responses[0].json()["amount"] == 4.0
+
+    db = SessionLocal()
+    try:
+        assert db.query(Payment).filter(Payment.order_id == order["id"]).count() == 1
+    finally:
+        db.close()
+    # Without a key every call is a new payment, as before
+    assert client.post(f"/payments/{order['id']}", headers=user_hdr).json()["id"] != responses[0].json()["id"]
+
+
+def test_expired_keys_are_purged_and_reusable(client):
+    cafe_id, item, user_hdr, _ = _setup(client, "idemttl")
+    hdr = {**user_hdr, "Idempotency-Key": "ttl-1"}
+    client.post("/cart/add", json={"item_id": item["id"], "quantity": 1}, headers=user_hdr)
+    first = client.post("/orders/place", json={"cafe_id": cafe_id}, headers=hdr).json()
+
+    db = SessionLocal()
+    try:
+        db.query(IdempotencyKey).filter(IdempotencyKey.key == "ttl-1").update({IdempotencyKey.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+        # An expired key no longer replays: the same key places a fresh order
+        client.post("/cart/add", json={"item_id": item["id"], "quantity": 1}, headers=user_hdr)
+        second = client.post("/orders/place", json={"cafe_id": cafe_id}, headers=hdr).json()
+        assert second["id"] != first["id"]
+
+        db.query(IdempotencyKey).filter(IdempotencyKey.key == "ttl-1").update({IdempotencyKey.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+        assert purge_expired_idempotency_keys(db) >= 1
+        assert db.query(IdempotencyKey).filter(IdempotencyKey.key == "ttl-1").count() == 0
+    finally:
+        db.close()
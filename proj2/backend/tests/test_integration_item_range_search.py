@@ -0,0 +1,85 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for GET /items/search: calorie/price/veg/kind/cafe filters, the three sort
+keys in both directions, and keyset pagination through X-Next-Cursor.
+"""
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _menu(client, prefix, items):
+    owner_hdr, _ = register_and_login(client, f"{prefix}_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": f"{prefix}Cafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    for name, calories, price, veg, kind in items:
+        item = {"name": name, "calories": calories, "price": price, "veg_flag": veg, "kind": kind}
+        assert client.post(f"/items/{cafe_id}", json=item, headers=owner_hdr).status_code == 200
+    return cafe_id
+
+
+def _pages(client, **params):
+    names, pages, cursor = [], 0, None
+    while True:
+        r = client.get("/items/search", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        names += [i["name"] for i in r.json()]
+        pages += 1
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return names, pages
+
+
+def test_filters_and_sorts(client):
+    cafe_id = _menu(client, "rng", [
+        ("Salad", 250, 8.0, True, "main"),
+        ("Burger", 750, 10.0, False, "main"),
+        ("Wrap", 550, 5.0, False, "main"),
+        ("Soup", 250, 4.0, True, "main"),
+        ("Brownie", 450, 3.0, True, "dessert"),
+        ("Water", 0, 0.0, True, "drink"),
+    ])
+    other = _menu(client, "rngother", [("Other Salad", 200, 6.0, True, "main")])
+
+    names, _ = _pages(client, cafe_id=cafe_id, max_calories=600)
+    assert names == ["Water", "Salad", "Soup", "Brownie", "Wrap"]
+    names, _ = _pages(client, cafe_id=cafe_id, min_calories=300, max_calories=800, order="desc")
+    assert names == ["Burger", "Wrap", "Brownie"]
+    names, _ = _pages(client, cafe_id=cafe_id, max_price=5, veg_flag=True, sort="price")
+    assert names == ["Water", "Brownie", "Soup"]
+    names, _ = _pages(client, cafe_id=cafe_id, kind="main", sort="price", order="desc")
+    assert names == ["Burger", "Salad", "Wrap", "Soup"]
+    # Calories per dollar: 150, 110, 75, 62.5, 31.25; free items have no ratio
+    names, _ = _pages(client, cafe_id=cafe_id, sort="calories_per_dollar", order="desc")
+    assert names == ["Brownie", "Wrap", "Burger", "Soup", "Salad"]
+    names, _ = _pages(client, cafe_id=[cafe_id, other], max_calories=250, veg_flag=True)
+    assert names == ["Water", "Other Salad", "Salad", "Soup"]
+
+
+def test_keyset_pages_cover_every_match_once(client, query_budget):
+    cafe_id = _menu(client, "rngpage", [(f"P{i}", 100 + (i % 4) * 50, 2.0 + i % 3, True, "snack") for i in range(11)])
+    for sort in ("calories", "price", "calories_per_dollar"):
+        for order in ("asc", "desc"):
+            full, _ = _pages(client, cafe_id=cafe_id, sort=sort, order=order, limit=200)
+            paged, pages = _pages(client, cafe_id=cafe_id, sort=sort, order=order, limit=3)
+            assert paged == full and sorted(full) == sorted(f"P{i}" for i in range(11))
+            assert pages == 4
+
+    first = client.get("/items/search", params={"cafe_id": cafe_id, "limit": 3})
+    with query_budget(1):
+        r = client.get("/items/search", params={"cafe_id": cafe_id, "limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+    assert len(r.json()) == 3
+    assert client.get("/items/search", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/items/search", params={"sort": "name"}).status_code == 422
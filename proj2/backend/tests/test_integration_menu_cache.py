@@ -0,0 +1,84 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for the versioned menu cache: ETags on GET /items and /items/{cafe_id},
+304s without touching the database, and every menu write moving the ETag.
+"""
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _cafe(client, owner_hdr, name):
+    return client.post("/cafes", json={"name": name, "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+
+
+def _listing(client, path, **params):
+    r = client.get(path, params=params)
+    assert r.status_code == 200 and r.headers["Cache-Control"] == "no-cache"
+    return r.headers["ETag"], sorted(i["name"] for i in r.json())
+
+
+def test_if_none_match_gets_304_without_queries(client, query_budget):
+    owner_hdr, _ = register_and_login(client, "mcache_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = _cafe(client, owner_hdr, "McacheCafe")
+    client.post(f"/items/{cafe_id}", json={"name": "Mcachetto", "calories": 200, "price": 4.0}, headers=owner_hdr)
+
+    for path, params in ((f"/items/{cafe_id}", {}), ("/items", {}), (f"/items/{cafe_id}", {"q": "mcachetto"})):
+        etag, names = _listing(client, path, **params)
+        assert etag.startswith('"') and "Mcachetto" in names
+        with query_budget(0):
+            r = client.get(path, params=params, headers={"If-None-Match": etag})
+            again = client.get(path, params=params)
+        assert r.status_code == 304 and r.headers["ETag"] == etag and not r.content
+        assert again.status_code == 200 and again.headers["ETag"] == etag
+        assert client.get(path, params=params, headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+        assert client.get(path, params=params, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_menu_writes_move_the_etag(client):
+    owner_hdr, _ = register_and_login(client, "mcache_writes_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = _cafe(client, owner_hdr, "McacheWritesCafe")
+    other_id = _cafe(client, owner_hdr, "McacheOtherCafe")
+    client.post(f"/items/{other_id}", json={"name": "Other Tea", "calories": 200, "price": 2.0}, headers=owner_hdr)
+    path = f"/items/{cafe_id}"
+
+    def changed(expected):
+        etag, names = _listing(client, path)
+        all_etag, all_names = _listing(client, "/items")
+        assert names == expected and set(expected) <= set(all_names)
+        return etag, all_etag
+
+    etags = [changed([])]
+    other_etag, _ = _listing(client, f"/items/{other_id}")
+
+    item_id = client.post(path, json={"name": "Latte", "calories": 200, "price": 4.0}, headers=owner_hdr).json()["id"]
+    etags.append(changed(["Latte"]))
+    client.put(f"/items/{item_id}", json={"name": "Oat Latte", "calories": 200, "price": 4.5}, headers=owner_hdr)
+    etags.append(changed(["Oat Latte"]))
+    client.delete(f"/items/{item_id}", headers=owner_hdr)
+    etags.append(changed([]))
+    r = client.put(f"/cafes/{cafe_id}/menu", json=[{"name": "Chai", "calories": 200, "price": 3.0}, {"name": "Scone", "calories": 200, "price": 2.5}], headers=owner_hdr)
+    assert r.status_code == 200
+    etags.append(changed(["Chai", "Scone"]))
+    client.put(f"/cafes/{cafe_id}/menu", json=[], headers=owner_hdr)
+    etags.append(changed([]))
+
+    # Every distinct menu has its own ETag, for the cafe and the catalog; the ETag hashes the
+    # body, so the empty menu gets its first one back
+    for side in (0, 1):
+        assert len({etags[i][side] for i in (0, 1, 2, 4)}) == 4
+        assert etags[0][side] == etags[3][side] == etags[5][side]
+    assert _listing(client, f"/items/{other_id}")[0] == other_etag
@@ -0,0 +1,72 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for full-text menu search: relevance ranking across name, description and
+ingredients, and the index following item writes and menu replacement.
+"""
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _names(client, path, q):
+    r = client.get(path, params={"q": q, "match": "fulltext"})
+    assert r.status_code == 200
+    return [i["name"] for i in r.json()]
+
+
+def test_search_ranks_name_matches_first_and_covers_description_and_ingredients(client):
+    owner_hdr, _ = register_and_login(client, "fts_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": "FtsCafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    for name, description, ingredients in [
+        ("Zesty Wrap", "Tortilla with a pistachio crumble", "tortilla, greens"),
+        ("Pistachio Gelato", "Slow-churned", "milk, pistachio, sugar"),
+        ("Garden Bowl", "Seasonal greens", "kale, pistachio oil"),
+        ("Plain Toast", "Butter", "bread"),
+    ]:
+        item = {"name": name, "description": description, "ingredients": ingredients, "calories": 100, "price": 3.0}
+        assert client.post(f"/items/{cafe_id}", json=item, headers=owner_hdr).status_code == 200
+
+    # Catalog-wide through the full-text index, and within the cafe's menu
+    for path in ("/items", f"/items/{cafe_id}"):
+        results = [n for n in _names(client, path, "pistachio") if n in ("Pistachio Gelato", "Zesty Wrap", "Garden Bowl", "Plain Toast")]
+        assert results[0] == "Pistachio Gelato"
+        assert set(results) == {"Pistachio Gelato", "Zesty Wrap", "Garden Bowl"}
+    # Words match as prefixes and must all be present; case and punctuation do not matter
+    assert set(_names(client, f"/items/{cafe_id}", "PISTA greens!")) == {"Garden Bowl", "Zesty Wrap"}
+    assert "Pistachio Gelato" in _names(client, "/items", "pistachio gelato")
+    assert _names(client, f"/items/{cafe_id}", "kale") == ["Garden Bowl"]
+    assert "Garden Bowl" in _names(client, "/items", "kale")
+
+
+def test_search_index_follows_updates_deletes_and_menu_replacement(client):
+    owner_hdr, _ = register_and_login(client, "fts_sync_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": "FtsSyncCafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    item = client.post(f"/items/{cafe_id}", json={"name": "Quokka Latte", "calories": 100, "price": 3.0}, headers=owner_hdr).json()
+    assert _names(client, "/items", "quokka") == ["Quokka Latte"]
+
+    client.put(f"/items/{item['id']}", json={"name": "Wombat Latte", "calories": 100, "price": 3.0}, headers=owner_hdr)
+    assert _names(client, "/items", "quokka") == []
+    assert _names(client, "/items", "wombat") == ["Wombat Latte"]
+
+    client.delete(f"/items/{item['id']}", headers=owner_hdr)
+    assert _names(client, "/items", "wombat") == []
+
+    client.post(f"/items/{cafe_id}", json={"name": "Numbat Mocha", "calories": 100, "price": 3.0}, headers=owner_hdr)
+    menu = [{"name": "Bilby Bun", "calories": 200, "price": 2.0}, {"name": "Numbat Bun", "description": "Not a mocha", "calories": 250, "price": 2.5}]
+    assert client.put(f"/cafes/{cafe_id}/menu", json=menu, headers=owner_hdr).status_code == 200
+    assert _names(client, "/items", "numbat") == ["Numbat Bun"]
+    assert _names(client, "/items", "mocha") == ["Numbat Bun"]
+    assert _names(client, f"/items/{cafe_id}", "bun") == ["Bilby Bun", "Numbat Bun"]
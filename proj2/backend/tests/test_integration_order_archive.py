@@ -0,0 +1,89 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for cold-storage archival of finished orders.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models import (
+    Order, OrderItem, OrderEvent, OrderStatus, Payment, PaymentStatus, RefundRequest,
+    ArchivedOrder, ArchivedOrderItem, ArchivedPayment, ArchivedRefundRequest,
+)
+from app.services.archive import archive_orders
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def test_archive_moves_old_finished_orders_in_resumable_chunks(client, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_BATCH", 2)
+    owner_hdr, _ = register_and_login(client, "arch_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": "ArchCafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    item = client.post(f"/items/{cafe_id}", json={"name": "ArchItem", "description": "d", "calories": 50, "price": 2.0}, headers=owner_hdr).json()
+    user_hdr, user = register_and_login(client, "arch_user@example.com", "upw")
+
+    now = datetime.utcnow()
+    old = now - timedelta(days=settings.ARCHIVE_AFTER_DAYS + 1)
+    with SessionLocal() as db:
+        finished = [
+            Order(user_id=user["id"], cafe_id=cafe_id, status=status, created_at=old + timedelta(minutes=i), total_price=4.0, total_calories=100)
+            for i, status in enumerate([OrderStatus.DELIVERED, OrderStatus.CANCELLED, OrderStatus.DECLINED, OrderStatus.REFUNDED, OrderStatus.DELIVERED])
+        ]
+        old_open = Order(user_id=user["id"], cafe_id=cafe_id, status=OrderStatus.PENDING, created_at=old)
+        recent = Order(user_id=user["id"], cafe_id=cafe_id, status=OrderStatus.DELIVERED, created_at=now)
+        db.add_all(finished + [old_open, recent])
+        db.flush()
+        for o in finished:
+            db.add(OrderItem(order_id=o.id, item_id=item["id"], quantity=2, subtotal_price=4.0, subtotal_calories=100))
+            db.add(Payment(order_id=o.id, amount=4.0, status=PaymentStatus.PAID))
+        db.add(RefundRequest(order_id=finished[3].id, reason="cold", status="APPROVED"))
+        db.commit()
+        finished_ids = [o.id for o in finished]
+        kept_ids = [old_open.id, recent.id]
+
+    with SessionLocal() as db:
+        # Stops after one chunk; the next run carries on where it left off
+        first = archive_orders(db, now=now, max_chunks=1)
+        assert first["orders"] == 2 and first["chunks"] == 1
+        rest = archive_orders(db, now=now)
+        assert first["orders"] + rest["orders"] >= 5
+
+        assert db.query(Order).filter(Order.id.in_(finished_ids)).count() == 0
+        assert db.query(OrderItem).filter(OrderItem.order_id.in_(finished_ids)).count() == 0
+        assert db.query(Payment).filter(Payment.order_id.in_(finished_ids)).count() == 0
+        assert db.query(OrderEvent).filter(OrderEvent.order_id.in_(finished_ids)).count() == 0
+        assert db.query(Order).filter(Order.id.in_(kept_ids)).count() == 2
+        assert db.query(ArchivedOrder).filter(ArchivedOrder.id.in_(finished_ids)).count() == 5
+        assert db.query(ArchivedOrderItem).filter(ArchivedOrderItem.order_id.in_(finished_ids)).count() == 5
+        assert db.query(ArchivedPayment).filter(ArchivedPayment.order_id.in_(finished_ids)).count() == 5
+        assert db.query(ArchivedRefundRequest).filter(ArchivedRefundRequest.order_id == finished_ids[3]).one().reason == "cold"
+
+    # Reads fall through to the archive, with the same access rules
+    r = client.get(f"/orders/o/{finished_ids[0]}", headers=user_hdr)
+    assert r.status_code == 200
+    assert r.json()["status"] == "DELIVERED" and r.json()["total_price"] == 4.0
+    assert client.get(f"/orders/o/{finished_ids[1]}", headers=owner_hdr).status_code == 200
+    stranger_hdr, _ = register_and_login(client, "arch_stranger@example.com", "spw")
+    assert client.get(f"/orders/o/{finished_ids[0]}", headers=stranger_hdr).status_code == 403
@@ -0,0 +1,85 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for the order event log and the /orders/{cafe_id}/changes feed.
+"""
+from datetime import datetime
+
+from app.config import settings
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _setup(client, prefix):
+    owner_hdr, _ = register_and_login(client, f"{prefix}_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": f"{prefix}Cafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    item = client.post(f"/items/{cafe_id}", json={"name": f"{prefix}Item", "description": "d", "calories": 100, "price": 4.0}, headers=owner_hdr).json()
+    user_hdr, _ = register_and_login(client, f"{prefix}_user@example.com", "upw")
+    return cafe_id, item, owner_hdr, user_hdr
+
+
+def _place(client, item, cafe_id, user_hdr):
+    client.post("/cart/add", json={"item_id": item["id"], "quantity": 1}, headers=user_hdr)
+    r = client.post("/orders/place", json={"cafe_id": cafe_id}, headers=user_hdr)
+    assert r.status_code == 200
+    return r.json()
+
+
+def test_every_order_write_appends_an_event(client, monkeypatch):
+    monkeypatch.setattr(settings, "DISPATCH_MODE", "batch")
+    cafe_id, item, owner_hdr, user_hdr = _setup(client, "evlog")
+    drv = client.post("/drivers/register", json={"email": "evlog_drv@example.com", "name": "D", "password": "dpw"}).json()
+    drv_hdr = {"Authorization": f"Bearer {client.post('/drivers/login', json={'email': 'evlog_drv@example.com', 'password': 'dpw'}).json()['access_token']}"}
+    client.post(f"/drivers/{drv['id']}/location-status", json={"lat": 1.0, "lng": 1.0, "timestamp": datetime.utcnow().isoformat(), "status": "IDLE"}, headers=drv_hdr)
+
+    order = _place(client, item, cafe_id, user_hdr)
+    assert client.post(f"/orders/{order['id']}/status", json="ACCEPTED", headers=owner_hdr).status_code == 200
+    assert client.post(f"/orders/{order['id']}/assign-driver", json={"driver_id": drv["id"]}, headers=owner_hdr).status_code == 200
+    assert client.post(f"/drivers/{drv['id']}/orders/{order['id']}/pickup", headers=drv_hdr).status_code == 200
+    assert client.post(f"/drivers/{drv['id']}/orders/{order['id']}/deliver", headers=drv_hdr).status_code == 200
+    cancelled = _place(client, item, cafe_id, user_hdr)
+    assert client.post(f"/orders/{cancelled['id']}/cancel", headers=user_hdr).status_code == 200
+
+    feed = client.get(f"/orders/{cafe_id}/changes", headers=owner_hdr).json()
+    assert [(e["order_id"], e["type"], e["status"]) for e in feed["events"]] == [
+        (order["id"], "placed", "PENDING"),
+        (order["id"], "status", "ACCEPTED"),
+        (order["id"], "assigned", "ACCEPTED"),
+        (order["id"], "status", "PICKED_UP"),
+        (order["id"], "status", "DELIVERED"),
+        (cancelled["id"], "placed", "PENDING"),
+        (cancelled["id"], "status", "CANCELLED"),
+    ]
+    seqs = [e["seq"] for e in feed["events"]]
+    assert seqs == sorted(seqs) and feed["last_seq"] == seqs[-1] and not feed["has_more"]
+    assert feed["events"][2]["driver_id"] == drv["id"]
+
+
+def test_changes_since_returns_only_newer_events(client):
+    cafe_id, item, owner_hdr, user_hdr = _setup(client, "evsince")
+    first = _place(client, item, cafe_id, user_hdr)
+    cursor = client.get(f"/orders/{cafe_id}/changes", headers=owner_hdr).json()["last_seq"]
+    assert client.get(f"/orders/{cafe_id}/changes", params={"since": cursor}, headers=owner_hdr).json() == {"events": [], "last_seq": cursor, "has_more": False}
+
+    second = _place(client, item, cafe_id, user_hdr)
+    client.post(f"/orders/{first['id']}/status", json="DECLINED", headers=owner_hdr)
+    page = client.get(f"/orders/{cafe_id}/changes", params={"since": cursor, "limit": 1}, headers=owner_hdr).json()
+    assert [(e["order_id"], e["type"]) for e in page["events"]] == [(second["id"], "placed")] and page["has_more"]
+    rest = client.get(f"/orders/{cafe_id}/changes", params={"since": page["last_seq"]}, headers=owner_hdr).json()
+    assert [(e["order_id"], e["status"]) for e in rest["events"]] == [(first["id"], "DECLINED")]
+
+    # Other cafes' staff and customers cannot read the feed
+    assert client.get(f"/orders/{cafe_id}/changes", headers=user_hdr).status_code == 403
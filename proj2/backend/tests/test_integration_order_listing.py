@@ -0,0 +1,111 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for keyset-paginated order listings (/orders/my and /orders/{cafe_id}).
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models import Order, OrderStatus
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _seed_orders(client, prefix):
+    """A cafe with 25 orders from one user: pairs share a created_at so the id tie-break matters."""
+    owner_hdr, _ = register_and_login(client, f"{prefix}_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": f"{prefix}Cafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    user_hdr, user = register_and_login(client, f"{prefix}_user@example.com", "upw")
+    base = datetime.utcnow().replace(microsecond=0) - timedelta(days=1)
+    statuses = [OrderStatus.PENDING, OrderStatus.ACCEPTED, OrderStatus.READY, OrderStatus.CANCELLED, OrderStatus.DELIVERED]
+    db = SessionLocal()
+    try:
+        db.add_all([
+            Order(user_id=user["id"], cafe_id=cafe_id, status=statuses[i % 5], created_at=base + timedelta(minutes=i // 2),
+                  can_cancel_until=base, total_price=float(i), total_calories=i)
+            for i in range(25)
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return cafe_id, owner_hdr, user_hdr, base
+
+
+def _walk(client, url, headers, params):
+    pages, cursor = [], None
+    while True:
+        r = client.get(url, headers=headers, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        pages.append(r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_cafe_orders_pages_cover_every_order_once_in_order(client):
+    cafe_id, owner_hdr, _, _ = _seed_orders(client, "page")
+    pages = _walk(client, f"/orders/{cafe_id}", owner_hdr, {"limit": 10})
+    assert [len(p) for p in pages] == [10, 10, 5]
+    rows = [o for p in pages for o in p]
+    assert len({o["id"] for o in rows}) == 25
+    keys = [(o["created_at"], o["id"]) for o in rows]
+    assert keys == sorted(keys, reverse=True)
+    assert set(rows[0]) == {"id", "cafe_id", "status", "created_at", "total_price", "total_calories", "can_cancel_until", "driver_id"}
+
+
+def test_cafe_orders_filter_by_statuses_and_date_range(client):
+    cafe_id, owner_hdr, _, base = _seed_orders(client, "pagefilt")
+    r = client.get(f"/orders/{cafe_id}", headers=owner_hdr, params={"status": ["PENDING", "READY"]})
+    assert {o["status"] for o in r.json()} == {"PENDING", "READY"}
+    assert len(r.json()) == 10
+
+    window = {"created_from": (base + timedelta(minutes=2)).isoformat(), "created_to": (base + timedelta(minutes=5)).isoformat()}
+    pages = _walk(client, f"/orders/{cafe_id}", owner_hdr, {**window, "limit": 4})
+    assert sorted(o["total_calories"] for p in pages for o in p) == [4, 5, 6, 7, 8, 9]
+
+    assert client.get(f"/orders/{cafe_id}", headers=owner_hdr, params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get(f"/orders/{cafe_id}", headers=owner_hdr, params={"limit": 0}).status_code == 422
+
+
+def test_listings_without_limit_or_cursor_return_every_order(client, monkeypatch):
+    monkeypatch.setattr(settings, "ORDER_PAGE_DEFAULT_LIMIT", 10)
+    cafe_id, owner_hdr, user_hdr, _ = _seed_orders(client, "pageall")
+    for url, hdr in ((f"/orders/{cafe_id}", owner_hdr), ("/orders/my", user_hdr)):
+        r = client.get(url, headers=hdr)
+        assert len(r.json()) == 25 and "X-Next-Cursor" not in r.headers
+
+    # A cursor on its own pages at the default size
+    first = client.get(f"/orders/{cafe_id}", headers=owner_hdr, params={"limit": 3})
+    r = client.get(f"/orders/{cafe_id}", headers=owner_hdr, params={"cursor": first.headers["X-Next-Cursor"]})
+    assert len(r.json()) == 10 and r.headers.get("X-Next-Cursor")
+
+
+def test_my_orders_paginates_for_the_customer(client):
+    _, _, user_hdr, _ = _seed_orders(client, "pagemy")
+    first = client.get("/orders/my", headers=user_hdr, params={"limit": 20})
+    assert len(first.json()) == 20 and first.headers.get("X-Next-Cursor")
+    pages = _walk(client, "/orders/my", user_hdr, {"limit": 20, "status": "DELIVERED"})
+    assert [len(p) for p in pages] == [5]
+    assert len(client.get("/orders/my", headers=user_hdr).json()) == 25
@@ -0,0 +1,120 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import json
+import os
+import threading
+import time
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models import User, Role, Cafe, Order, OrderStatus, DriverLocation, DriverStatus
+from app.services import driver as driver_svc
+from app.services.pubsub import hub, order_topic
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _parse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.split("\n\n"):
+        lines = [l for l in block.splitlines() if not l.startswith(":")]
+        if lines:
+            events.append((lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: "))))
+    return events
+
+
+def test_order_stream_sends_snapshot_then_deltas(client, monkeypatch):
+    monkeypatch.setattr(settings, "ORDER_STREAM_LOCATION_INTERVAL_SECONDS", 0.3)
+    client.post("/users/register", json={"email": "streamer@example.com", "name": "S", "password": "pw", "role": "USER"})
+    tok = client.post("/auth/login", json={"email": "streamer@example.com", "password": "pw", "role": "USER"}).json()["access_token"]
+    hdr = {"Authorization": f"Bearer {tok}"}
+
+    db = SessionLocal()
+    customer = db.query(User).filter(User.email == "streamer@example.com").first()
+    owner = User(email=f"stown-{uuid.uuid4().hex}@example.com", name="O", hashed_password="x", role=Role.OWNER)
+    drv = User(email=f"stdrv-{uuid.uuid4().hex}@example.com", name="D", hashed_password="x", role=Role.DRIVER)
+    db.add_all([owner, drv])
+    db.commit()
+    cafe = Cafe(name="StreamCafe", lat=-60.0, lng=100.0, owner_id=owner.id)
+    db.add(cafe)
+    db.commit()
+    order = Order(user_id=customer.id, cafe_id=cafe.id, status=OrderStatus.READY)
+    db.add(order)
+    db.add(DriverLocation(driver_id=drv.id, lat=-60.0, lng=100.01, status=DriverStatus.IDLE))
+    db.commit()
+    order_id, driver_id, drv_email = order.id, drv.id, drv.email
+
+    def drive():
+        deadline = time.time() + 5
+        while hub.subscriber_count(order_topic(order_id)) == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert driver_svc.claim_driver_for_order(order_id, driver_id, db)
+        time.sleep(0.2)
+        for i in range(5):
+            db.add(DriverLocation(driver_id=driver_id, lat=-60.0 + i * 0.001, lng=100.0, status=DriverStatus.OCCUPIED))
+            db.commit()
+        time.sleep(0.5)
+        o = db.get(Order, order_id)
+        o.status = OrderStatus.PICKED_UP
+        db.commit()
+        o.status = OrderStatus.DELIVERED
+        db.commit()
+
+    t = threading.Thread(target=drive)
+    t.start()
+    try:
+        r = client.get(f"/orders/{order_id}/stream", headers=hdr)
+    finally:
+        t.join()
+        db.close()
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = _parse(r.text)
+    kinds = [k for k, _ in events]
+
+    assert kinds[0] == "snapshot"
+    assert events[0][1]["id"] == order_id and events[0][1]["status"] == "READY"
+    # The claim commits once the stream has subscribed, so its delta always follows; the snapshot,
+    # read just after subscribing, may or may not include it already, but must agree with it
+    assert ("driver_assigned", {"driver_id": driver_id}) in events
+    assert events[0][1]["driver_info"] in (None, {"driver_id": driver_id, "driver_email": drv_email})
+    locations = [d for k, d in events if k == "driver_location"]
+    # Five back-to-back points are throttled: the first goes out, the newest follows after the interval
+    assert 1 <= len(locations) < 5
+    assert locations[-1]["lat"] == -60.0 + 4 * 0.001
+    assert events[-1] == ("status", {"status": "DELIVERED"})
+    assert hub.subscriber_count(order_topic(order_id)) == 0
+
+
+def test_order_stream_requires_access(client):
+    client.post("/users/register", json={"email": "streamnosy@example.com", "name": "N", "password": "pw", "role": "USER"})
+    tok = client.post("/auth/login", json={"email": "streamnosy@example.com", "password": "pw", "role": "USER"}).json()["access_token"]
+    db = SessionLocal()
+    try:
+        owner = User(email=f"stown2-{uuid.uuid4().hex}@example.com", name="O", hashed_password="x", role=Role.OWNER)
+        db.add(owner)
+        db.commit()
+        cafe = Cafe(name="StreamCafe2", lat=0.0, lng=0.0, owner_id=owner.id)
+        db.add(cafe)
+        db.commit()
+        order = Order(user_id=owner.id, cafe_id=cafe.id, status=OrderStatus.DELIVERED)
+        db.add(order)
+        db.commit()
+        order_id = order.id
+    finally:
+        db.close()
+    assert client.get(f"/orders/{order_id}/stream", headers={"Authorization": f"Bearer {tok}"}).status_code == 403
+    assert client.get("/orders/99999999/stream", headers={"Authorization": f"Bearer {tok}"}).status_code == 404
@@ -0,0 +1,67 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Query budget for the order summary: authentication plus one joined fetch, whoever asks
+and however many items the order has.
+"""
+import os
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User, Role, Order
+
+# get_current_user's lookup + the summary query
+SUMMARY_QUERY_BUDGET = 2
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def test_order_summary_stays_within_query_budget(client, query_budget):
+    owner_hdr, _ = register_and_login(client, "sumq_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": "SumQCafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    user_hdr, _ = register_and_login(client, "sumq_user@example.com", "upw")
+    for i in range(6):
+        item = client.post(f"/items/{cafe_id}", json={"name": f"SumQ{i}", "description": "d", "calories": 10 * (i + 1), "price": 1.0 + i}, headers=owner_hdr).json()
+        client.post("/cart/add", json={"item_id": item["id"], "quantity": i + 1}, headers=user_hdr)
+    order = client.post("/orders/place", json={"cafe_id": cafe_id}, headers=user_hdr).json()
+
+    with SessionLocal() as db:
+        driver = User(email=f"sumq-{uuid.uuid4().hex}@example.com", name="D", hashed_password="x", role=Role.DRIVER)
+        db.add(driver)
+        db.commit()
+        db.query(Order).filter(Order.id == order["id"]).update({Order.driver_id: driver.id})
+        db.commit()
+        driver_id, driver_email = driver.id, driver.email
+
+    for hdr in (user_hdr, owner_hdr):
+        with query_budget(SUMMARY_QUERY_BUDGET):
+            r = client.get(f"/orders/{order['id']}/summary", headers=hdr)
+        assert r.status_code == 200
+        summary = r.json()
+        assert sorted((it["name"], it["quantity"]) for it in summary["items"]) == [(f"SumQ{i}", i + 1) for i in range(6)]
+        assert summary["driver_info"] == {"driver_id": driver_id, "driver_email": driver_email}
+
+    outsider_hdr, _ = register_and_login(client, "sumq_out@example.com", "xpw")
+    with query_budget(SUMMARY_QUERY_BUDGET):
+        assert client.get(f"/orders/{order['id']}/summary", headers=outsider_hdr).status_code == 403
+    with query_budget(SUMMARY_QUERY_BUDGET):
+        assert client.get("/orders/999999/summary", headers=outsider_hdr).status_code == 404
@@ -0,0 +1,77 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+"""
+Integration tests for checkout atomicity - placing an order commits the order,
+its items and the cart clear together, or none of them.
+"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.routers import orders as orders_router
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _cafe_with_items(client, prefix):
+    owner_hdr, _ = register_and_login(client, f"{prefix}_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": f"{prefix}Cafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    items = [
+        client.post(f"/items/{cafe_id}", json={"name": f"{prefix}{i}", "description": "d", "calories": 100 * (i + 1), "price": 2.5 * (i + 1)}, headers=owner_hdr).json()
+        for i in range(3)
+    ]
+    return cafe_id, items
+
+
+def test_place_order_commits_once_with_all_items(client):
+    cafe_id, items = _cafe_with_items(client, "txn")
+    user_hdr, _ = register_and_login(client, "txn_user@example.com", "upw")
+    for i, item in enumerate(items):
+        client.post("/cart/add", json={"item_id": item["id"], "quantity": i + 1}, headers=user_hdr)
+
+    commits = []
+    listener = lambda session: commits.append(session)
+    event.listen(Session, "after_commit", listener)
+    try:
+        r = client.post("/orders/place", json={"cafe_id": cafe_id}, headers=user_hdr)
+    finally:
+        event.remove(Session, "after_commit", listener)
+    assert r.status_code == 200
+    assert len(commits) == 1
+    order = r.json()
+    assert order["total_price"] == round(2.5 * 1 + 5.0 * 2 + 7.5 * 3, 2)
+    assert order["total_calories"] == 100 * 1 + 200 * 2 + 300 * 3
+
+    summary = client.get(f"/orders/{order['id']}/summary", headers=user_hdr).json()
+    assert sorted((it["name"], it["quantity"]) for it in summary["items"]) == [("txn0", 1), ("txn1", 2), ("txn2", 3)]
+    assert client.get("/cart/items", headers=user_hdr).json() == []
+
+
+def test_place_order_failure_leaves_no_order_and_keeps_cart(client, monkeypatch):
+    cafe_id, items = _cafe_with_items(client, "txnfail")
+    user_hdr, _ = register_and_login(client, "txnfail_user@example.com", "upw")
+    client.post("/cart/add", json={"item_id": items[0]["id"], "quantity": 2}, headers=user_hdr)
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("simulated crash while writing order items")
+
+    monkeypatch.setattr(orders_router, "insert", boom)
+    with pytest.raises(RuntimeError):
+        client.post("/orders/place", json={"cafe_id": cafe_id}, headers=user_hdr)
+    monkeypatch.undo()
+
+    assert client.get("/orders/my", headers=user_hdr).json() == []
+    assert len(client.get("/cart/items", headers=user_hdr).json()) == 1
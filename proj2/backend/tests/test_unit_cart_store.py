@@ -0,0 +1,212 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import os
+import threading
+import uuid
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User, Role, Cafe, Item, Cart, CartItem
+from app.services.cart_store import CartStore, CartLine, MemoryCartBackend, RedisCartBackend, cart_store, ensure_cart_columns
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class StubRedis:
+    """The handful of Redis commands RedisCartBackend uses, kept in dicts."""
+
+    def __init__(self):
+        self.values, self.sets, self.locks = {}, {}, {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(str(member))
+
+    def srem(self, key, member):
+        self.sets.get(key, set()).discard(str(member))
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def lock(self, name, timeout=None):
+        return self.locks.setdefault(name, threading.Lock())
+
+
+def register_and_login(client, email, password, name="U", role="USER"):
+    r = client.post("/users/register", json={"email": email, "name": name, "password": password, "role": role})
+    assert r.status_code == 200
+    r2 = client.post("/auth/login", json={"email": email, "password": password, "role": role})
+    assert r2.status_code == 200
+    return {"Authorization": f"Bearer {r2.json()['access_token']}"}, r.json()
+
+
+def _user_and_item():
+    with SessionLocal() as db:
+        user = User(email=f"cs-{uuid.uuid4().hex}@example.com", name="C", hashed_password="x", role=Role.USER)
+        db.add(user)
+        db.commit()
+        cafe = Cafe(name="CSCafe", lat=1.0, lng=1.0, owner_id=user.id)
+        db.add(cafe)
+        db.commit()
+        item = Item(cafe_id=cafe.id, name="CSItem", calories=100, price=2.5)
+        db.add(item)
+        db.commit()
+        return user.id, cafe.id, item.id
+
+
+def _db_lines(cart_id):
+    with SessionLocal() as db:
+        return sorted((r.line_no, r.item_id, r.quantity) for r in db.query(CartItem).filter(CartItem.cart_id == cart_id))
+
+
+def test_redis_backend_writes_behind_and_reloads():
+    user_id, cafe_id, item_id = _user_and_item()
+    redis = StubRedis()
+    store = CartStore(RedisCartBackend(redis), session_factory=SessionLocal)
+
+    with store.mutate(user_id) as cart:
+        cart.add_line(CartLine(item_id=item_id, cafe_id=cafe_id, quantity=2, assignee_user_id=user_id))
+    with store.mutate(user_id) as cart:
+        cart.lines[1].quantity = 3
+        cart.add_line(CartLine(item_id=item_id, cafe_id=cafe_id, quantity=1, assignee_user_id=user_id))
+    cart_id = store.get(user_id).cart_id
+    assert redis.smembers(RedisCartBackend.DIRTY_KEY) == {str(user_id)}
+    assert _db_lines(cart_id) == []
+
+    # One flush writes both clicks' worth of changes and clears the dirty mark
+    assert store.flush_dirty() == 1
+    assert _db_lines(cart_id) == [(1, item_id, 3), (2, item_id, 1)]
+    assert redis.smembers(RedisCartBackend.DIRTY_KEY) == set()
+    assert store.flush_dirty() == 0
+
+    # A store without the cached copy loads the same lines, under the same numbers
+    reloaded = CartStore(MemoryCartBackend(), session_factory=SessionLocal).get(user_id)
+    assert reloaded.cart_id == cart_id
+    assert {n: l.quantity for n, l in reloaded.lines.items()} == {1: 3, 2: 1}
+
+
+def test_line_numbers_are_never_reused():
+    user_id, cafe_id, item_id = _user_and_item()
+    store = CartStore(RedisCartBackend(StubRedis()), session_factory=SessionLocal)
+    line = lambda: CartLine(item_id=item_id, cafe_id=cafe_id, quantity=1, assignee_user_id=user_id)
+
+    with store.mutate(user_id) as cart:
+        cart.add_line(line())
+        second = cart.add_line(line())
+    with store.mutate(user_id) as cart:
+        del cart.lines[second]
+    # A retried PUT/DELETE /cart/item/2 must not reach the line added after it was removed
+    with store.mutate(user_id) as cart:
+        assert cart.add_line(line()) == 3
+    store.flush_dirty()
+
+    reloaded = CartStore(MemoryCartBackend(), session_factory=SessionLocal)
+    with reloaded.mutate(user_id) as cart:
+        assert sorted(cart.lines) == [1, 3]
+        assert cart.add_line(line()) == 4
+
+
+def test_get_returns_a_copy_taken_under_the_lock():
+    user_id, cafe_id, item_id = _user_and_item()
+    store = CartStore(MemoryCartBackend(), session_factory=SessionLocal)
+    line = lambda: CartLine(item_id=item_id, cafe_id=cafe_id, quantity=1, assignee_user_id=user_id)
+    with store.mutate(user_id) as cart:
+        cart.add_line(line())
+    before = store.get(user_id)
+
+    reads = []
+    with store.mutate(user_id) as cart:
+        cart.lines[1].quantity = 5
+        reader = threading.Thread(target=lambda: reads.append(store.get(user_id)))
+        reader.start()
+        reader.join(timeout=0.2)
+        # The reader waits for the change to finish instead of iterating the lines mid-way
+        assert reader.is_alive()
+        cart.add_line(line())
+    reader.join()
+
+    assert {n: l.quantity for n, l in before.lines.items()} == {1: 1}
+    assert {n: l.quantity for n, l in reads[0].lines.items()} == {1: 5, 2: 1}
+    reads[0].lines.clear()
+    assert len(store.get(user_id).lines) == 2
+
+
+def test_memory_backend_evicts_only_clean_carts():
+    backend = MemoryCartBackend(max_carts=2)
+    store = CartStore(backend, session_factory=SessionLocal)
+    users = [_user_and_item() for _ in range(3)]
+
+    for user_id, cafe_id, item_id in users:
+        with store.mutate(user_id) as cart:
+            cart.add_line(CartLine(item_id=item_id, cafe_id=cafe_id, quantity=1, assignee_user_id=user_id))
+    # All three are dirty, so none may be dropped before it is written back
+    assert sorted(backend.dirty_users()) == sorted(u for u, _, _ in users)
+    assert store.flush_dirty() == 3
+    assert sum(backend.get(u) is not None for u, _, _ in users) == 2
+    # Loading another cart pushes out the least recently used clean one
+    store.get(users[0][0])
+    assert backend.get(users[1][0]) is None and backend.get(users[0][0]) is not None
+
+
+def test_cart_clicks_do_not_write_until_checkout(client, query_budget, monkeypatch):
+    # Hold off the app's periodic flush so every write seen here comes from the requests
+    monkeypatch.setattr(cart_store, "flush_dirty", lambda: 0)
+    owner_hdr, _ = register_and_login(client, "cs_owner@example.com", "opw", name="Own", role="OWNER")
+    cafe_id = client.post("/cafes", json={"name": "CSApiCafe", "address": "A", "lat": 1.0, "lng": 1.0}, headers=owner_hdr).json()["id"]
+    item = client.post(f"/items/{cafe_id}", json={"name": "CSApiItem", "description": "d", "calories": 100, "price": 4.0}, headers=owner_hdr).json()
+    user_hdr, user = register_and_login(client, "cs_user@example.com", "upw")
+    cart_id = client.get("/cart/", headers=user_hdr).json()["id"]
+
+    with query_budget(50) as statements:
+        line = client.post("/cart/add", json={"item_id": item["id"], "quantity": 1}, headers=user_hdr).json()["cart_item_id"]
+        client.post("/cart/add", json={"item_id": item["id"], "quantity": 1}, headers=user_hdr)
+        assert client.put(f"/cart/item/{line}", json={"quantity": 3}, headers=user_hdr).json()["status"] == "updated"
+        assert client.get("/cart/summary", headers=user_hdr).json()["total_price"] == 12.0
+    assert not [s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))], statements
+    assert _db_lines(cart_id) == []
+
+    # Checkout writes the lines back and prices the order from them in one transaction
+    order = client.post("/orders/place", json={"cafe_id": cafe_id}, headers=user_hdr)
+    assert order.status_code == 200 and order.json()["total_price"] == 12.0
+    assert client.get("/cart/items", headers=user_hdr).json() == []
+    assert _db_lines(cart_id) == []
+    with SessionLocal() as db:
+        assert db.get(Cart, cart_id).user_id == user["id"]
+
+
+def test_cart_columns_added_to_tables_that_predate_the_store(tmp_path):
+    old = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with old.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE carts (id INTEGER PRIMARY KEY, user_id INTEGER, created_at DATETIME)")
+        conn.exec_driver_sql("CREATE TABLE cart_items (id INTEGER PRIMARY KEY, cart_id INTEGER, item_id INTEGER, quantity INTEGER, assignee_user_id INTEGER)")
+        conn.exec_driver_sql("INSERT INTO carts (id, user_id) VALUES (1, 1), (2, 2), (3, 3)")
+        conn.exec_driver_sql("INSERT INTO cart_items (id, cart_id, item_id, quantity) VALUES (10, 1, 5, 1), (11, 2, 6, 1), (12, 1, 7, 2)")
+
+    for _ in range(2):
+        with old.begin() as conn:
+            ensure_cart_columns(conn)
+
+    with old.connect() as conn:
+        assert {"updated_at", "line_no"} <= {c["name"] for c in inspect(conn).get_columns("cart_items")}
+        assert conn.exec_driver_sql("SELECT id, line_no FROM cart_items ORDER BY id").all() == [(10, 1), (11, 1), (12, 2)]
+        assert conn.exec_driver_sql("SELECT id, next_line_no FROM carts ORDER BY id").all() == [(1, 3), (2, 2), (3, 1)]
+    old.dispose()
@@ -0,0 +1,94 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+# 
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import itertools
+import os
+import random
+import uuid
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User, Role, Cafe, Order, OrderStatus, DriverLocation, DriverStatus
+from app.services import driver as driver_svc
+from app.services.dispatch import solve_assignment, dispatch_pending_orders
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _brute_force(cost):
+    n, m = cost.shape
+    if n <= m:
+        return min(sum(cost[i, c] for i, c in enumerate(perm)) for perm in itertools.permutations(range(m), n))
+    return min(sum(cost[r, j] for j, r in enumerate(perm)) for perm in itertools.permutations(range(n), m))
+
+
+def test_solve_assignment_is_optimal_on_small_matrices():
+    rng = random.Random(3)
+    for n, m in [(1, 1), (3, 3), (4, 6), (6, 4), (5, 5)]:
+        cost = np.array([[rng.uniform(0, 10) for _ in range(m)] for _ in range(n)])
+        pairs = solve_assignment(cost)
+        assert len(pairs) == min(n, m)
+        assert len({r for r, _ in pairs}) == len({c for _, c in pairs}) == len(pairs)
+        assert abs(sum(cost[r, c] for r, c in pairs) - _brute_force(cost)) < 1e-9
+    assert solve_assignment(np.zeros((0, 3))) == []
+
+
+def test_dispatch_beats_greedy_on_contested_driver():
+    db = SessionLocal()
+    try:
+        owner = User(email=f"dispown-{uuid.uuid4().hex}@example.com", name="O", hashed_password="x", role=Role.OWNER)
+        customer = User(email=f"dispusr-{uuid.uuid4().hex}@example.com", name="C", hashed_password="x", role=Role.USER)
+        d1 = User(email=f"dispd1-{uuid.uuid4().hex}@example.com", name="D1", hashed_password="x", role=Role.DRIVER)
+        d2 = User(email=f"dispd2-{uuid.uuid4().hex}@example.com", name="D2", hashed_password="x", role=Role.DRIVER)
+        db.add_all([owner, customer, d1, d2])
+        db.commit()
+        # Cafe A sits between both drivers; cafe B is only close to d1.
+        # Greedy (A first) takes d1 and leaves B with a long trip; the optimum gives A d2.
+        base_lat, base_lng = -70.0, 40.0
+        cafe_a = Cafe(name="DispA", lat=base_lat, lng=base_lng, owner_id=owner.id)
+        cafe_b = Cafe(name="DispB", lat=base_lat, lng=base_lng - 0.05, owner_id=owner.id)
+        db.add_all([cafe_a, cafe_b])
+        db.commit()
+        order_a = Order(user_id=customer.id, cafe_id=cafe_a.id, status=OrderStatus.ACCEPTED)
+        order_b = Order(user_id=customer.id, cafe_id=cafe_b.id, status=OrderStatus.READY)
+        db.add_all([order_a, order_b])
+        db.add(DriverLocation(driver_id=d1.id, lat=base_lat, lng=base_lng - 0.02, status=DriverStatus.IDLE))
+        db.add(DriverLocation(driver_id=d2.id, lat=base_lat, lng=base_lng + 0.03, status=DriverStatus.IDLE))
+        db.commit()
+
+        assignments = dispatch_pending_orders(db, max_distance_km=50)
+        mine = {a["order_id"]: a["driver_id"] for a in assignments if a["order_id"] in (order_a.id, order_b.id)}
+        assert mine == {order_a.id: d2.id, order_b.id: d1.id}
+
+        db.expire_all()
+        assert db.get(Order, order_a.id).driver_id == d2.id
+        assert driver_svc.get_latest_driver_location(d1.id, db).status == DriverStatus.OCCUPIED
+        assert driver_svc.get_latest_driver_location(d2.id, db).status == DriverStatus.OCCUPIED
+        # Nothing left to match on the next tick
+        again = dispatch_pending_orders(db, max_distance_km=50)
+        assert all(a["order_id"] not in (order_a.id, order_b.id) for a in again)
+    finally:
+        db.close()
+
+
+def test_admin_dispatch_endpoint_requires_admin(client):
+    client.post("/users/register", json={"email": "dispnonadmin@example.com", "name": "N", "password": "pw", "role": "USER"})
+    tok = client.post("/auth/login", json={"email": "dispnonadmin@example.com", "password": "pw", "role": "USER"}).json()["access_token"]
+    assert client.post("/admin/dispatch", headers={"Authorization": f"Bearer {tok}"}).status_code == 403
+
+    client.post("/auth/seed_user", params={"email": "dispadmin@example.com", "name": "A", "password": "pw", "role": "ADMIN"})
+    tok = client.post("/auth/login", json={"email": "dispadmin@example.com", "password": "pw", "role": "ADMIN"}).json()["access_token"]
+    r = client.post("/admin/dispatch", headers={"Authorization": f"Bearer {tok}"})
+    assert r.status_code == 200
+    assert isinstance(r.json(), list)
@@ -0,0 +1,132 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User, Role, Cafe, Order, OrderStatus, DriverLocation, DriverStatus
+from app.services import dispatch_queue as dq
+from app.services.dispatch_queue import DispatchQueue, dispatch_queue
+from app.services.pubsub import hub, order_topic
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _accepted_order_with_idle_driver(lat, lng):
+    db = SessionLocal()
+    try:
+        owner = User(email=f"dq-{uuid.uuid4().hex}@example.com", name="O", hashed_password="x", role=Role.OWNER)
+        driver = User(email=f"dq-{uuid.uuid4().hex}@example.com", name="D", hashed_password="x", role=Role.DRIVER)
+        db.add_all([owner, driver])
+        db.commit()
+        cafe = Cafe(name="DQCafe", lat=lat, lng=lng, owner_id=owner.id)
+        db.add(cafe)
+        db.commit()
+        order = Order(user_id=owner.id, cafe_id=cafe.id, status=OrderStatus.ACCEPTED)
+        # Parked on the cafe itself, so it is the nearest idle driver whatever else the database holds
+        db.add_all([order, DriverLocation(driver_id=driver.id, lat=lat, lng=lng, timestamp=datetime.utcnow(), status=DriverStatus.IDLE)])
+        db.commit()
+        return order.id, cafe.id, driver.id
+    finally:
+        db.close()
+
+
+def _order_driver(order_id):
+    with SessionLocal() as db:
+        return db.query(Order.driver_id).filter(Order.id == order_id).scalar()
+
+
+def test_queue_assigns_nearest_driver_and_records_time_to_assign():
+    order_id, cafe_id, driver_id = _accepted_order_with_idle_driver(-61.5, 171.5)
+    queue = DispatchQueue(session_factory=SessionLocal, workers=1)
+
+    async def scenario():
+        queue.start()
+        try:
+            assert queue.enqueue(order_id, cafe_id)
+            assert queue.enqueue(order_id, cafe_id)  # already queued: not a second job
+            for _ in range(200):
+                if queue.metrics()["assigned"]:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+    assert _order_driver(order_id) == driver_id
+    m = queue.metrics()
+    assert m["enqueued"] == 1 and m["assigned"] == 1 and m["queued"] == 0 and not m["running"]
+    assert m["time_to_assign"]["samples"] == 1 and m["time_to_assign"]["p50"] >= 0
+    assert not queue.enqueue(order_id, cafe_id)
+
+
+def test_queue_retries_with_backoff_then_gives_up(monkeypatch):
+    calls = []
+
+    def never_assigns(order_id, db):
+        calls.append(time.monotonic())
+        return dq.RETRY
+
+    monkeypatch.setattr(dq, "assign_nearest_driver", never_assigns)
+    queue = DispatchQueue(session_factory=SessionLocal, workers=1, max_attempts=3, backoff_seconds=0.05)
+
+    async def scenario():
+        queue.start()
+        sub = hub.subscribe([order_topic(424242)])
+        try:
+            queue.enqueue(424242, 1)
+            evt = await asyncio.wait_for(sub.get(), 5)
+            assert evt["type"] == "dispatch_failed" and evt["data"]["attempts"] == 3
+        finally:
+            hub.unsubscribe(sub)
+            await queue.stop()
+
+    asyncio.run(scenario())
+    assert len(calls) == 3
+    # 0.05 s, then 0.1 s between attempts
+    assert calls[1] - calls[0] >= 0.04 and calls[2] - calls[1] >= 0.09
+    m = queue.metrics()
+    assert m["retried"] == 2 and m["failed"] == 1 and m["assigned"] == 0
+
+
+def test_status_update_queues_assignment_in_background(client):
+    client.post("/auth/seed_user", params={"email": "dq_owner@example.com", "name": "O", "password": "pw", "role": "OWNER"})
+    tok = client.post("/auth/login", json={"email": "dq_owner@example.com", "password": "pw", "role": "OWNER"}).json()["access_token"]
+    owner_hdr = {"Authorization": f"Bearer {tok}"}
+    cafe_id = client.post("/cafes", json={"name": "DQApiCafe", "address": "A", "lat": -62.5, "lng": 172.5}, headers=owner_hdr).json()["id"]
+    _, _, driver_id = _accepted_order_with_idle_driver(-62.5, 172.5)
+    with SessionLocal() as db:
+        owner_id = db.query(User.id).filter(User.email == "dq_owner@example.com").scalar()
+        order = Order(user_id=owner_id, cafe_id=cafe_id, status=OrderStatus.PENDING)
+        db.add(order)
+        db.commit()
+        order_id = order.id
+
+    r = client.post(f"/orders/{order_id}/status", json="ACCEPTED", headers=owner_hdr)
+    assert r.status_code == 200
+    for _ in range(200):
+        if _order_driver(order_id):
+            break
+        time.sleep(0.02)
+    assert _order_driver(order_id) == driver_id
+
+    client.post("/auth/seed_user", params={"email": "dq_admin@example.com", "name": "A", "password": "pw", "role": "ADMIN"})
+    tok = client.post("/auth/login", json={"email": "dq_admin@example.com", "password": "pw", "role": "ADMIN"}).json()["access_token"]
+    m = client.get("/admin/dispatch/queue", headers={"Authorization": f"Bearer {tok}"}).json()
+    assert m["running"] and m["assigned"] >= 1 and m["time_to_assign"]["samples"] >= 1
+    assert client.get("/admin/dispatch/queue", headers=owner_hdr).status_code == 403
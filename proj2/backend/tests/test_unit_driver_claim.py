@@ -0,0 +1,135 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import os
+import random
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User, Role, Cafe, Order, OrderStatus, DriverLocation, DriverCurrentState, DriverStatus
+from app.services import driver as driver_svc
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False, "timeout": 30})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Far away from every other test's cafes so nearest-driver lookups elsewhere never see these drivers
+BASE_LAT, BASE_LNG = 75.0, -150.0
+
+
+def _setup(n_drivers, n_orders):
+    db = SessionLocal()
+    try:
+        owner = User(email=f"claimown-{uuid.uuid4().hex}@example.com", name="O", hashed_password="x", role=Role.OWNER)
+        customer = User(email=f"claimusr-{uuid.uuid4().hex}@example.com", name="C", hashed_password="x", role=Role.USER)
+        drivers = [
+            User(email=f"claimdrv-{uuid.uuid4().hex}@example.com", name=f"D{i}", hashed_password="x", role=Role.DRIVER)
+            for i in range(n_drivers)
+        ]
+        db.add_all([owner, customer, *drivers])
+        db.commit()
+        cafe = Cafe(name=f"Claim-{uuid.uuid4().hex[:8]}", lat=BASE_LAT, lng=BASE_LNG, owner_id=owner.id)
+        db.add(cafe)
+        db.commit()
+        orders = [Order(user_id=customer.id, cafe_id=cafe.id, status=OrderStatus.READY) for _ in range(n_orders)]
+        db.add_all(orders)
+        for i, d in enumerate(drivers):
+            db.add(DriverLocation(driver_id=d.id, lat=BASE_LAT + 0.001 * i, lng=BASE_LNG, status=DriverStatus.IDLE))
+        db.commit()
+        return [d.id for d in drivers], [o.id for o in orders]
+    finally:
+        db.close()
+
+
+def _assert_no_double_booking(driver_ids, order_ids, wins):
+    db = SessionLocal()
+    try:
+        assigned = db.query(Order.id, Order.driver_id).filter(Order.id.in_(order_ids), Order.driver_id.isnot(None)).all()
+        per_driver = Counter(driver_id for _, driver_id in assigned)
+        assert all(count == 1 for count in per_driver.values())
+        assert sorted(assigned) == sorted(wins)
+        occupied = {
+            s.driver_id for s in db.query(DriverCurrentState).filter(DriverCurrentState.driver_id.in_(driver_ids))
+            if s.status == DriverStatus.OCCUPIED
+        }
+        assert occupied == set(per_driver)
+        return len(assigned)
+    finally:
+        db.close()
+
+
+def _run_concurrently(jobs):
+    barrier = threading.Barrier(len(jobs))
+
+    def run(job):
+        barrier.wait()
+        return job()
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        return list(pool.map(run, jobs))
+
+
+def test_concurrent_manual_claims_never_double_book_a_driver():
+    driver_ids, order_ids = _setup(n_drivers=15, n_orders=60)
+    rng = random.Random(5)
+    attempts = [(rng.choice(order_ids), rng.choice(driver_ids)) for _ in range(300)]
+
+    def claim(order_id, driver_id):
+        db = SessionLocal()
+        try:
+            return (order_id, driver_id) if driver_svc.claim_driver_for_order(order_id, driver_id, db) else None
+        finally:
+            db.close()
+
+    results = _run_concurrently([lambda o=o, d=d: claim(o, d) for o, d in attempts])
+    wins = [r for r in results if r]
+    assert wins
+    assert _assert_no_double_booking(driver_ids, order_ids, wins) == len(wins)
+
+
+def test_concurrent_nearest_claims_never_double_book_a_driver():
+    driver_ids, order_ids = _setup(n_drivers=20, n_orders=200)
+
+    def claim(order_id):
+        db = SessionLocal()
+        try:
+            result = driver_svc.claim_nearest_idle_driver(order_id, BASE_LAT, BASE_LNG, db)
+            return (order_id, result[0].id) if result else None
+        finally:
+            db.close()
+
+    results = _run_concurrently([lambda o=o: claim(o) for o in order_ids])
+    wins = [r for r in results if r]
+    assert wins
+    assert _assert_no_double_booking(driver_ids, order_ids, wins) == len(wins)
+
+
+def test_claim_fails_for_busy_driver_or_assigned_order():
+    driver_ids, order_ids = _setup(n_drivers=2, n_orders=2)
+    db = SessionLocal()
+    try:
+        assert driver_svc.claim_driver_for_order(order_ids[0], driver_ids[0], db)
+        # Driver already occupied
+        assert not driver_svc.claim_driver_for_order(order_ids[1], driver_ids[0], db)
+        # Order already has a driver
+        assert not driver_svc.claim_driver_for_order(order_ids[0], driver_ids[1], db)
+        # Batched claim without commit reverts the order claim in place
+        assert not driver_svc.claim_driver_for_order(order_ids[1], driver_ids[0], db, commit=False)
+        db.commit()
+        db.expire_all()
+        assert db.get(Order, order_ids[1]).driver_id is None
+        assert driver_svc.get_latest_driver_location(driver_ids[1], db).status == DriverStatus.IDLE
+    finally:
+        db.close()
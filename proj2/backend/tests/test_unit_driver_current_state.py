@@ -0,0 +1,95 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+# 
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User, Role, DriverLocation, DriverCurrentState, DriverStatus
+from app.services import driver as driver_svc
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _driver(db, prefix):
+    d = User(email=f"{prefix}-{uuid.uuid4().hex}@example.com", name=prefix, hashed_password="x", role=Role.DRIVER)
+    db.add(d)
+    db.commit()
+    db.refresh(d)
+    return d
+
+
+def test_location_writes_upsert_single_state_row():
+    db = SessionLocal()
+    try:
+        d = _driver(db, "state")
+        now = datetime.utcnow() - timedelta(minutes=10)
+        db.add(DriverLocation(driver_id=d.id, lat=1.0, lng=1.0, timestamp=now, status=DriverStatus.IDLE))
+        db.commit()
+        db.add(DriverLocation(driver_id=d.id, lat=2.0, lng=2.0, timestamp=now + timedelta(seconds=5), status=DriverStatus.OCCUPIED))
+        db.commit()
+        # History row arriving late must not roll the current state back
+        db.add(DriverLocation(driver_id=d.id, lat=9.0, lng=9.0, timestamp=now - timedelta(minutes=1), status=DriverStatus.IDLE))
+        db.commit()
+
+        assert db.query(DriverCurrentState).filter(DriverCurrentState.driver_id == d.id).count() == 1
+        assert db.query(DriverLocation).filter(DriverLocation.driver_id == d.id).count() == 3
+        state = driver_svc.get_latest_driver_location(d.id, db)
+        assert (state.lat, state.lng, state.status) == (2.0, 2.0, DriverStatus.OCCUPIED)
+        assert all(e["driver_id"] != d.id for e in driver_svc.get_idle_drivers_with_locations(db))
+
+        driver_svc.update_driver_status_to_idle(d.id, db)
+        idle = [e for e in driver_svc.get_idle_drivers_with_locations(db) if e["driver_id"] == d.id]
+        assert len(idle) == 1 and idle[0]["lat"] == 2.0
+    finally:
+        db.close()
+
+
+def test_backfill_creates_state_from_latest_history_row():
+    db = SessionLocal()
+    try:
+        d = _driver(db, "backfill")
+        now = datetime.utcnow()
+        db.add(DriverLocation(driver_id=d.id, lat=3.0, lng=3.0, timestamp=now, status=DriverStatus.IDLE))
+        db.add(DriverLocation(driver_id=d.id, lat=4.0, lng=4.0, timestamp=now + timedelta(seconds=1), status=DriverStatus.OCCUPIED))
+        db.commit()
+        # Simulate a database that predates the current-state table
+        db.query(DriverCurrentState).filter(DriverCurrentState.driver_id == d.id).delete()
+        db.commit()
+        assert driver_svc.get_latest_driver_location(d.id, db) is None
+
+        assert driver_svc.backfill_driver_current_state(db) >= 1
+        state = driver_svc.get_latest_driver_location(d.id, db)
+        assert (state.lat, state.status) == (4.0, DriverStatus.OCCUPIED)
+        assert driver_svc.backfill_driver_current_state(db) == 0
+    finally:
+        db.close()
+
+
+def test_idle_drivers_sorted_by_distance_from_origin():
+    db = SessionLocal()
+    try:
+        a = _driver(db, "origin-a")
+        b = _driver(db, "origin-b")
+        db.add(DriverLocation(driver_id=a.id, lat=-60.0, lng=-100.2, status=DriverStatus.IDLE))
+        db.add(DriverLocation(driver_id=b.id, lat=-60.0, lng=-100.05, status=DriverStatus.IDLE))
+        db.commit()
+        res = driver_svc.get_idle_drivers_with_locations(db, -60.0, -100.0)
+        ids = [e["driver_id"] for e in res]
+        assert ids.index(b.id) < ids.index(a.id)
+        assert res == sorted(res, key=lambda e: e["distance_km"])
+        assert "distance_km" not in driver_svc.get_idle_drivers_with_locations(db)[0]
+    finally:
+        db.close()
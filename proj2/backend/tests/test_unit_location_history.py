@@ -0,0 +1,100 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models import User, Role, DriverLocation, DriverStatus
+from app.services.location_history import douglas_peucker, one_per_interval, compact_driver_locations
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def test_douglas_peucker_keeps_corners_and_drops_straight_runs():
+    # An L-shaped track: 50 points north, then 50 points east, ~11 m apart with 1 m of jitter
+    rng = np.random.default_rng(0)
+    lats = np.concatenate([35.0 + np.arange(50) * 1e-4, np.full(50, 35.0 + 49e-4)]) + rng.normal(0, 1e-5, 100)
+    lngs = np.concatenate([np.full(50, -78.0), -78.0 + np.arange(1, 51) * 1e-4]) + rng.normal(0, 1e-5, 100)
+    keep = douglas_peucker(lats, lngs, tolerance_m=10)
+    assert keep[0] and keep[-1]
+    assert keep.sum() <= 5
+    # The corner survives
+    assert keep[47:52].any()
+    assert douglas_peucker([], [], 10).sum() == 0
+    assert douglas_peucker([1.0, 1.0], [2.0, 2.0], 10).all()
+
+
+def test_one_per_interval_keeps_first_point_per_bucket_and_last():
+    t0 = datetime(2025, 1, 1, 12, 0, 0)
+    ts = [t0 + timedelta(seconds=5 * i) for i in range(30)]  # 2.5 minutes of 5 s pings
+    keep = one_per_interval(ts, 60)
+    assert [i for i, k in enumerate(keep) if k] == [0, 12, 24, 29]
+
+
+def test_compaction_downsamples_old_tracks_and_expires_past_horizon(monkeypatch):
+    monkeypatch.setattr(settings, "LOCATION_DOWNSAMPLE", "douglas_peucker")
+    monkeypatch.setattr(settings, "LOCATION_COMPACTION_BATCH", 7)
+    db = SessionLocal()
+    try:
+        d = User(email=f"compact-{uuid.uuid4().hex}@example.com", name="C", hashed_password="x", role=Role.DRIVER)
+        db.add(d)
+        db.commit()
+        now = datetime.utcnow()
+        expired_at = now - timedelta(days=settings.LOCATION_RETENTION_DAYS + 1)
+        old_at = now - timedelta(hours=settings.LOCATION_FULL_RESOLUTION_HOURS + 2)
+        recent_at = now - timedelta(minutes=30)
+        rows = []
+        rows += [DriverLocation(driver_id=d.id, lat=10.0, lng=10.0 + i * 1e-4, timestamp=expired_at + timedelta(seconds=i), status=DriverStatus.IDLE) for i in range(20)]
+        # Old straight-line trip while OCCUPIED, then a status flip back to IDLE at the same spot
+        rows += [DriverLocation(driver_id=d.id, lat=10.0, lng=10.0 + i * 1e-4, timestamp=old_at + timedelta(seconds=i), status=DriverStatus.OCCUPIED) for i in range(40)]
+        rows += [DriverLocation(driver_id=d.id, lat=10.0, lng=10.0039, timestamp=old_at + timedelta(seconds=41), status=DriverStatus.IDLE)]
+        rows += [DriverLocation(driver_id=d.id, lat=10.0, lng=10.0 + i * 1e-4, timestamp=recent_at + timedelta(seconds=i), status=DriverStatus.IDLE) for i in range(25)]
+        db.add_all(rows)
+        db.commit()
+
+        report = compact_driver_locations(db, now=now)
+        assert report["expired"] >= 20
+        assert report["downsampled"] >= 38
+        assert report["rows_after"] == report["rows_before"] - report["expired"] - report["downsampled"]
+        if report["bytes_before"] is not None:
+            assert report["bytes_after"] <= report["bytes_before"]
+
+        left = db.query(DriverLocation).filter(DriverLocation.driver_id == d.id).order_by(DriverLocation.timestamp).all()
+        old = [r for r in left if r.timestamp < now - timedelta(hours=settings.LOCATION_FULL_RESOLUTION_HOURS)]
+        assert all(r.timestamp >= now - timedelta(days=settings.LOCATION_RETENTION_DAYS) for r in left)
+        # Trip endpoints and the status change survive; recent rows are untouched
+        assert [(r.lng, r.status) for r in old] == [(10.0, DriverStatus.OCCUPIED), (10.0039, DriverStatus.OCCUPIED), (10.0039, DriverStatus.IDLE)]
+        assert len(left) - len(old) == 25
+
+        # A second pass has nothing left to do
+        again = compact_driver_locations(db, now=now)
+        assert again["expired"] == 0 and again["downsampled"] == 0
+    finally:
+        db.close()
+
+
+def test_admin_compaction_endpoint_requires_admin(client):
+    client.post("/auth/seed_user", params={"email": "compactadmin@example.com", "name": "A", "password": "pw", "role": "ADMIN"})
+    tok = client.post("/auth/login", json={"email": "compactadmin@example.com", "password": "pw", "role": "ADMIN"}).json()["access_token"]
+    r = client.post("/admin/driver-locations/compact", headers={"Authorization": f"Bearer {tok}"})
+    assert r.status_code == 200
+    assert {"expired", "downsampled", "rows_before", "rows_after", "bytes_before", "bytes_after"} <= set(r.json())
+
+    client.post("/users/register", json={"email": "compactuser@example.com", "name": "U", "password": "pw", "role": "USER"})
+    tok = client.post("/auth/login", json={"email": "compactuser@example.com", "password": "pw", "role": "USER"}).json()["access_token"]
+    assert client.post("/admin/driver-locations/compact", headers={"Authorization": f"Bearer {tok}"}).status_code == 403
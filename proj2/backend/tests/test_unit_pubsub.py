@@ -0,0 +1,144 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import asyncio
+import os
+import threading
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.auth import create_token
+from app.models import User, Role, Cafe, Order, OrderStatus, DriverLocation, DriverStatus
+from app.services import driver as driver_svc
+from app.services.pubsub import EventHub, hub, driver_topic, order_topic, cafe_topic
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def test_events_coalesce_per_topic_and_type():
+    async def scenario():
+        h = EventHub(max_pending=8)
+        sub = h.subscribe(["driver:1", "order:1"])
+        for i in range(100):
+            h.publish("driver:1", "location", {"lat": i})
+        h.publish("order:1", "order_status", {"status": "READY"})
+        h.publish("driver:2", "location", {"lat": 0})
+        first = await sub.get()
+        second = await sub.get()
+        assert (first["topic"], first["data"]["lat"]) == ("driver:1", 99)
+        assert second["type"] == "order_status"
+        sub.close()
+        assert await sub.get() is None
+        assert h.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_is_dropped_and_others_keep_receiving():
+    async def scenario():
+        h = EventHub(max_pending=4)
+        slow = h.subscribe([f"order:{i}" for i in range(10)])
+        fast = h.subscribe(["order:9"])
+        for i in range(10):
+            h.publish(f"order:{i}", "order_status", {"n": i})
+        assert slow.dropped and slow.closed
+        assert await slow.get() is None
+        assert (await fast.get())["data"]["n"] == 9
+        assert h.subscriber_count("order:0") == 0 and h.subscriber_count("order:9") == 1
+
+    asyncio.run(scenario())
+
+
+def test_publish_from_worker_thread_is_delivered_on_loop():
+    async def scenario():
+        h = EventHub()
+        sub = h.subscribe(["cafe:3"])
+        t = threading.Thread(target=lambda: [h.publish("cafe:3", f"t{i}", {"i": i}) for i in range(50)])
+        t.start()
+        t.join()
+        got = [await asyncio.wait_for(sub.get(), 1) for _ in range(50)]
+        assert [e["data"]["i"] for e in got] == list(range(50))
+
+    asyncio.run(scenario())
+
+
+def test_committed_writes_publish_and_rollbacks_do_not():
+    async def scenario():
+        db = SessionLocal()
+        try:
+            owner = User(email=f"psown-{uuid.uuid4().hex}@example.com", name="O", hashed_password="x", role=Role.OWNER)
+            drv = User(email=f"psdrv-{uuid.uuid4().hex}@example.com", name="D", hashed_password="x", role=Role.DRIVER)
+            db.add_all([owner, drv])
+            db.commit()
+            cafe = Cafe(name="PubSubCafe", lat=-80.0, lng=120.0, owner_id=owner.id)
+            db.add(cafe)
+            db.commit()
+            order = Order(user_id=owner.id, cafe_id=cafe.id, status=OrderStatus.READY)
+            db.add(order)
+            db.commit()
+
+            sub = hub.subscribe([driver_topic(drv.id), order_topic(order.id), cafe_topic(cafe.id)])
+            db.add(DriverLocation(driver_id=drv.id, lat=-80.0, lng=120.01, status=DriverStatus.IDLE))
+            db.rollback()
+            await asyncio.sleep(0)
+            assert sub._pending == {}
+
+            db.add(DriverLocation(driver_id=drv.id, lat=-80.0, lng=120.01, status=DriverStatus.IDLE))
+            db.commit()
+            evt = await asyncio.wait_for(sub.get(), 1)
+            assert (evt["type"], evt["data"]["status"]) == ("location", "IDLE")
+
+            assert driver_svc.claim_driver_for_order(order.id, drv.id, db)
+            got = {(e["topic"], e["type"]) for e in [await asyncio.wait_for(sub.get(), 1) for _ in range(4)]}
+            assert got == {
+                (order_topic(order.id), "order_assigned"),
+                (cafe_topic(cafe.id), "order_assigned"),
+                (driver_topic(drv.id), "order_assigned"),
+                (driver_topic(drv.id), "location"),
+            }
+
+            order = db.get(Order, order.id)
+            order.status = OrderStatus.PICKED_UP
+            db.commit()
+            evt = await asyncio.wait_for(sub.get(), 1)
+            assert evt["type"] == "order_status" and evt["data"]["status"] == "PICKED_UP"
+            sub.close()
+        finally:
+            db.close()
+
+    asyncio.run(scenario())
+
+
+def test_driver_ws_streams_own_events_and_rejects_others(client):
+    r = client.post("/drivers/register", json={"email": "wsdrv@example.com", "name": "W", "password": "pw"})
+    driver_id = r.json()["id"]
+    tok = client.post("/drivers/login", json={"email": "wsdrv@example.com", "password": "pw"}).json()["access_token"]
+    hdr = {"Authorization": f"Bearer {tok}"}
+
+    with client.websocket_connect(f"/drivers/driver/{driver_id}/ws?token={tok}") as ws:
+        r = client.post(f"/drivers/{driver_id}/location-status", json={"lat": -81.0, "lng": 121.0, "status": "OCCUPIED"}, headers=hdr)
+        assert r.status_code == 200
+        evt = ws.receive_json()
+        assert evt["topic"] == f"driver:{driver_id}"
+        assert (evt["type"], evt["data"]["lat"], evt["data"]["status"]) == ("location", -81.0, "OCCUPIED")
+
+    other = create_token(driver_id + 1000, "x@example.com", Role.DRIVER, timedelta(minutes=5))
+    for url in (f"/drivers/driver/{driver_id}/ws", f"/drivers/driver/{driver_id}/ws?token={other}"):
+        try:
+            with client.websocket_connect(url) as ws:
+                ws.receive_json()
+            assert False, "connection should have been refused"
+        except Exception as exc:
+            assert getattr(exc, "code", None) == 1008
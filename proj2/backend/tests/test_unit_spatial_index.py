@@ -0,0 +1,156 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+# 
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User, Role, DriverLocation, DriverStatus
+from app.services import driver as driver_svc
+from app.services.spatial import GeoGridIndex, haversine_km
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def test_grid_nearest_matches_brute_force():
+    rng = random.Random(42)
+    idx = GeoGridIndex(cell_deg=0.01)
+    points = {}
+    for k in range(500):
+        lat, lng = 35.7 + rng.uniform(-0.3, 0.3), -78.6 + rng.uniform(-0.3, 0.3)
+        idx.insert(k, lat, lng)
+        points[k] = (lat, lng)
+    for _ in range(50):
+        qlat, qlng = 35.7 + rng.uniform(-0.5, 0.5), -78.6 + rng.uniform(-0.5, 0.5)
+        expected = min(points, key=lambda k: haversine_km(qlat, qlng, *points[k]))
+        key, dist = idx.nearest(qlat, qlng)
+        assert key == expected
+        assert abs(dist - haversine_km(qlat, qlng, *points[expected])) < 1e-9
+
+
+def test_grid_insert_moves_and_remove_and_exclude():
+    idx = GeoGridIndex()
+    idx.insert("a", 0.0, 0.0)
+    idx.insert("b", 1.0, 1.0)
+    assert idx.nearest(0.0, 0.0)[0] == "a"
+    assert idx.nearest(0.0, 0.0, exclude={"a"})[0] == "b"
+    idx.insert("a", 5.0, 5.0)
+    assert idx.position("a") == (5.0, 5.0)
+    assert idx.nearest(0.0, 0.0)[0] == "b"
+    idx.remove("b")
+    assert len(idx) == 1 and "b" not in idx
+    idx.clear()
+    assert idx.nearest(0.0, 0.0) is None
+
+
+def test_index_follows_status_writes_and_skips_occupied():
+    db = SessionLocal()
+    try:
+        near = User(email=f"idxnear-{uuid.uuid4().hex}@example.com", name="N", hashed_password="x", role=Role.DRIVER)
+        far = User(email=f"idxfar-{uuid.uuid4().hex}@example.com", name="F", hashed_password="x", role=Role.DRIVER)
+        db.add_all([near, far])
+        db.commit()
+        # An isolated spot so drivers from other tests do not interfere
+        base_lat, base_lng = -45.0, 120.0
+        now = datetime.utcnow()
+        db.add(DriverLocation(driver_id=near.id, lat=base_lat, lng=base_lng + 0.001, timestamp=now, status=DriverStatus.IDLE))
+        db.add(DriverLocation(driver_id=far.id, lat=base_lat, lng=base_lng + 0.05, timestamp=now, status=DriverStatus.IDLE))
+        db.commit()
+
+        driver, _ = driver_svc.find_nearest_idle_driver(base_lat, base_lng, db)
+        assert driver.id == near.id
+
+        driver_svc.update_driver_status_to_occupied(near.id, db)
+        assert near.id not in driver_svc.idle_driver_index
+        driver, _ = driver_svc.find_nearest_idle_driver(base_lat, base_lng, db)
+        assert driver.id == far.id
+
+        # A write older than what the index has already seen must not resurrect the driver
+        db.add(DriverLocation(driver_id=near.id, lat=base_lat, lng=base_lng, timestamp=now - timedelta(hours=1), status=DriverStatus.IDLE))
+        db.commit()
+        assert near.id not in driver_svc.idle_driver_index
+
+        driver_svc.update_driver_status_to_idle(near.id, db)
+        driver, _ = driver_svc.find_nearest_idle_driver(base_lat, base_lng, db)
+        assert driver.id == near.id
+    finally:
+        db.close()
+
+
+def test_stale_read_does_not_undo_newer_index_writes():
+    db = SessionLocal()
+    try:
+        busy = User(email=f"idxstale-{uuid.uuid4().hex}@example.com", name="S", hashed_password="x", role=Role.DRIVER)
+        moved = User(email=f"idxmoved-{uuid.uuid4().hex}@example.com", name="M", hashed_password="x", role=Role.DRIVER)
+        db.add_all([busy, moved])
+        db.commit()
+        base_lat, base_lng = 45.0, -120.0
+        then = datetime.utcnow() - timedelta(hours=1)
+        db.add(DriverLocation(driver_id=busy.id, lat=base_lat, lng=base_lng, timestamp=then, status=DriverStatus.OCCUPIED))
+        db.add(DriverLocation(driver_id=moved.id, lat=base_lat, lng=base_lng + 0.01, timestamp=then, status=DriverStatus.IDLE))
+        db.commit()
+        # Newer writes the index has seen but this session's reads predate
+        now = datetime.utcnow()
+        driver_svc.index_driver_location(busy.id, base_lat, base_lng, DriverStatus.IDLE, now)
+        driver_svc.index_driver_location(moved.id, base_lat, base_lng + 0.02, DriverStatus.IDLE, now)
+
+        hit = driver_svc.find_nearest_idle_driver(base_lat, base_lng, db)
+        assert hit is None or hit[0].id not in (busy.id, moved.id)
+        assert busy.id in driver_svc.idle_driver_index
+        assert driver_svc.idle_driver_index.position(moved.id) == (base_lat, base_lng + 0.02)
+    finally:
+        db.close()
+
+
+def test_rolled_back_location_is_not_indexed():
+    db = SessionLocal()
+    try:
+        d = User(email=f"idxrb-{uuid.uuid4().hex}@example.com", name="R", hashed_password="x", role=Role.DRIVER)
+        db.add(d)
+        db.commit()
+        db.add(DriverLocation(driver_id=d.id, lat=10.0, lng=10.0, timestamp=datetime.utcnow(), status=DriverStatus.IDLE))
+        db.flush()
+        db.rollback()
+        assert d.id not in driver_svc.idle_driver_index
+    finally:
+        db.close()
+
+
+def test_batch_distances_match_scalar():
+    rng = random.Random(7)
+    lats = [rng.uniform(-60, 60) for _ in range(200)]
+    lngs = [rng.uniform(-170, 170) for _ in range(200)]
+    batch = driver_svc.calculate_distances(12.0, 34.0, lats, lngs)
+    for a, b, d in zip(lats, lngs, batch):
+        assert abs(d - driver_svc.calculate_distance(12.0, 34.0, a, b)) < 1e-6
+
+    matrix = driver_svc.calculate_distance_matrix(lats[:3], lngs[:3], lats, lngs)
+    assert matrix.shape == (3, 200)
+    assert abs(matrix[1, 5] - driver_svc.calculate_distance(lats[1], lngs[1], lats[5], lngs[5])) < 1e-6
+    assert abs(matrix[2, 2]) < 1e-9
+
+
+def test_grid_full_scan_fallback_respects_exclude():
+    idx = GeoGridIndex(cell_deg=0.01)
+    # Far-apart points force the vectorized full-scan path
+    idx.insert("x", 10.0, 10.0)
+    idx.insert("y", 20.0, 20.0)
+    idx.insert("z", -30.0, 50.0)
+    assert idx.nearest(11.0, 11.0)[0] == "x"
+    assert idx.nearest(11.0, 11.0, exclude={"x"})[0] == "y"
+    assert idx.nearest(11.0, 11.0, exclude={"x", "y", "z"}) is None
+    idx.insert("x", 19.5, 19.5)
+    assert idx.nearest(20.0, 20.0, exclude={"y"})[0] == "x"
@@ -0,0 +1,93 @@
+# Copyright (c) 2025 Group 2
+# All rights reserved.
+#
+# This project and its source code are the property of Group 2:
+# - Aryan Tapkire
+# - Dilip Irala Narasimhareddy
+# - Sachi Vyas
+# - Supraj Gijre
+
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models import User, Role, Cafe, Item, Cart, CartItem, Order, OrderEvent, OrderStatus, DriverLocation, DriverCurrentState, DriverStatus
+from app.services.sweeper import sweep
+
+
+TEST_DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _user(db, role):
+    u = User(email=f"sweep-{uuid.uuid4().hex}@example.com", name="S", hashed_password="x", role=role)
+    db.add(u)
+    db.commit()
+    return u
+
+
+def test_sweep_declines_stale_orders_releases_drivers_and_expires_carts(monkeypatch):
+    monkeypatch.setattr(settings, "SWEEP_BATCH", 2)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        owner, customer = _user(db, Role.OWNER), _user(db, Role.USER)
+        cafe = Cafe(name="SweepCafe", lat=1.0, lng=1.0, owner_id=owner.id)
+        db.add(cafe)
+        db.commit()
+        item = Item(cafe_id=cafe.id, name="SweepItem", calories=100, price=2.0)
+        db.add(item)
+        db.commit()
+
+        stale = [Order(user_id=customer.id, cafe_id=cafe.id, status=OrderStatus.PENDING, created_at=now - timedelta(hours=2)) for _ in range(3)]
+        fresh = Order(user_id=customer.id, cafe_id=cafe.id, status=OrderStatus.PENDING, created_at=now)
+
+        # Finished its only order but never set back to IDLE; busy on an order; OCCUPIED without ever having one
+        stuck, busy, offline = _user(db, Role.DRIVER), _user(db, Role.DRIVER), _user(db, Role.DRIVER)
+        long_ago = now - timedelta(hours=1)
+        db.add_all([DriverLocation(driver_id=d.id, lat=1.0, lng=1.0, timestamp=long_ago, status=DriverStatus.OCCUPIED) for d in (stuck, busy, offline)])
+        db.add_all(stale + [
+            fresh,
+            Order(user_id=customer.id, cafe_id=cafe.id, driver_id=stuck.id, status=OrderStatus.DELIVERED, created_at=long_ago),
+            Order(user_id=customer.id, cafe_id=cafe.id, driver_id=busy.id, status=OrderStatus.PICKED_UP, created_at=long_ago),
+        ])
+
+        idle_cart, active_cart = Cart(user_id=owner.id, created_at=now - timedelta(days=10)), Cart(user_id=customer.id, created_at=now - timedelta(days=10))
+        db.add_all([idle_cart, active_cart])
+        db.commit()
+        db.add_all([
+            CartItem(cart_id=idle_cart.id, item_id=item.id, quantity=1, updated_at=now - timedelta(hours=settings.CART_TTL_HOURS + 1)),
+            CartItem(cart_id=active_cart.id, item_id=item.id, quantity=1, updated_at=now - timedelta(minutes=5)),
+        ])
+        db.commit()
+        idle_cart_id, active_cart_id = idle_cart.id, active_cart.id
+
+        report = sweep(db, now)
+        assert report["orders_declined"] >= 3
+        assert report["drivers_released"] >= 1
+        assert report["carts_expired"] >= 1 and report["cart_items_removed"] >= 1
+
+        db.expire_all()
+        assert all(o.status == OrderStatus.DECLINED for o in stale) and fresh.status == OrderStatus.PENDING
+        assert db.query(OrderEvent).filter(OrderEvent.order_id == stale[0].id, OrderEvent.status == OrderStatus.DECLINED).count() == 1
+        states = {s.driver_id: s.status for s in db.query(DriverCurrentState).filter(DriverCurrentState.driver_id.in_([stuck.id, busy.id, offline.id]))}
+        assert states == {stuck.id: DriverStatus.IDLE, busy.id: DriverStatus.OCCUPIED, offline.id: DriverStatus.OCCUPIED}
+        assert db.get(Cart, idle_cart_id) is None and db.get(Cart, active_cart_id) is not None
+
+        again = sweep(db, now)
+        assert again["drivers_released"] == 0
+    finally:
+        db.close()
+
+
+def test_admin_sweep_endpoint_reports_counts(client):
+    client.post("/auth/seed_user", params={"email": "sweepadmin@example.com", "name": "A", "password": "pw", "role": "ADMIN"})
+    tok = client.post("/auth/login", json={"email": "sweepadmin@example.com", "password": "pw", "role": "ADMIN"}).json()["access_token"]
+    r = client.post("/admin/sweep", headers={"Authorization": f"Bearer {tok}"})
+    assert r.status_code == 200
+    assert set(r.json()) == {"orders_declined", "drivers_released", "carts_expired", "cart_items_removed"}
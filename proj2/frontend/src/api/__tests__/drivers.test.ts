@@ -10,7 +10,7 @@
  */
 
 import { vi, describe, it, expect, beforeEach } from 'vitest'
-import { apiClient } from '../client'
+import { apiClient, TokenManager } from '../client'
 import { driversApi } from '../drivers'
 import type { DriverLoginRequest, DriverLocationIn, AssignedOrderOut } from '../drivers'
 
@@ -20,6 +20,9 @@ vi.mock('../client', () => ({
     get: vi.fn(),
     post: vi.fn(),
   },
+  TokenManager: {
+    getAccessToken: vi.fn(),
+  },
 }))
 
 describe('driversApi', () => {
@@ -159,17 +162,18 @@ describe('driversApi', () => {
   })
 
   describe('WebSocket', () => {
-    it('generates correct WebSocket URL', () => {
+    it('generates correct WebSocket URL with the access token', () => {
       // Mock window.location.host
       Object.defineProperty(window, 'location', {
         value: { host: 'localhost:3000' },
         writable: true,
       })
+      vi.mocked(TokenManager.getAccessToken).mockReturnValueOnce('a.b+c')
 
       const driverId = 7
       const wsUrl = driversApi.getWebSocketUrl(driverId)
 
-      expect(wsUrl).toBe(`ws://localhost:3000/drivers/driver/${driverId}/ws`)
+      expect(wsUrl).toBe(`ws://localhost:3000/drivers/driver/${driverId}/ws?token=a.b%2Bc`)
     })
   })
 })
\ No newline at end of file
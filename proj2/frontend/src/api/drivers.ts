@@ -9,7 +9,7 @@
  * - Supraj Gijre
  */
 
-import { apiClient } from './client';
+import { apiClient, TokenManager } from './client';
 
 export interface DriverLoginRequest {
   email: string;
@@ -62,8 +62,10 @@ export const driversApi = {
     return apiClient.post(`/drivers/${driverId}/location`, location);
   },
 
-  // WebSocket connection
+  // WebSocket connection; browsers cannot set headers on a WebSocket, so the access token goes in the query
   getWebSocketUrl(driverId: number) {
-    return `ws://${window.location.host}/drivers/driver/${driverId}/ws`;
+    const token = TokenManager.getAccessToken();
+    const query = token ? `?token=${encodeURIComponent(token)}` : '';
+    return `ws://${window.location.host}/drivers/driver/${driverId}/ws${query}`;
   }
 };
\ No newline at end of file